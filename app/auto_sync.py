@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from . import perf
+from .cloud_sync import CloudSync
+from .storage import StorageManager, StorageSnapshot
+from .sync_backends import create_backend
+
+# 排程器自己寫回 settings 的統計欄位，不列入變更指紋
+_STAT_KEYS = (
+    "auto_sync_last_run",
+    "auto_sync_last_duration_ms",
+    "auto_sync_last_bytes",
+    "auto_sync_skipped",
+    "auto_sync_last_error",
+    "retention_last_run",
+    "retention_last_report",
+)
+
+
+def compute_fingerprint(snapshot: StorageSnapshot) -> int:
+    """以 crc32 計算歷史 / 模板 / 設定的內容指紋，用來判斷是否需要重新匯出。
+
+    每筆項目涵蓋中繼資料、extra 與內文本身（壓縮的長內文直接取壓縮後的位元組，不必解壓），
+    因此長度相同的修改或近似重複合併也會改變指紋。
+    """
+    items = snapshot.items
+    crc = zlib.crc32(str(len(items)).encode("utf-8"))
+    for it in items:
+        head = (
+            f"{it.id}|{it.pinned}|{it.category}|{it.kind}|{it.timestamp_iso}|{it.updated_at}"
+            f"|{it.image_path}|{sorted(it.extra.items()) if it.extra else ''}"
+        )
+        crc = zlib.crc32(head.encode("utf-8"), crc)
+        body = it._body
+        crc = zlib.crc32(body if isinstance(body, bytes) else body.encode("utf-8"), crc)
+
+    crc = zlib.crc32(repr(snapshot.templates).encode("utf-8"), crc)
+    settings = {k: v for k, v in snapshot.settings.items() if k not in _STAT_KEYS}
+    crc = zlib.crc32(repr(sorted(settings.items())).encode("utf-8"), crc)
+    return crc
+
+
+class AutoSyncScheduler:
+    """背景自動匯出排程器。
+
+    在工作執行緒上依 auto_sync_interval_min 分鐘，或累積 auto_sync_after_changes
+    次存檔後執行匯出（可選擇順便上傳）；指紋與上次相同時直接略過。
+    工作執行緒只讀取 GUI 執行緒在存檔後交付的 StorageSnapshot，統計結果透過 on_stats
+    交回（GUI 以 queued signal 轉回主執行緒後才寫入 settings）。
+    不會在 GUI 執行緒上做任何檔案 I/O。
+    """
+
+    def __init__(
+        self,
+        storage: StorageManager,
+        cloud_sync: CloudSync,
+        on_stats: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        self.storage = storage
+        self.cloud_sync = cloud_sync
+        # 沒有指定時直接寫入 settings（只適用於單執行緒呼叫 run_once 的情況）
+        self.on_stats = on_stats or storage.settings.update
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._changes = 0
+        self._skipped = 0
+        self._snapshot: Optional[StorageSnapshot] = None
+        self._last_fingerprint: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        storage.save_listeners.append(self.notify_change)
+
+    # ---------- control ----------
+    @property
+    def enabled(self) -> bool:
+        return bool(self.storage.settings.get("auto_sync_enabled", False))
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._take_snapshot()
+        self._skipped = int(self.storage.settings.get("auto_sync_skipped", 0) or 0)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="LightClipAutoSync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def reconfigure(self) -> None:
+        """設定變更後呼叫：依 auto_sync_enabled 啟動或停止，並重新計時。"""
+        if self.enabled:
+            self._take_snapshot()
+            self.start()
+            self._wake.set()
+        else:
+            self.stop()
+
+    def notify_change(self) -> None:
+        """存檔後（GUI 執行緒）呼叫：更新交給工作執行緒的快照並累計變更次數。"""
+        if not self.enabled:
+            return
+        self._take_snapshot()
+        threshold = int(self.storage.settings.get("auto_sync_after_changes", 0) or 0)
+        with self._lock:
+            self._changes += 1
+            due = threshold > 0 and self._changes >= threshold
+        if due:
+            self._wake.set()
+
+    def _take_snapshot(self) -> None:
+        snapshot = self.storage.snapshot()
+        with self._lock:
+            self._snapshot = snapshot
+
+    # ---------- worker ----------
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                settings = self._snapshot.settings if self._snapshot is not None else {}
+            minutes = float(settings.get("auto_sync_interval_min", 10) or 0)
+            self._wake.wait(timeout=minutes * 60 if minutes > 0 else None)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            with self._lock:
+                pending = self._changes
+            if pending == 0 and self._last_fingerprint is not None:
+                continue
+            try:
+                self.run_once()
+            except Exception as e:
+                # 背景匯出失敗不影響主程式，記錄原因後下次排程再試
+                perf.incr("auto_sync.failed")
+                self.on_stats(
+                    {
+                        "auto_sync_last_error": f"{datetime.now().isoformat(timespec='seconds')} {e}",
+                    }
+                )
+
+    def run_once(self, force: bool = False) -> bool:
+        """執行一次匯出；內容沒變且非強制時回傳 False。"""
+        with self._lock:
+            self._changes = 0
+            snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.storage.snapshot()
+        fingerprint = compute_fingerprint(snapshot)
+        if not force and fingerprint == self._last_fingerprint:
+            self._skipped += 1
+            self.on_stats({"auto_sync_skipped": self._skipped})
+            return False
+
+        t0 = time.perf_counter()
+        files = self.cloud_sync.export(snapshot)
+        if snapshot.settings.get("auto_sync_upload", False):
+            backend = create_backend(snapshot.settings, self.cloud_sync.base_dir)
+            backend.upload_files(files, self.cloud_sync.cloud_dir)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        self._last_fingerprint = fingerprint
+        self._record(elapsed_ms, self.cloud_sync.last_bytes_written)
+        return True
+
+    def _record(self, elapsed_ms: float, nbytes: int) -> None:
+        stats: Dict[str, Any] = {
+            "auto_sync_last_run": datetime.now().isoformat(timespec="seconds"),
+            "auto_sync_last_duration_ms": round(elapsed_ms, 1),
+            "auto_sync_last_bytes": int(nbytes),
+            "auto_sync_last_error": "",
+        }
+        self.on_stats(stats)
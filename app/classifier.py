@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .models import ClipEntry
+
+# 預設規則：依序為優先順序，同一段文字符合多條規則時取最前面的分類。
+# 只需判斷「有沒有」，因此網址 / 電子郵件以字面字元開頭，讓不符合的位置盡快失敗。
+DEFAULT_RULES: List[Dict[str, str]] = [
+    {"category": "JSON", "pattern": r"\A\s*(?:\{\s*\"[^\"\n]*\"\s*:|\[\s*[\[{\"\d-])"},
+    {"category": "網址", "pattern": r"(?:https?|ftp)://[^\s<>\"']|www\.[\w-]+\.[\w-]"},
+    {"category": "電子郵件", "pattern": r"(?<=[\w.+-])@[\w-]+\.[\w-]"},
+    {"category": "檔案路徑", "pattern": r"\A\s*(?:[A-Za-z]:[\\/]|\\\\[\w.$-]+\\|~?/(?:[\w.-]+/)+[\w.-]*\s*\Z)"},
+    {
+        "category": "程式碼",
+        "pattern": r"(?m:^[ \t]*(?:def|class|import|from|function|const|let|var|public|private|return|package|#include)\b"
+        r"|=>|[;{}][ \t]*$)",
+    },
+    {"category": "數字", "pattern": r"\A\s*(?:\+?\(?\d[\d\s().-]{5,}\d|[-+]?\d[\d,]*(?:\.\d+)?%?)\s*\Z"},
+]
+
+# 只掃描內文開頭這麼多字元；re 每個位置都要嘗試所有規則，掃描長度決定成本
+DEFAULT_PREFIX_CHARS = 1024
+
+
+def compile_rules(
+    rules: Iterable[Dict[str, Any]],
+) -> Tuple[Optional["re.Pattern[str]"], List[Tuple[int, "re.Pattern[str]"]], List[str], List[str]]:
+    """把規則合併成一個具名群組的正規表示式。
+
+    含有捕獲群組的規則（可能用到 \\1 或具名群組的反向參照）放進合併後的式子會被重新編號，
+    這類規則與無法包進群組的規則（例如中途的 (?i)）改成各自編譯。
+    回傳 (合併後的 pattern, [(規則索引, 各自編譯的 pattern)], 各規則的分類, 無法編譯的規則說明)。
+    """
+    parts: List[str] = []
+    separate: List[Tuple[int, "re.Pattern[str]"]] = []
+    categories: List[str] = []
+    errors: List[str] = []
+    for rule in rules:
+        cat = str(rule.get("category") or "").strip()
+        pat = str(rule.get("pattern") or "")
+        if not cat or not pat:
+            continue
+        try:
+            compiled = re.compile(pat)
+        except re.error as e:
+            errors.append(f"{cat}: {e}")
+            continue
+        idx = len(categories)
+        categories.append(cat)
+        if compiled.groups:
+            separate.append((idx, compiled))
+            continue
+        try:
+            re.compile(f"(?P<r0>{pat})")
+        except re.error:
+            separate.append((idx, compiled))
+            continue
+        # 包成零寬度的 lookahead：比對不消耗文字，較前面的低優先規則不會吞掉後面的高優先比對
+        parts.append(f"(?=(?P<r{idx}>{pat}))")
+    return (re.compile("|".join(parts)) if parts else None), separate, categories, errors
+
+
+class Classifier:
+    """規則式自動分類：對內文前 prefix_chars 個字元掃描一次合併後的正規表示式。
+
+    各自編譯的規則只在優先順序高於合併式子的結果時才另外搜尋。
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]], prefix_chars: int = DEFAULT_PREFIX_CHARS) -> None:
+        self.prefix_chars = max(64, int(prefix_chars))
+        self._regex, self._separate, self.categories, self.errors = compile_rules(rules)
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "Classifier":
+        if not settings.get("classifier_enabled", True):
+            return cls([])
+        return cls(
+            settings.get("classifier_rules") or DEFAULT_RULES,
+            settings.get("classifier_prefix_chars", DEFAULT_PREFIX_CHARS),
+        )
+
+    def classify_text(self, text: str) -> Optional[str]:
+        """回傳第一條（優先順序最高）符合的規則分類；都不符合時回傳 None。"""
+        if not text or not self.categories:
+            return None
+        best = len(self.categories)
+        regex = self._regex
+        if regex is not None:
+            for m in regex.finditer(text, 0, self.prefix_chars):
+                # 每個位置都會嘗試；規則本身沒有群組，lastgroup 一定是 r<規則索引>
+                idx = int(m.lastgroup[1:])
+                if idx < best:
+                    best = idx
+                    if best == 0:
+                        break
+        for idx, pattern in self._separate:
+            if idx >= best:
+                break
+            if pattern.search(text, 0, self.prefix_chars):
+                best = idx
+                break
+        return self.categories[best] if best < len(self.categories) else None
+
+    def classify(self, clip: ClipEntry) -> Optional[str]:
+        return self.classify_text(clip.text_prefix(self.prefix_chars))
+
+
+def reclassify_async(
+    clips: List[ClipEntry],
+    classify: Callable[[ClipEntry], str],
+    on_done: Callable[[Dict[str, str]], None],
+) -> threading.Thread:
+    """在背景執行緒重新分類（略過手動指定分類的項目），完成後以 {id: 新分類} 呼叫 on_done。
+
+    on_done 在工作執行緒上被呼叫，呼叫端需自行轉回 GUI 執行緒再套用。
+    """
+
+    def work() -> None:
+        changes: Dict[str, str] = {}
+        for clip in clips:
+            if clip.category_manual:
+                continue
+            cat = classify(clip)
+            if cat != clip.category:
+                changes[clip.id] = cat
+        on_done(changes)
+
+    thread = threading.Thread(target=work, name="LightClipReclassify", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore[import]
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+from .models import ClipEntry
+
+# 欄位順序：擷取時間、類型代碼、分類 id、釘選旗標、內文大小
+_TYPECODES = ("d", "b", "h", "b", "q")
+_DTYPES = ("float64", "int8", "int16", "int8", "int64")
+TS, KIND, CAT, PINNED, BYTES = range(5)
+
+
+class ClipColumns:
+    """歷史紀錄的欄位式中繼資料（與 clipboard_items 同順序的平行陣列）。
+
+    每筆項目只存擷取時間、類型代碼、分類 id、釘選旗標與內文大小，
+    篩選時以向量化遮罩計算符合的索引；有 NumPy 時用 ndarray，否則退回 array 模組。
+    StorageManager 在新增 / 釘選 / 改分類時就地更新，其他變動則標記過期、下次篩選時重建。
+    """
+
+    def __init__(self) -> None:
+        self.revision = -1
+        self.size = 0
+        self.category_ids: Dict[str, int] = {}
+        self._cols: List[Any] = [array(code) for code in _TYPECODES]
+
+    def _cat_id(self, name: str) -> int:
+        cid = self.category_ids.get(name)
+        if cid is None:
+            cid = self.category_ids[name] = len(self.category_ids)
+        return cid
+
+    def _row(self, it: ClipEntry, category_of: Callable[[ClipEntry], str]) -> Tuple:
+        return (it.captured_at, int(it.kind), self._cat_id(category_of(it)), 1 if it.pinned else 0, it.body_size)
+
+    def rebuild(self, items: List[ClipEntry], category_of: Callable[[ClipEntry], str], revision: int) -> None:
+        n = len(items)
+        cat_id = self._cat_id
+        sources = (
+            (it.captured_at for it in items),
+            (it.kind for it in items),
+            [cat_id(category_of(it)) for it in items],
+            (1 if it.pinned else 0 for it in items),
+            (it.body_size for it in items),
+        )
+        if np is not None:
+            self._cols = [np.fromiter(src, dtype=dt, count=n) for src, dt in zip(sources, _DTYPES)]
+        else:
+            self._cols = [array(code, src) for src, code in zip(sources, _TYPECODES)]
+        self.size = n
+        self.revision = revision
+
+    def insert_front(
+        self,
+        item: ClipEntry,
+        category_of: Callable[[ClipEntry], str],
+        dropped: List[int],
+        revision: int,
+    ) -> None:
+        """新項目加在最前方，再移除被 max_history 裁掉的索引（以插入後的位置計）。"""
+        row = self._row(item, category_of)
+        if np is not None:
+            cols = [np.concatenate((np.array((v,), dtype=c.dtype), c)) for v, c in zip(row, self._cols)]
+            if dropped:
+                cols = [np.delete(c, dropped) for c in cols]
+            self._cols = cols
+        else:
+            for v, c in zip(row, self._cols):
+                c.insert(0, v)
+                for i in reversed(dropped):
+                    del c[i]
+        self.size += 1 - len(dropped)
+        self.revision = revision
+
+    def update(self, index: int, item: ClipEntry, category_of: Callable[[ClipEntry], str], revision: int) -> None:
+        """單筆項目的釘選或分類變更。"""
+        row = self._row(item, category_of)
+        self._cols[CAT][index] = row[CAT]
+        self._cols[PINNED][index] = row[PINNED]
+        self.revision = revision
+
+    def select(
+        self,
+        kinds: Optional[Iterable[int]] = None,
+        since: Optional[float] = None,
+        category: Optional[str] = None,
+        pinned: Optional[bool] = None,
+        min_bytes: int = 0,
+    ) -> Sequence[int]:
+        """回傳符合所有條件的索引（遞增順序）；未指定任何條件時回傳全部。"""
+        cid = None
+        if category is not None:
+            cid = self.category_ids.get(category)
+            if cid is None:
+                return []
+        kinds = None if kinds is None else tuple(int(k) for k in kinds)
+        want_pin = None if pinned is None else (1 if pinned else 0)
+        ts, kind, cat, pin, size = self._cols
+
+        if np is not None:
+            mask = None
+
+            def both(m, cond):
+                return cond if m is None else (m & cond)
+
+            if kinds is not None:
+                mask = both(mask, np.isin(kind, kinds))
+            if since is not None:
+                mask = both(mask, ts >= since)
+            if cid is not None:
+                mask = both(mask, cat == cid)
+            if want_pin is not None:
+                mask = both(mask, pin == want_pin)
+            if min_bytes:
+                mask = both(mask, size >= min_bytes)
+            if mask is None:
+                return range(self.size)
+            return np.flatnonzero(mask).tolist()
+
+        if kinds is None and since is None and cid is None and want_pin is None and not min_bytes:
+            return range(self.size)
+        kind_set = frozenset(kinds) if kinds is not None else None
+        return [
+            i
+            for i in range(self.size)
+            if (kind_set is None or kind[i] in kind_set)
+            and (since is None or ts[i] >= since)
+            and (cid is None or cat[i] == cid)
+            and (want_pin is None or pin[i] == want_pin)
+            and (not min_bytes or size[i] >= min_bytes)
+        ]
@@ -1,11 +1,58 @@
 
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import os
+import shutil
+import threading
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
 
-from .storage import StorageManager
+try:
+    import zstandard  # type: ignore[import]
+except Exception:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+from .storage import StorageManager, StorageSnapshot
+from .sync_backends import file_sha256
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_WRITE_BATCH = 1000
+
+# 壓縮方式 -> 匯出檔副檔名
+_NDJSON_SUFFIXES = {
+    "none": ".ndjson",
+    "gzip": ".ndjson.gz",
+    "zstd": ".ndjson.zst",
+}
+
+
+def _open_text_writer(path: Path, compression: str) -> IO[str]:
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)  # type: ignore[return-value]
+    if compression == "zstd" and zstandard is not None:
+        raw = path.open("wb")
+        writer = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding="utf-8")
+    return path.open("w", encoding="utf-8")
+
+
+def _open_text_reader(path: Path) -> IO[str]:
+    """依檔頭自動判斷 gzip / zstd / 純文字。"""
+    with path.open("rb") as f:
+        head = f.read(4)
+    if head[:2] == _GZIP_MAGIC:
+        return gzip.open(path, "rt", encoding="utf-8")  # type: ignore[return-value]
+    if head == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("讀取 .zst 匯出檔需要安裝 zstandard 套件")
+        raw = path.open("rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
 
 
 class CloudSync:
@@ -16,26 +63,221 @@ class CloudSync:
         self.storage = storage
         self.cloud_dir = self.base_dir / "cloud"
         self.cloud_dir.mkdir(exist_ok=True)
+        self.images_dir = self.cloud_dir / "images"
+        # (路徑, 大小, mtime) -> sha256，避免每次匯出都重新計算圖片雜湊
+        self._hash_cache: Dict[Tuple[str, int, int], str] = {}
+        # 手動匯出與背景自動匯出可能同時發生
+        self._lock = threading.Lock()
+        self.last_bytes_written = 0
+        self._copied_bytes = 0
+
+    def _source(self, snapshot: Optional[StorageSnapshot]) -> StorageSnapshot:
+        if snapshot is not None:
+            return snapshot
+        storage = self.storage
+        return StorageSnapshot(list(storage.clipboard_items), storage.templates, storage.settings)
+
+    def export(self, snapshot: Optional[StorageSnapshot] = None) -> List[Path]:
+        """依設定的 cloud_export_format 匯出。
 
-    def export_json(self) -> List[Path]:
+        背景執行緒必須傳入在 GUI 執行緒取得的 snapshot；省略時直接讀取 storage。
+        """
+        src = self._source(snapshot)
+        fmt = src.settings.get("cloud_export_format", "ndjson")
+        with self._lock:
+            if fmt == "json":
+                return self.export_json(src)
+            return self.export_ndjson(src.settings.get("cloud_compression", "gzip"), src)
+
+    def export_json(self, snapshot: Optional[StorageSnapshot] = None) -> List[Path]:
+        src = self._source(snapshot)
         files: List[Path] = []
 
         history_path = self.cloud_dir / "history_export.json"
         templates_path = self.cloud_dir / "templates_export.json"
         settings_path = self.cloud_dir / "settings_export.json"
 
-        history_path.write_text(
-            json.dumps(self.storage.clipboard_items, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-        templates_path.write_text(
-            json.dumps(self.storage.templates, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-        settings_path.write_text(
-            json.dumps(self.storage.settings, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        # json.dump 會分段寫入檔案，不必先組出整份字串
+        with history_path.open("w", encoding="utf-8") as f:
+            json.dump([it.to_dict() for it in src.items], f, ensure_ascii=False, indent=2)
+        self._write_small_json(templates_path, src.templates)
+        self._write_small_json(settings_path, src.settings)
 
         files.extend([history_path, templates_path, settings_path])
+        self.last_bytes_written = sum(p.stat().st_size for p in files)
         return files
+
+    # ---------- NDJSON 串流匯出 / 匯入 ----------
+    def export_ndjson(self, compression: str = "gzip", snapshot: Optional[StorageSnapshot] = None) -> List[Path]:
+        """逐筆寫出歷史紀錄（一行一筆），圖片以 sha256 去重後放在 cloud/images。
+
+        compression 可為 "none" / "gzip" / "zstd"；未安裝 zstandard 時改用 gzip。
+        回傳寫出或引用到的所有檔案。
+        """
+        src = self._source(snapshot)
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        suffix = _NDJSON_SUFFIXES.get(compression, ".ndjson")
+        history_path = self.cloud_dir / f"history_export{suffix}"
+        tmp_path = history_path.with_name(history_path.name + ".tmp")
+
+        files: List[Path] = []
+        image_files: Dict[str, Path] = {}
+        self._copied_bytes = 0
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+        with _open_text_writer(tmp_path, compression) as f:
+            # 每 _WRITE_BATCH 行合併寫入一次，減少壓縮串流的呼叫次數
+            buf: List[str] = []
+            for item in src.items:
+                rec = item.to_dict()
+                image_path = rec.pop("image_path", None)
+                if image_path:
+                    ref = self._bundle_image(Path(image_path))
+                    if ref:
+                        rec["image_ref"] = ref
+                        image_files[ref] = self.images_dir / ref
+                buf.append(dumps(rec))
+                if len(buf) >= _WRITE_BATCH:
+                    buf.append("")
+                    f.write("\n".join(buf))
+                    buf = []
+            if buf:
+                buf.append("")
+                f.write("\n".join(buf))
+        os.replace(tmp_path, history_path)
+
+        # 移除其他格式的舊匯出，避免匯入時讀到過期資料
+        for other in _NDJSON_SUFFIXES.values():
+            stale = self.cloud_dir / f"history_export{other}"
+            if stale != history_path and stale.exists():
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+        templates_path = self.cloud_dir / "templates_export.json"
+        settings_path = self.cloud_dir / "settings_export.json"
+        self._write_small_json(templates_path, src.templates)
+        self._write_small_json(settings_path, src.settings)
+
+        files.extend([history_path, templates_path, settings_path])
+        self.last_bytes_written = self._copied_bytes + sum(p.stat().st_size for p in files)
+        files.extend(image_files.values())
+        return files
+
+    def export_items(self, items, path: Path) -> int:
+        """把指定的項目寫成 NDJSON（副檔名 .gz 時以 gzip 壓縮），圖片保留原本的路徑；回傳筆數。"""
+        compression = "gzip" if path.suffix == ".gz" else "none"
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        tmp_path = path.with_name(path.name + ".tmp")
+        count = 0
+        with _open_text_writer(tmp_path, compression) as f:
+            for item in items:
+                f.write(dumps(item.to_dict()) + "\n")
+                count += 1
+        os.replace(tmp_path, path)
+        return count
+
+    def find_history_export(self) -> Optional[Path]:
+        """找出 cloud 資料夾中最新的歷史匯出檔（NDJSON 或舊版 JSON）。"""
+        candidates = [self.cloud_dir / f"history_export{s}" for s in _NDJSON_SUFFIXES.values()]
+        candidates.append(self.cloud_dir / "history_export.json")
+        existing = [p for p in candidates if p.exists()]
+        if not existing:
+            return None
+        return max(existing, key=lambda p: p.stat().st_mtime)
+
+    def iter_history_export(self, path: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+        """逐筆讀出匯出的歷史紀錄，image_ref 會還原成 cloud/images 下的 image_path。"""
+        path = path or self.find_history_export()
+        if path is None or not path.exists():
+            return
+        if path.name.endswith(".json"):
+            # 舊版整份 JSON 陣列格式
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data if isinstance(data, list) else []:
+                if isinstance(item, dict):
+                    yield item
+            return
+
+        loads = json.loads
+        with _open_text_reader(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(rec, dict):
+                    continue
+                ref = rec.pop("image_ref", None)
+                if ref:
+                    rec["image_path"] = str(self.images_dir / ref)
+                yield rec
+
+    def import_into_storage(self, path: Optional[Path] = None) -> Dict[str, int]:
+        """讀取匯出檔並合併進 storage（歷史紀錄 + 模板），不存檔也不刷新畫面。"""
+        local_images = self.storage.data_dir / "images"
+
+        def localized():
+            for rec in self.iter_history_export(path):
+                src = rec.get("image_path")
+                if src and Path(src).parent == self.images_dir:
+                    # 把雲端資料夾中的圖片複製回 data/images，避免依賴 cloud 目錄
+                    dest = local_images / Path(src).name
+                    if not dest.exists() and Path(src).exists():
+                        local_images.mkdir(parents=True, exist_ok=True)
+                        try:
+                            shutil.copyfile(src, dest)
+                        except OSError:
+                            pass
+                    if dest.exists():
+                        rec["image_path"] = str(dest)
+                yield rec
+
+        stats = self.storage.merge_clipboard_items(localized())
+
+        templates_path = self.cloud_dir / "templates_export.json"
+        stats["templates_added"] = 0
+        if templates_path.exists():
+            try:
+                data = json.loads(templates_path.read_text(encoding="utf-8"))
+            except Exception:
+                data = []
+            if isinstance(data, list):
+                stats["templates_added"] = self.storage.merge_templates(
+                    t for t in data if isinstance(t, dict)
+                )
+        return stats
+
+    # ---------- helpers ----------
+    def _bundle_image(self, src: Path) -> Optional[str]:
+        try:
+            st = src.stat()
+        except OSError:
+            return None
+        key = (str(src), st.st_size, st.st_mtime_ns)
+        digest = self._hash_cache.get(key)
+        if digest is None:
+            try:
+                digest = file_sha256(src)
+            except OSError:
+                return None
+            self._hash_cache[key] = digest
+        name = f"{digest}{src.suffix or '.png'}"
+        dest = self.images_dir / name
+        if not dest.exists():
+            self.images_dir.mkdir(exist_ok=True)
+            try:
+                shutil.copyfile(src, dest)
+            except OSError:
+                return None
+            self._copied_bytes += st.st_size
+        return name
+
+    def _write_small_json(self, path: Path, data) -> None:
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
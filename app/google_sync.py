@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable, Optional
+
+from .sync_backends import SyncBackend
 
 # 此模組提供一個簡單的 Google Drive 上傳介面。
 # 實際使用時需要在執行環境中放置 credentials.json 並安裝相關套件。
@@ -10,13 +12,16 @@ from typing import Iterable
 # pip install google-auth google-auth-oauthlib google-api-python-client
 
 
-class GoogleDriveSync:
+class GoogleDriveSync(SyncBackend):
+    name = "google"
+
     def __init__(self, base_dir: Path):
+        super().__init__()
         self.base_dir = base_dir
 
-    def upload_files(self, files: Iterable[Path]) -> None:
+    def upload_files(self, files: Iterable[Path], root: Optional[Path] = None) -> Dict[str, int]:
         # 為了讓專案可以在沒有 Google 套件的環境下運作，
         # 這裡只提供範例結構；實務上可依需求補上真實上傳流程。
         # 如果需要完整串接，可在此加入 Drive API 呼叫。
         # 目前僅當作占位程式碼，以免匯入失敗。
-        pass
+        return {"uploaded": 0, "skipped": 0, "failed": 0, "bytes": 0}
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore[import]
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+from .models import ClipEntry, ClipType
+
+# dHash：縮成 9×8 的灰階格點，比較每列相鄰兩格的亮度，得到 64 位元
+HASH_W = 9
+HASH_H = 8
+# 呼叫端先把圖片縮到這個大小（每格 16×16 像素），再由這裡做區塊平均
+SAMPLE_SIZE = (HASH_W * 16, HASH_H * 16)
+# 擷取時視為同一張截圖的最大漢明距離；「相似截圖」用較寬鬆的距離
+DEFAULT_DUP_DISTANCE = 2
+SIMILAR_DISTANCE = 10
+
+# (寬, 高, 每列位元組數, 灰階像素)
+GrayImage = Tuple[int, int, int, bytes]
+
+if np is not None:
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _edges(size: int, cells: int) -> List[int]:
+    return [size * i // cells for i in range(cells)]
+
+
+def dhash(gray: GrayImage) -> Optional[int]:
+    """灰階圖片的 64 位元 dHash；圖片小於 9×8 時回傳 None。"""
+    width, height, stride, data = gray
+    if width < HASH_W or height < HASH_H or len(data) < stride * height:
+        return None
+    xs = _edges(width, HASH_W)
+    ys = _edges(height, HASH_H)
+    if np is not None:
+        pixels = np.frombuffer(data, dtype=np.uint8, count=stride * height).reshape(height, stride)[:, :width]
+        sums = np.add.reduceat(np.add.reduceat(pixels.astype(np.uint32), ys, axis=0), xs, axis=1)
+        counts = np.outer(np.diff(ys + [height]), np.diff(xs + [width]))
+        cells = sums / counts
+        bits = cells[:, 1:] > cells[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+    # 沒有 NumPy：逐格加總（縮圖只有約兩萬個像素）
+    cells_py = []
+    for r in range(HASH_H):
+        y0, y1 = ys[r], ys[r + 1] if r + 1 < HASH_H else height
+        row = []
+        for c in range(HASH_W):
+            x0, x1 = xs[c], xs[c + 1] if c + 1 < HASH_W else width
+            total = sum(sum(data[y * stride + x0 : y * stride + x1]) for y in range(y0, y1))
+            row.append(total / ((y1 - y0) * (x1 - x0)))
+        cells_py.append(row)
+    value = 0
+    for row in cells_py:
+        for c in range(HASH_W - 1):
+            value = (value << 1) | (row[c + 1] > row[c])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ImageHashIndex:
+    """圖片項目的 dHash 索引，以漢明距離查詢。
+
+    查詢時把所有雜湊與目標做 XOR 並以查表計算位元數（NumPy 向量化）；
+    陣列只在新增 / 移除後的下一次查詢重建一次。
+    """
+
+    def __init__(self) -> None:
+        self._ids: List[str] = []
+        self._hashes: List[int] = []
+        self._pos: Dict[str, int] = {}
+        self._array = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._pos
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def add(self, cid: str, value: int) -> None:
+        pos = self._pos.get(cid)
+        if pos is None:
+            self._pos[cid] = len(self._ids)
+            self._ids.append(cid)
+            self._hashes.append(value)
+        else:
+            self._hashes[pos] = value
+        self._array = None
+
+    def remove(self, cid: str) -> None:
+        pos = self._pos.pop(cid, None)
+        if pos is None:
+            return
+        # 與最後一筆交換後移除
+        last_id = self._ids.pop()
+        last_hash = self._hashes.pop()
+        if pos < len(self._ids):
+            self._ids[pos] = last_id
+            self._hashes[pos] = last_hash
+            self._pos[last_id] = pos
+        self._array = None
+
+    def query(self, value: int, max_distance: int, exclude: Iterable[str] = ()) -> List[Tuple[str, int]]:
+        """回傳距離 <= max_distance 的 (id, 距離)，由近到遠排序。"""
+        skip = set(exclude)
+        if np is not None and self._ids:
+            if self._array is None:
+                self._array = np.array(self._hashes, dtype=np.uint64)
+            xor = self._array ^ np.uint64(value)
+            dist = _POP8[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+            hits = [(self._ids[i], int(dist[i])) for i in np.flatnonzero(dist <= max_distance)]
+        else:
+            hits = [(cid, hamming(h, value)) for cid, h in zip(self._ids, self._hashes)]
+            hits = [(cid, d) for cid, d in hits if d <= max_distance]
+        hits = [hit for hit in hits if hit[0] not in skip]
+        hits.sort(key=lambda t: t[1])
+        return hits
+
+
+def hash_images_async(
+    clips: Sequence[ClipEntry],
+    load_gray: Callable[[str], Optional[GrayImage]],
+    on_done: Callable[[Dict[str, int]], None],
+) -> threading.Thread:
+    """在背景執行緒讀取尚未計算 dHash 的圖片項目，完成後呼叫 on_done({id: hash})。
+
+    load_gray 負責解碼並縮圖成 SAMPLE_SIZE 的灰階像素，必須可在非 GUI 執行緒使用。
+    """
+
+    def work() -> None:
+        results: Dict[str, int] = {}
+        for clip in clips:
+            if clip.kind != ClipType.IMAGE or clip.image_hash is not None or not clip.image_path:
+                continue
+            try:
+                gray = load_gray(clip.image_path)
+            except Exception:
+                gray = None
+            value = dhash(gray) if gray is not None else None
+            if value is not None:
+                results[clip.id] = value
+        on_done(results)
+
+    thread = threading.Thread(target=work, name="LightClipImageHash", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+Capture = Tuple[str, Any]
+
+
+class IngestQueue:
+    """剪貼簿擷取佇列：dataChanged 只負責 push，由計時器定期 drain 成一個批次處理。
+
+    - 連續相同的內容（同一次複製常觸發多次 dataChanged）只保留一筆，計入 coalesced；
+    - 圖片不在 push 時解碼，批次中連續的圖片事件只保留最後一筆；
+    - 佇列超過 max_pending 時丟棄最舊的項目，計入 dropped。
+    計數器一直開著（只是整數加法），供診斷面板顯示。
+    """
+
+    def __init__(self, max_pending: int = 500) -> None:
+        self.max_pending = max_pending
+        self._pending: Deque[Capture] = deque()
+        self._lock = threading.Lock()
+        self._last: Optional[Capture] = None
+        self.events = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.batches = 0
+        self.captured = 0
+        self.max_batch = 0
+
+    def push(self, kind: str, payload: Any = None) -> bool:
+        """加入一次擷取；與上一筆相同而被合併時回傳 False。"""
+        with self._lock:
+            self.events += 1
+            cap = (kind, payload)
+            if kind == "image":
+                # 圖片此時還沒解碼：只有尚未處理的連續圖片事件可以合併（處理時都會讀到同一張）
+                if self._pending and self._pending[-1][0] == "image":
+                    self.coalesced += 1
+                    return False
+            elif cap == self._last:
+                self.coalesced += 1
+                return False
+            self._last = cap
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(cap)
+            return True
+
+    def drain(self) -> List[Capture]:
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        if batch:
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(batch))
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "events": self.events,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "captured": self.captured,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+        }
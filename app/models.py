@@ -1,42 +1,310 @@
+from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any, Optional
+import sys
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Union
+
+
+class ClipType(IntEnum):
+    TEXT = 0
+    IMAGE = 1
+    FILE = 2
+
+
+_TYPE_NAMES = ("text", "image", "file")
+_TYPE_CODES = {name: ClipType(i) for i, name in enumerate(_TYPE_NAMES)}
+
+# 超過此長度的內文以 zlib（level 1）壓縮保存，讀取 full_text 時才解壓
+COMPRESS_THRESHOLD = 4096
+
+# from_dict / to_dict 直接處理的欄位；其餘欄位原樣放進 extra
+_KNOWN_KEYS = frozenset(
+    (
+        "id",
+        "pinned",
+        "timestamp_local",
+        "timestamp",
+        "timestamp_iso",
+        "type",
+        "full_text",
+        "preview",
+        "category",
+        "image_path",
+        "updated_at",
+    )
+)
+
+
+def _intern(value: Optional[str]) -> str:
+    return sys.intern(value) if value else ""
+
+
+def _parse_iso(value: str) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (ValueError, OverflowError, OSError):
+        return 0.0
 
 
-@dataclass
 class ClipEntry:
-    id: int
-    type: str
-    content: str
-    timestamp_local: str
-    timestamp_iso: str
-    pinned: bool = False
-    tags: List[str] = None
-    extra: Dict[str, Any] = None
+    """記憶體中的剪貼簿項目。
+
+    以 __slots__ 取代 dict：類型存成 ClipType、分類字串 intern 共用，
+    長內文壓縮保存。只有在存檔 / 匯出時才透過 to_dict 轉回 dict。
+    """
+
+    __slots__ = (
+        "id",
+        "kind",
+        "pinned",
+        "category",
+        "preview",
+        "_body",
+        "image_path",
+        "timestamp_local",
+        "timestamp_iso",
+        "updated_at",
+        "extra",
+        "_ts",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        kind: ClipType = ClipType.TEXT,
+        full_text: str = "",
+        preview: str = "",
+        category: str = "",
+        pinned: bool = False,
+        image_path: str = "",
+        timestamp_local: str = "",
+        timestamp_iso: str = "",
+        updated_at: str = "",
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.kind = kind
+        self.pinned = pinned
+        self.category = _intern(category)
+        self.preview = preview
+        self._body: Union[str, bytes] = ""
+        self.full_text = full_text
+        self.image_path = image_path
+        self.timestamp_local = timestamp_local
+        self.timestamp_iso = timestamp_iso
+        self.updated_at = updated_at
+        self.extra = extra or None
+        self._ts = -1.0
+
+    # ---------- 內文 ----------
+    @property
+    def full_text(self) -> str:
+        body = self._body
+        if isinstance(body, bytes):
+            return zlib.decompress(body).decode("utf-8")
+        return body
+
+    @full_text.setter
+    def full_text(self, text: str) -> None:
+        text = text or ""
+        if len(text) > COMPRESS_THRESHOLD:
+            self._body = zlib.compress(text.encode("utf-8"), 1)
+        else:
+            self._body = text
+
+    def text_prefix(self, limit: int) -> str:
+        """內文的前 limit 個字元；壓縮的長內文只解壓所需的開頭部分。"""
+        body = self._body
+        if isinstance(body, bytes):
+            head = zlib.decompressobj().decompress(body, limit * 4)
+            return head.decode("utf-8", "ignore")[:limit]
+        return body[:limit]
+
+    @property
+    def body_size(self) -> int:
+        """內文實際佔用的長度（壓縮後的位元組數或字元數），不需解壓。"""
+        return len(self._body)
+
+    @property
+    def type(self) -> str:
+        return _TYPE_NAMES[self.kind]
+
+    @type.setter
+    def type(self, name: str) -> None:
+        self.kind = _TYPE_CODES.get(name, ClipType.TEXT)
+
+    def set_category(self, category: str) -> None:
+        self.category = _intern(category)
 
+    @property
+    def category_manual(self) -> bool:
+        """分類是否由使用者手動指定（自動重新分類時不覆蓋）；旗標很少見，因此放在 extra。"""
+        return bool(self.extra and self.extra.get("category_manual"))
+
+    @category_manual.setter
+    def category_manual(self, value: bool) -> None:
+        if value:
+            if self.extra is None:
+                self.extra = {}
+            self.extra["category_manual"] = True
+        elif self.extra:
+            self.extra.pop("category_manual", None)
+
+    @property
+    def html(self) -> str:
+        """複製時一併帶有的 HTML / 富文字（大多數項目沒有，因此同樣放在 extra）。"""
+        return (self.extra or {}).get("html") or ""
+
+    @html.setter
+    def html(self, value: str) -> None:
+        if value:
+            if self.extra is None:
+                self.extra = {}
+            self.extra["html"] = value
+        elif self.extra:
+            self.extra.pop("html", None)
+
+    @property
+    def image_hash(self) -> Optional[int]:
+        """圖片的 64 位元 dHash（以 16 位十六進位字串存在 extra），尚未計算時為 None。"""
+        value = (self.extra or {}).get("dhash")
+        try:
+            return int(value, 16) if value else None
+        except (TypeError, ValueError):
+            return None
+
+    @image_hash.setter
+    def image_hash(self, value: Optional[int]) -> None:
+        if value is not None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra["dhash"] = f"{value:016x}"
+        elif self.extra:
+            self.extra.pop("dhash", None)
+
+    @property
+    def versions(self) -> List[Dict[str, Any]]:
+        """被合併的近似重複內容（新到舊），每筆為 full_text 與當時的時間戳記。"""
+        return list((self.extra or {}).get("versions") or ())
+
+    def push_version(self, limit: int) -> None:
+        """把目前的內文與時間推入版本堆疊，最多保留 limit 筆。"""
+        old = {
+            "full_text": self.full_text,
+            "timestamp_local": self.timestamp_local,
+            "timestamp_iso": self.timestamp_iso,
+        }
+        if self.extra is None:
+            self.extra = {}
+        self.extra["versions"] = ([old] + self.versions)[: max(1, limit)]
+
+    def take_content(self, other: "ClipEntry") -> None:
+        """改用 other 的內文、預覽、HTML 與擷取時間（id、釘選與版本堆疊不變）。"""
+        self.kind = other.kind
+        self._body = other._body
+        self.preview = other.preview
+        self.html = other.html
+        self.take_timestamp(other)
+
+    def take_timestamp(self, other: "ClipEntry") -> None:
+        """改用 other 的擷取時間。"""
+        self.timestamp_local = other.timestamp_local
+        self.timestamp_iso = other.timestamp_iso
+        self._ts = other._ts
+
+    @property
+    def file_paths(self) -> List[str]:
+        """檔案項目的路徑清單（一行一個，存在內文中以便搜尋）。"""
+        if self.kind != ClipType.FILE:
+            return []
+        return [p for p in self.full_text.splitlines() if p]
+
+    def content_key(self):
+        """以類型 + 內容判斷兩筆項目是否相同（圖片以檔名比對，匯出檔的檔名即雜湊值）。
+
+        壓縮是決定性的，因此長內文直接比對壓縮後的位元組，不必解壓。
+        """
+        if self.kind == ClipType.IMAGE:
+            path = self.image_path or ""
+            return self.kind, path.replace("\\", "/").rsplit("/", 1)[-1]
+        return self.kind, self._body
+
+    @property
+    def captured_at(self) -> float:
+        """擷取時間（epoch 秒）；第一次讀取時才解析 timestamp_iso，沒有時間戳記為 0。"""
+        ts = self._ts
+        if ts < 0:
+            ts = self._ts = _parse_iso(self.timestamp_iso)
+        return ts
+
+    def stamp(self, when: datetime) -> None:
+        """記錄擷取時間（本地顯示字串、ISO 字串與 epoch 秒）。"""
+        when = when.replace(microsecond=0)
+        self.timestamp_local = when.strftime("%Y-%m-%d %H:%M:%S")
+        self.timestamp_iso = when.isoformat(timespec="seconds")
+        self._ts = when.timestamp()
+
+    @property
+    def modified_at(self) -> str:
+        return self.updated_at or self.timestamp_iso
+
+    # ---------- 轉換 ----------
     def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        if d["tags"] is None:
-            d["tags"] = []
-        if d["extra"] is None:
-            d["extra"] = {}
+        d: Dict[str, Any] = {
+            "id": self.id,
+            "pinned": self.pinned,
+            "timestamp_local": self.timestamp_local,
+            "timestamp_iso": self.timestamp_iso,
+            "type": _TYPE_NAMES[self.kind],
+            "full_text": self.full_text,
+            "preview": self.preview,
+            "category": self.category,
+        }
+        if self.image_path:
+            d["image_path"] = self.image_path
+        if self.updated_at:
+            d["updated_at"] = self.updated_at
+        if self.extra:
+            d.update(self.extra)
         return d
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "ClipEntry":
-        ts_local = data.get("timestamp_local") or data.get("timestamp") or ""
-        ts_iso = data.get("timestamp_iso") or ""
+        extra = {k: v for k, v in data.items() if k not in _KNOWN_KEYS}
         return ClipEntry(
-            id=data.get("id", 0),
-            type=data.get("type", "text"),
-            content=data.get("content", ""),
-            timestamp_local=ts_local,
-            timestamp_iso=ts_iso,
-            pinned=data.get("pinned", False),
-            tags=data.get("tags") or [],
-            extra=data.get("extra") or {},
+            id=data.get("id") or "",
+            kind=_TYPE_CODES.get(data.get("type") or "text", ClipType.TEXT),
+            full_text=data.get("full_text") or "",
+            preview=data.get("preview") or "",
+            category=data.get("category") or "",
+            pinned=bool(data.get("pinned")),
+            image_path=data.get("image_path") or "",
+            timestamp_local=data.get("timestamp_local") or data.get("timestamp") or "",
+            timestamp_iso=data.get("timestamp_iso") or "",
+            updated_at=data.get("updated_at") or "",
+            extra=extra,
         )
 
+    @staticmethod
+    def coerce(item: Union["ClipEntry", Dict[str, Any]]) -> "ClipEntry":
+        return item if isinstance(item, ClipEntry) else ClipEntry.from_dict(item)
+
+    def copy(self) -> "ClipEntry":
+        new = ClipEntry.__new__(ClipEntry)
+        for name in ClipEntry.__slots__:
+            setattr(new, name, getattr(self, name))
+        if self.extra:
+            new.extra = dict(self.extra)
+        return new
+
+    def __repr__(self) -> str:
+        return f"ClipEntry(id={self.id!r}, type={self.type!r}, preview={self.preview[:30]!r})"
+
 
 @dataclass
 class TemplateEntry:
@@ -46,7 +314,12 @@ class TemplateEntry:
     hotkey_index: Optional[int] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "content": self.content,
+            "hotkey_index": self.hotkey_index,
+        }
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "TemplateEntry":
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import random
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore[import]
+except Exception:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+from .models import ClipEntry, ClipType
+
+# 64 個雜湊切成 16 段、每段 4 列：相似度 0.8 的兩段文字幾乎一定會落在同一個桶，
+# 0.3 以下很少成為候選；候選再以完整簽章估計的相似度過濾。
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+# 只取內文開頭這麼多字元計算簽章（長內文壓縮保存，不必整段解壓）
+PREFIX_CHARS = 1024
+DEFAULT_THRESHOLD = 0.8
+# 「相似項目」列出的門檻（比合併寬鬆）
+SIMILAR_THRESHOLD = 0.6
+
+_M64 = (1 << 64) - 1
+
+
+def _make_params(seed: int = 0x11C1) -> Tuple[List[int], List[int]]:
+    rnd = random.Random(seed)
+    # multiply-shift 雜湊：乘數需為奇數，取乘積的高 32 位
+    mults = [rnd.getrandbits(64) | 1 for _ in range(NUM_PERM)]
+    adds = [rnd.getrandbits(64) for _ in range(NUM_PERM)]
+    return mults, adds
+
+
+_MULTS, _ADDS = _make_params()
+if np is not None:
+    _NP_MULTS = np.array(_MULTS, dtype=np.uint64)
+    _NP_ADDS = np.array(_ADDS, dtype=np.uint64)
+
+
+def shingle_hashes(text: str) -> List[int]:
+    """正規化（小寫、合併空白）後取 5 字元 shingle 的 crc32。"""
+    norm = " ".join(text[:PREFIX_CHARS].lower().split())
+    if len(norm) <= SHINGLE:
+        grams = {norm} if norm else set()
+    else:
+        grams = {norm[i : i + SHINGLE] for i in range(len(norm) - SHINGLE + 1)}
+    return [zlib.crc32(g.encode("utf-8")) for g in grams]
+
+
+def signature(text: str) -> Optional[Any]:
+    """MinHash 簽章（NUM_PERM 個 32 位元值）；空白內容回傳 None。
+
+    有 NumPy 時為 uint32 陣列，否則為 tuple。
+    """
+    hashes = shingle_hashes(text)
+    if not hashes:
+        return None
+    if np is not None:
+        h = np.array(hashes, dtype=np.uint64)
+        mixed = (h[:, None] * _NP_MULTS[None, :] + _NP_ADDS[None, :]) >> np.uint64(32)
+        return mixed.min(axis=0).astype(np.uint32)
+    return tuple(
+        min(((a * h + b) & _M64) >> 32 for h in hashes) for a, b in zip(_MULTS, _ADDS)
+    )
+
+
+def similarity(a: Any, b: Any) -> float:
+    """兩個簽章估計的 Jaccard 相似度。"""
+    if np is not None and isinstance(a, np.ndarray):
+        return float(np.count_nonzero(a == b)) / NUM_PERM
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def _band_keys(sig: Any) -> List[int]:
+    if np is not None and isinstance(sig, np.ndarray):
+        raw = sig.tobytes()
+        step = ROWS * 4
+        return [hash((band, raw[band * step : (band + 1) * step])) for band in range(BANDS)]
+    return [hash((band, tuple(sig[band * ROWS : (band + 1) * ROWS]))) for band in range(BANDS)]
+
+
+def clip_text(clip: ClipEntry) -> Optional[str]:
+    """參與近似重複比對的內文；只有文字項目才比對。"""
+    if clip.kind != ClipType.TEXT:
+        return None
+    return clip.text_prefix(PREFIX_CHARS)
+
+
+class NearDupIndex:
+    """文字項目的 MinHash + LSH 索引。
+
+    每個項目的簽章切成 BANDS 段，同一段完全相同的項目放在同一個桶；
+    查詢只比對共用至少一個桶的候選，成本與桶大小有關而與總筆數無關。
+    被刪除的項目由 remove 移除，查詢端另外略過已不存在的 id。
+    每個簽章旁記錄計算時的內容鍵（ClipEntry.content_key），同一個 id 的內容被取代時
+    可據此發現簽章已過期。
+    """
+
+    def __init__(self) -> None:
+        self._sigs: Dict[str, Any] = {}
+        self._keys: Dict[str, Any] = {}
+        # 多數桶只有一個 id，直接存字串；第二個 id 加入時才換成 list
+        self._buckets: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._sigs
+
+    def add(self, cid: str, sig: Any, key: Any = None) -> None:
+        if cid in self._sigs:
+            self.remove(cid)
+        if sig is None:
+            return
+        self._sigs[cid] = sig
+        self._keys[cid] = key
+        buckets = self._buckets
+        for key in _band_keys(sig):
+            cur = buckets.get(key)
+            if cur is None:
+                buckets[key] = cid
+            elif isinstance(cur, list):
+                cur.append(cid)
+            else:
+                buckets[key] = [cur, cid]
+
+    def remove(self, cid: str) -> None:
+        sig = self._sigs.pop(cid, None)
+        if sig is None:
+            return
+        del self._keys[cid]
+        buckets = self._buckets
+        for key in _band_keys(sig):
+            cur = buckets.get(key)
+            if cur == cid:
+                del buckets[key]
+            elif isinstance(cur, list):
+                try:
+                    cur.remove(cid)
+                except ValueError:
+                    continue
+                if len(cur) == 1:
+                    buckets[key] = cur[0]
+
+    def ids(self) -> List[str]:
+        return list(self._sigs)
+
+    def snapshot(self) -> Dict[str, int]:
+        shared = sum(1 for cur in self._buckets.values() if isinstance(cur, list))
+        return {"clips": len(self._sigs), "buckets": len(self._buckets), "shared_buckets": shared}
+
+    def signature_of(self, cid: str) -> Optional[Any]:
+        return self._sigs.get(cid)
+
+    def is_current(self, cid: str, key: Any) -> bool:
+        """cid 的簽章是否以 key 這份內容計算（尚未收錄時為 False）。"""
+        return cid in self._sigs and self._keys[cid] == key
+
+    def query(
+        self,
+        sig: Any,
+        threshold: float = DEFAULT_THRESHOLD,
+        exclude: Iterable[str] = (),
+    ) -> List[Tuple[str, float]]:
+        """回傳相似度 >= threshold 的 (id, 相似度)，由高到低排序。"""
+        if sig is None:
+            return []
+        skip = set(exclude)
+        seen = set()
+        buckets = self._buckets
+        for key in _band_keys(sig):
+            cur = buckets.get(key)
+            if cur is None:
+                continue
+            for cid in (cur,) if isinstance(cur, str) else cur:
+                if cid not in skip:
+                    seen.add(cid)
+        sigs = self._sigs
+        hits = []
+        for cid in seen:
+            sim = similarity(sig, sigs[cid])
+            if sim >= threshold:
+                hits.append((cid, sim))
+        hits.sort(key=lambda t: t[1], reverse=True)
+        return hits
+
+
+def build_index(entries: Iterable[Tuple[str, str, Any]]) -> NearDupIndex:
+    """由 (id, 內文, 內容鍵) 建立索引。"""
+    index = NearDupIndex()
+    for cid, text, key in entries:
+        index.add(cid, signature(text), key)
+    return index
+
+
+def build_index_async(clips: Sequence[ClipEntry], on_done: Callable[[NearDupIndex], None]) -> threading.Thread:
+    """在背景執行緒為 clips 中的文字項目建立索引，完成後在工作執行緒上呼叫 on_done(index)。"""
+
+    def work() -> None:
+        entries = []
+        for clip in clips:
+            text = clip_text(clip)
+            if text:
+                entries.append((clip.id, text, clip.content_key()))
+        on_done(build_index(entries))
+
+    thread = threading.Thread(target=work, name="LightClipNearDup", daemon=True)
+    thread.start()
+    return thread
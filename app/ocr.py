@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from . import perf
+
 try:
     from PIL import Image  # type: ignore[import]
     import pytesseract  # type: ignore[import]
@@ -10,6 +12,7 @@ except Exception:  # pragma: no cover
     pytesseract = None  # type: ignore[assignment]
 
 
+@perf.timed("ocr.image")
 def ocr_image(path: Path, lang_hint: str = "chi_tra+eng") -> str:
     """簡單的 OCR 包裝函式。"""
     if Image is None or pytesseract is None:
@@ -4,6 +4,8 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from . import perf
+
 try:
     from google.cloud import vision  # type: ignore[import]
 except Exception:
@@ -39,6 +41,7 @@ class OCREngine:
         except Exception:
             return None
 
+    @perf.timed("ocr.extract_text")
     def extract_text(self, image_path: Path) -> str:
         if not image_path.exists():
             return ""
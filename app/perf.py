@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# 模組層級旗標：關閉時 timed / timer / incr 只多一次布林判斷
+_enabled = False
+_log: Optional["RotatingJsonlLog"] = None
+
+
+class _Metric:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self, sample_size: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+
+
+def _percentile(sorted_samples, q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
+
+
+class PerfStats:
+    """各量測點的耗時（毫秒）與計數器；百分位數取最近 sample_size 筆樣本。"""
+
+    def __init__(self, sample_size: int = 1024) -> None:
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._counters: Dict[str, int] = {}
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = _Metric(self.sample_size)
+            m.count += 1
+            m.total += ms
+            if ms > m.max:
+                m.max = ms
+            m.samples.append(ms)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            timings = {}
+            for name, m in self._metrics.items():
+                samples = sorted(m.samples)
+                timings[name] = {
+                    "count": m.count,
+                    "mean_ms": m.total / m.count if m.count else 0.0,
+                    "p50_ms": _percentile(samples, 0.50),
+                    "p95_ms": _percentile(samples, 0.95),
+                    "max_ms": m.max,
+                }
+            return {"timings": timings, "counters": dict(self._counters)}
+
+
+class RotatingJsonlLog:
+    """一行一筆 JSON 的記錄檔，超過 max_bytes 時輪替為 .1 ~ .N。"""
+
+    def __init__(self, path: Path, max_bytes: int = 2 << 20, backups: int = 3) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                if self.path.exists() and self.path.stat().st_size + len(line) > self.max_bytes:
+                    self._rotate()
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError:
+                pass
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+
+stats = PerfStats()
+
+
+def configure(enabled: bool, log_path: Optional[Path] = None) -> None:
+    """開關量測；指定 log_path 時每次量測另外寫入 JSON lines 記錄檔。"""
+    global _enabled, _log
+    _enabled = bool(enabled)
+    _log = RotatingJsonlLog(log_path) if (enabled and log_path is not None) else None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def record(name: str, ms: float) -> None:
+    if not _enabled:
+        return
+    stats.record(name, ms)
+    log = _log
+    if log is not None:
+        log.write({"t": round(time.time(), 3), "name": name, "ms": round(ms, 3)})
+
+
+def incr(name: str, n: int = 1) -> None:
+    if _enabled:
+        stats.incr(name, n)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """函式裝飾器：啟用時記錄每次呼叫的耗時。"""
+
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - t0) * 1000)
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+class timer:
+    """with perf.timer("name"): ... 形式的量測區塊。"""
+
+    __slots__ = ("name", "_t0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._t0 = 0.0
+
+    def __enter__(self) -> "timer":
+        if _enabled:
+            self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if _enabled and self._t0:
+            record(self.name, (time.perf_counter() - self._t0) * 1000)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+def _stamp() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+class CpuProfiler:
+    """CPU 剖析。
+
+    mode="cprofile"：以 cProfile 完整記錄，輸出 .pstats 與依累計時間排序的文字摘要。
+    mode="sample"：背景執行緒每 interval 秒取樣主執行緒呼叫堆疊，輸出 collapsed stack
+    格式（可直接餵給 flamegraph.pl / speedscope），對程式本身幾乎沒有額外負擔。
+    window 大於 0 時只剖析啟動後的前 window 秒。
+    """
+
+    def __init__(self, out_dir: Path, mode: str = "cprofile", window: float = 0.0, interval: float = 0.005):
+        self.out_dir = out_dir
+        self.mode = mode
+        self.window = window
+        self.interval = interval
+        self._profile: Optional[cProfile.Profile] = None
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._target_ident = threading.main_thread().ident
+        self._done = False
+        self.output: Optional[Path] = None
+
+    def start(self) -> None:
+        if self.mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name="LightClipSampler", daemon=True)
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def _sample_loop(self) -> None:
+        deadline = time.perf_counter() + self.window if self.window > 0 else None
+        while not self._stop.wait(self.interval):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            frame = sys._current_frames().get(self._target_ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Optional[Path]:
+        """停止剖析並寫出結果檔，回傳主要輸出檔路徑；重複呼叫不會重複輸出。"""
+        if self._done:
+            return self.output
+        self._done = True
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = _stamp()
+        if self.mode == "sample":
+            self._stop.set()
+            if self._sampler is not None:
+                self._sampler.join(timeout=2)
+            self.output = self.out_dir / f"cpu-{stamp}.collapsed.txt"
+            with self.output.open("w", encoding="utf-8") as f:
+                for stack, count in self._samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            return self.output
+
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        self.output = self.out_dir / f"cpu-{stamp}.pstats"
+        self._profile.dump_stats(str(self.output))
+        buf = io.StringIO()
+        pstats.Stats(self._profile, stream=buf).sort_stats("cumulative").print_stats(60)
+        (self.out_dir / f"cpu-{stamp}.txt").write_text(buf.getvalue(), encoding="utf-8")
+        return self.output
+
+
+class MemProfiler:
+    """以 tracemalloc 在各階段取快照，記錄目前總量、峰值與相對上一個快照的前幾名差異。"""
+
+    def __init__(self, out_dir: Path, top: int = 25, frames: int = 10) -> None:
+        self.out_dir = out_dir
+        self.top = top
+        self.frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self.output = out_dir / f"mem-{_stamp()}.txt"
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def snapshot(self, label: str) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        snap = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"=== {datetime.now().isoformat(timespec='seconds')} {label} ===",
+            f"current: {current / 1024 / 1024:.2f} MiB   peak: {peak / 1024 / 1024:.2f} MiB",
+        ]
+        if self._previous is None:
+            lines.append(f"-- top {self.top} allocations --")
+            lines.extend(str(s) for s in snap.statistics("lineno")[: self.top])
+        else:
+            lines.append(f"-- top {self.top} diff vs previous snapshot --")
+            lines.extend(str(s) for s in snap.compare_to(self._previous, "lineno")[: self.top])
+            if self._baseline is not None and self._baseline is not self._previous:
+                lines.append(f"-- top {self.top} diff vs startup --")
+                lines.extend(str(s) for s in snap.compare_to(self._baseline, "lineno")[: self.top])
+        if self._baseline is None:
+            self._baseline = snap
+        self._previous = snap
+        with self.output.open("a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n\n")
+
+    def stop(self) -> Path:
+        self.snapshot("exit")
+        tracemalloc.stop()
+        return self.output
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .models import ClipEntry, ClipType
+
+
+def _file_name(path: str) -> str:
+    return (path or "").replace("\\", "/").rsplit("/", 1)[-1]
+
+
+class RetentionPolicy:
+    """歷史紀錄的保留原則；數值為 0 / 空表示不限制，釘選的項目一律保留。"""
+
+    def __init__(
+        self,
+        max_age_days: float = 0,
+        max_text_bytes: int = 0,
+        max_image_bytes: int = 0,
+        category_limits: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.max_age_days = max(0.0, float(max_age_days or 0))
+        self.max_text_bytes = max(0, int(max_text_bytes or 0))
+        self.max_image_bytes = max(0, int(max_image_bytes or 0))
+        self.category_limits = {
+            str(cat): int(n) for cat, n in (category_limits or {}).items() if int(n or 0) > 0
+        }
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "RetentionPolicy":
+        return cls(
+            settings.get("retention_max_age_days", 0),
+            settings.get("retention_max_text_bytes", 0),
+            settings.get("retention_max_image_bytes", 0),
+            settings.get("retention_category_limits") or {},
+        )
+
+    @property
+    def limits_items(self) -> bool:
+        return bool(self.max_age_days or self.max_text_bytes or self.max_image_bytes or self.category_limits)
+
+
+class Pruner:
+    """依保留原則分段清理歷史紀錄與被移除項目的圖片。
+
+    整個流程是一個產生器，每次 step 只執行 slice_ms 毫秒就交還控制權，
+    由呼叫端（GUI 的計時器）排程下一段，因此不會卡住剪貼簿擷取：
+      1. 由新到舊掃描快照，依年齡 / 分類上限 / 文字與圖片總量挑出要移除的項目；
+      2. 一次從 storage 移除（掃描期間被釘選或刪除的項目會略過）；
+      3. 逐一刪除剛被移除項目在 data/images 中的圖片（仍被其他項目參照的檔名保留）。
+    沒有設定任何限制時不做任何事。圖片只以檔名比對：路徑存的是絕對路徑，
+    資料夾搬移後與實際位置不同，不能據此判斷檔案是否還有人使用。
+    完成後 report 記錄回收的項目數與位元組數。
+    """
+
+    def __init__(self, storage, policy: RetentionPolicy, slice_ms: float = 4.0) -> None:
+        self.storage = storage
+        self.policy = policy
+        self.slice_ms = max(0.5, float(slice_ms))
+        self.report: Dict[str, Any] = {}
+        self._started = time.perf_counter()
+        self._work: Optional[Iterator[None]] = self._run()
+
+    @property
+    def done(self) -> bool:
+        return self._work is None
+
+    def step(self) -> bool:
+        """執行一段工作；還有剩餘工作時回傳 True。"""
+        if self._work is None:
+            return False
+        deadline = time.perf_counter() + self.slice_ms / 1000
+        try:
+            while time.perf_counter() < deadline:
+                next(self._work)
+        except StopIteration:
+            self._work = None
+            self.report["elapsed_ms"] = round((time.perf_counter() - self._started) * 1000, 1)
+            return False
+        return True
+
+    def run_to_end(self) -> Dict[str, Any]:
+        while self.step():
+            pass
+        return self.report
+
+    # ---------- work ----------
+    def _run(self) -> Iterator[None]:
+        report = self.report
+        report.update(
+            scanned=0,
+            removed=0,
+            removed_text_bytes=0,
+            removed_image_bytes=0,
+            files_deleted=0,
+            reasons={},
+        )
+        if not self.policy.limits_items:
+            return
+        snapshot: List[ClipEntry] = list(self.storage.clipboard_items)
+        victims: Dict[str, str] = {}
+        yield from self._scan(snapshot, victims)
+        if not victims:
+            return
+        removed = self.storage.remove_clipboard_items(victims)
+        reasons: Dict[str, int] = report["reasons"]
+        for clip in removed:
+            reason = victims[clip.id]
+            reasons[reason] = reasons.get(reason, 0) + 1
+            if clip.kind != ClipType.IMAGE:
+                report["removed_text_bytes"] += clip.body_size
+        report["removed"] = len(removed)
+        yield
+        yield from self._delete_images(removed)
+
+    def _scan(self, snapshot: List[ClipEntry], victims: Dict[str, str]) -> Iterator[None]:
+        policy = self.policy
+        cutoff = time.time() - policy.max_age_days * 86400 if policy.max_age_days else None
+        limits = policy.category_limits
+        per_category: Dict[str, int] = {}
+        text_total = 0
+        image_total = 0
+        category_of = self.storage.effective_category
+        report = self.report
+        # 由新到舊：越舊的項目越先超出上限
+        for n, clip in enumerate(snapshot):
+            if n & 63 == 0:
+                yield
+            report["scanned"] += 1
+            if clip.pinned:
+                continue
+            if cutoff is not None and 0 < clip.captured_at < cutoff:
+                victims[clip.id] = "age"
+                continue
+            if limits:
+                cat = category_of(clip)
+                limit = limits.get(cat)
+                if limit is not None:
+                    count = per_category.get(cat, 0) + 1
+                    per_category[cat] = count
+                    if count > limit:
+                        victims[clip.id] = "category"
+                        continue
+            if clip.kind == ClipType.IMAGE:
+                if policy.max_image_bytes:
+                    image_total += self._file_size(clip.image_path)
+                    if image_total > policy.max_image_bytes:
+                        victims[clip.id] = "image_bytes"
+            elif policy.max_text_bytes:
+                text_total += clip.body_size
+                if text_total > policy.max_text_bytes:
+                    victims[clip.id] = "text_bytes"
+
+    def _delete_images(self, removed: List[ClipEntry]) -> Iterator[None]:
+        names: Set[str] = {_file_name(clip.image_path) for clip in removed if clip.image_path}
+        names.discard("")
+        if not names:
+            return
+        # 同一張圖片可能被其他項目參照（合併、匯入），仍在使用的檔名不刪
+        for n, clip in enumerate(list(self.storage.clipboard_items)):
+            if clip.image_path:
+                names.discard(_file_name(clip.image_path))
+            if n & 1023 == 0:
+                yield
+        images_dir = Path(self.storage.data_dir) / "images"
+        for name in sorted(names):
+            yield
+            path = images_dir / name
+            try:
+                if not path.is_file():
+                    continue
+                size = path.stat().st_size
+            except OSError:
+                continue
+            if self._unlink(str(path)):
+                self.report["files_deleted"] += 1
+                self.report["removed_image_bytes"] += size
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path) if path else 0
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _unlink(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
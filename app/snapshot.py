@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+MAGIC = "lightclip-snapshot"
+_HEADER_MAX = 4096
+_CHUNK = 1 << 20
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """先寫到同目錄的暫存檔並 fsync，再以 os.replace 換掉目標檔；中途當機只會留下暫存檔。"""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path) -> None:
+    # rename 本身也要落盤；Windows 不支援對目錄 fsync，失敗時略過
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SnapshotStore:
+    """歷史紀錄快照：一行 JSON 檔頭（序號、長度、crc32）接著 JSON 內容。
+
+    每次儲存以 atomic_write 的方式寫入，並把前一份快照輪替成 <name>.1 … <name>.N。
+    載入時只讀各候選檔的檔頭，依序號由新到舊只對內容做 crc32 檢查，
+    通過的第一份才解析 JSON；沒有檔頭的舊版純 JSON 檔仍可直接載入。
+    所有候選都無法載入時，把它們改名為 <name>.corrupt-<時間> 保留下來，
+    避免之後的存檔輪替把還可能救回的檔案擠出去。
+    """
+
+    def __init__(self, path: Path, ring: int = 3) -> None:
+        self.path = path
+        self.ring = max(0, int(ring))
+        self.seq = 0
+        # 載入時實際採用的檔案（不是 path 本身代表曾經從較舊的快照復原）
+        self.loaded_from: Optional[Path] = None
+        self.rejected: List[str] = []
+        # 全部候選都無法載入時改名保留的檔案
+        self.quarantined: List[str] = []
+
+    @property
+    def recovered(self) -> bool:
+        return self.loaded_from is not None and self.loaded_from != self.path
+
+    def candidates(self) -> List[Path]:
+        return [self.path] + [self._ring_path(i) for i in range(1, self.ring + 1)]
+
+    def _ring_path(self, i: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{i}")
+
+    # ---------- 寫入 ----------
+    def save(self, obj: Any) -> None:
+        payload = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        self.seq += 1
+        header = {
+            "format": MAGIC,
+            "version": 1,
+            "seq": self.seq,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "length": len(payload),
+            "crc32": zlib.crc32(payload),
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._rotate()
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+
+    def _rotate(self) -> None:
+        if not self.ring or not self.path.exists():
+            return
+        for i in range(self.ring, 1, -1):
+            older = self._ring_path(i - 1)
+            if older.exists():
+                os.replace(older, self._ring_path(i))
+        os.replace(self.path, self._ring_path(1))
+
+    # ---------- 讀取 / 復原 ----------
+    def load(self, default: Any) -> Any:
+        self.loaded_from = None
+        self.rejected = []
+        self.quarantined = []
+        headed: List[Tuple[int, Path, Dict[str, Any]]] = []
+        legacy: List[Path] = []
+        for path in self.candidates():
+            if not path.exists():
+                continue
+            header = _read_header(path)
+            if header is None:
+                legacy.append(path)
+            else:
+                headed.append((int(header.get("seq", 0)), path, header))
+        if headed:
+            self.seq = max(seq for seq, _path, _header in headed)
+
+        headed.sort(key=lambda t: t[0], reverse=True)
+        for _seq, path, header in headed:
+            payload = _read_verified_payload(path, header)
+            if payload is None:
+                self.rejected.append(path.name)
+                continue
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                self.rejected.append(path.name)
+                continue
+            self.loaded_from = path
+            return data
+        # 舊版（沒有檔頭）的純 JSON
+        for path in legacy:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.rejected.append(path.name)
+                continue
+            self.loaded_from = path
+            return data
+        self._quarantine()
+        return default
+
+    def _quarantine(self) -> None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        for name in self.rejected:
+            src = self.path.with_name(name)
+            dst = self.path.with_name(f"{name}.corrupt-{stamp}")
+            try:
+                os.replace(src, dst)
+            except OSError:
+                continue
+            self.quarantined.append(dst.name)
+
+
+def _read_header(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            line = f.readline(_HEADER_MAX)
+    except OSError:
+        return None
+    if not line.startswith(b"{") or not line.endswith(b"\n"):
+        return None
+    try:
+        header = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("format") != MAGIC:
+        return None
+    header["_offset"] = len(line)
+    return header
+
+
+def _read_verified_payload(path: Path, header: Dict[str, Any]) -> Optional[bytes]:
+    """長度與 crc32 都相符時回傳內容；先比對檔案大小，不符就不必讀內容。"""
+    offset = header["_offset"]
+    length = int(header.get("length", -1))
+    try:
+        if path.stat().st_size != offset + length:
+            return None
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunks = []
+            crc = 0
+            while True:
+                chunk = f.read(_CHUNK)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                chunks.append(chunk)
+    except OSError:
+        return None
+    if crc != int(header.get("crc32", -1)):
+        return None
+    return b"".join(chunks)
@@ -1,9 +1,56 @@
-
 from __future__ import annotations
 
+import bisect
+import copy
 import json
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from . import perf
+from .classifier import DEFAULT_PREFIX_CHARS, DEFAULT_RULES, Classifier
+from .clip_columns import ClipColumns
+from .image_hash import DEFAULT_DUP_DISTANCE, ImageHashIndex
+from .models import ClipEntry, ClipType
+from .near_dup import DEFAULT_THRESHOLD, NearDupIndex, clip_text, signature
+from .snapshot import SnapshotStore, atomic_write_bytes
+
+ClipLike = Union[ClipEntry, Dict[str, Any]]
+
+# 模板快捷鍵 Ctrl+Shift+1 ~ 9
+TEMPLATE_SLOTS = 9
+# 整批取代歷史時，需要重算簽章的項目超過此數就改由背景重建近似重複索引
+NEAR_DUP_INLINE_LIMIT = 256
+
+
+class StorageSnapshot(NamedTuple):
+    """在 GUI 執行緒上複製的歷史 / 模板 / 設定，交給背景執行緒讀取。"""
+
+    items: List[ClipEntry]
+    templates: List[Dict[str, Any]]
+    settings: Dict[str, Any]
+
+
+def _modified_at(item: ClipEntry) -> str:
+    return item.updated_at or item.timestamp_iso
+
+
+def _touch(item: ClipEntry) -> None:
+    """記錄修改時間（釘選、改分類、合併近似重複），雲端合併時以此判斷哪一份較新。"""
+    item.updated_at = datetime.now().isoformat(timespec="seconds")
+
+
+def infer_category(item: ClipEntry) -> str:
+    """依類型推得預設分類。"""
+    if item.kind == ClipType.IMAGE:
+        return "圖片"
+    if item.kind == ClipType.FILE:
+        return "檔案"
+    return "文字"
+
+
+def _effective_category(item: ClipEntry) -> str:
+    return item.category or infer_category(item) or "未分類"
 
 
 class StorageManager:
@@ -14,15 +61,38 @@ class StorageManager:
         self.history_path = self.data_dir / "history.json"
         self.templates_path = self.data_dir / "templates.json"
         self.settings_path = self.data_dir / "settings.json"
+        # history.json 以含檢查碼的快照寫入，並保留前幾份快照供當機後復原
+        self.history_store = SnapshotStore(self.history_path)
+        self.last_save_error: Optional[str] = None
 
-        self.clipboard_items: List[Dict[str, Any]] = []
+        self.clipboard_items: List[ClipEntry] = []
         self.templates: List[Dict[str, Any]] = []
         self.settings: Dict[str, Any] = {}
+        # 模板每次變動就遞增；id 對照表與快捷鍵表依此判斷是否需要重建
+        self.templates_revision = 0
+        self._template_by_id: Optional[Dict[Any, Dict[str, Any]]] = None
+        self._template_slots: Tuple[int, Tuple[Optional[str], ...]] = (-1, ())
+        # save_all 完成後呼叫（例如自動同步排程器用來累計變更次數）
+        self.save_listeners: List[Callable[[], None]] = []
+        # 歷史紀錄每次變動就遞增，欄位式中繼資料依此判斷是否需要重建
+        self.revision = 0
+        self.columns = ClipColumns()
+        # id -> 項目，以及分類 -> 依擷取時間（新到舊）排序的 id 清單；隨新增 / 刪除 / 改分類增量維護
+        self._by_id: Dict[str, ClipEntry] = {}
+        self._category_index: Dict[str, List[str]] = {}
+        # 文字項目的近似重複索引；由 GUI 在背景建立後 install，整批取代歷史時失效（None）
+        self.near_dups: Optional[NearDupIndex] = None
+        self._last_sig: Optional[Tuple[Any, Any]] = None
+        # 圖片項目的 dHash 索引（雜湊存在項目上，隨 id 索引一起維護）
+        self.image_hashes = ImageHashIndex()
         self._load_all()
 
     # ---------- load / save ----------
     def _load_all(self) -> None:
-        self.clipboard_items = self._load_json(self.history_path, default=[])
+        raw_items = self.history_store.load(default=[])
+        if not isinstance(raw_items, list):
+            raw_items = []
+        self._replace_items([ClipEntry.from_dict(d) for d in raw_items if isinstance(d, dict)])
         self.templates = self._load_json(self.templates_path, default=[])
         self.settings = self._load_json(self.settings_path, default={})
 
@@ -32,15 +102,76 @@ class StorageManager:
         self.settings.setdefault("max_history", 100)
         self.settings.setdefault("global_hotkey_enabled", False)
         self.settings.setdefault("global_hotkey", "ctrl+shift+v")
+        self.settings.setdefault("template_hotkeys_enabled", True)
         self.settings.setdefault(
             "categories",
             ["文字", "圖片", "檔案", "未分類"],
         )
+        # 雲端匯出："ndjson"（串流、一行一筆）或舊版 "json"
+        self.settings.setdefault("cloud_export_format", "ndjson")
+        self.settings.setdefault("cloud_compression", "gzip")
+        # 上傳後端："google"（占位）、"local"（同步資料夾）或 "http"
+        self.settings.setdefault("cloud_backend", "google")
+        self.settings.setdefault("cloud_backend_dir", "")
+        self.settings.setdefault("cloud_backend_url", "")
+        # 背景自動匯出
+        self.settings.setdefault("auto_sync_enabled", False)
+        self.settings.setdefault("auto_sync_interval_min", 10)
+        self.settings.setdefault("auto_sync_after_changes", 0)
+        self.settings.setdefault("auto_sync_upload", False)
+        # 效能量測（診斷面板）與 JSON lines 記錄檔
+        self.settings.setdefault("perf_enabled", False)
+        self.settings.setdefault("perf_log_enabled", False)
+        # 規則式自動分類（擷取時執行一次，規則變更後可在背景重新分類）
+        self.settings.setdefault("classifier_enabled", True)
+        self.settings.setdefault("classifier_rules", [dict(r) for r in DEFAULT_RULES])
+        self.settings.setdefault("classifier_prefix_chars", DEFAULT_PREFIX_CHARS)
+        # 擷取佇列：dataChanged 後等待多少毫秒再批次處理
+        self.settings.setdefault("ingest_batch_ms", 50)
+        # 保留原則（0 / 空表示不限制，釘選項目不受影響），由背景清理器分段執行
+        self.settings.setdefault("retention_max_age_days", 0)
+        self.settings.setdefault("retention_max_text_bytes", 0)
+        self.settings.setdefault("retention_max_image_bytes", 0)
+        self.settings.setdefault("retention_category_limits", {})
+        self.settings.setdefault("retention_interval_min", 30)
+        self.settings.setdefault("retention_slice_ms", 4)
+        # 除了目前的 history.json 之外保留幾份較舊的快照
+        self.settings.setdefault("snapshot_ring_size", 3)
+        self.history_store.ring = max(0, int(self.settings.get("snapshot_ring_size", 3) or 0))
+        # 全域快捷鍵開啟的快速貼上視窗（釘選 + 最近幾筆），選取後自動送出 Ctrl+V
+        self.settings.setdefault("quick_paste_enabled", True)
+        self.settings.setdefault("quick_paste_count", 30)
+        self.settings.setdefault("quick_paste_auto_paste", True)
+        # 近似重複：擷取時把相似度達門檻的文字併入既有項目（舊內容留在版本堆疊）
+        self.settings.setdefault("near_dup_collapse", False)
+        self.settings.setdefault("near_dup_threshold", DEFAULT_THRESHOLD)
+        self.settings.setdefault("near_dup_max_versions", 10)
+        # 相同截圖：擷取時 dHash 距離在門檻內的圖片併入既有項目，不另存 PNG
+        self.settings.setdefault("image_dedup_collapse", False)
+        self.settings.setdefault("image_dedup_distance", DEFAULT_DUP_DISTANCE)
+        self.reload_classifier()
 
+    @perf.timed("storage.save_all")
     def save_all(self) -> None:
-        self._save_json(self.history_path, self.clipboard_items)
+        try:
+            self.history_store.save([it.to_dict() for it in self.clipboard_items])
+            self.last_save_error = None
+        except Exception as e:
+            # 寫入失敗時舊的快照仍完整保留，下次存檔再試
+            self.last_save_error = f"{self.history_path.name}: {e}"
+            perf.incr("storage.save_failed")
         self._save_json(self.templates_path, self.templates)
         self._save_json(self.settings_path, self.settings)
+        for listener in self.save_listeners:
+            listener()
+
+    def snapshot(self) -> StorageSnapshot:
+        """複製目前的資料（必須在 GUI 執行緒呼叫）；項目逐筆淺複製，內文字串共用不另佔記憶體。"""
+        return StorageSnapshot(
+            [it.copy() for it in self.clipboard_items],
+            copy.deepcopy(self.templates),
+            copy.deepcopy(self.settings),
+        )
 
     def _load_json(self, path: Path, default):
         if not path.exists():
@@ -52,46 +183,487 @@ class StorageManager:
 
     def _save_json(self, path: Path, data) -> None:
         try:
-            path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-        except Exception:
-            pass
+            atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+        except Exception as e:
+            self.last_save_error = f"{path.name}: {e}"
+            perf.incr("storage.save_failed")
 
     # ---------- clipboard ----------
-    def add_clipboard_item(self, item: Dict[str, Any]) -> None:
+    def add_clipboard_item(self, item: ClipLike) -> None:
         # 不覆蓋 pinned，將新項目加在最前方
-        self.clipboard_items.insert(0, item)
-        self._truncate_history()
+        entry = ClipEntry.coerce(item)
+        columns_fresh = self.columns.revision == self.revision
+        self.clipboard_items.insert(0, entry)
+        self._index_front(entry)
+        if self.near_dups is not None:
+            self.near_dups.add(entry.id, self._near_dup_signature(entry), entry.content_key())
+        before = self.clipboard_items
+        dropped = self._truncate_history()
+        for pos in dropped:
+            self._unindex(before[pos])
+        self.revision += 1
+        if columns_fresh:
+            self.columns.insert_front(entry, _effective_category, dropped, self.revision)
+
+    def set_clipboard_items(self, items: Iterable[ClipLike]) -> None:
+        """整批取代歷史紀錄（可傳入 dict 或 ClipEntry），不套用 max_history。"""
+        self._replace_items([ClipEntry.coerce(it) for it in items])
 
-    def _truncate_history(self) -> None:
+    def _replace_items(self, items: List[ClipEntry]) -> None:
+        self.clipboard_items = items
+        self.revision += 1
+        self._rebuild_index()
+        # 內容沒變（重新分類、大量刪除）或只變動少數項目時就地更新近似重複索引，否則交給背景重建
+        if self.near_dups is not None and not self._reconcile_near_dups(self.near_dups, NEAR_DUP_INLINE_LIMIT):
+            self.near_dups = None
+
+    # ---------- id / 分類索引 ----------
+    def _rebuild_index(self) -> None:
+        by_id: Dict[str, ClipEntry] = {}
+        index: Dict[str, List[str]] = {}
+        hashes = self.image_hashes
+        hashes.clear()
+        for it in self.clipboard_items:
+            by_id[it.id] = it
+            if it.kind == ClipType.IMAGE and it.extra:
+                value = it.image_hash
+                if value is not None:
+                    hashes.add(it.id, value)
+            cat = _effective_category(it)
+            ids = index.get(cat)
+            if ids is None:
+                index[cat] = [it.id]
+            else:
+                ids.append(it.id)
+        self._by_id = by_id
+        self._category_index = index
+
+    def _index_front(self, clip: ClipEntry) -> None:
+        self._by_id[clip.id] = clip
+        if clip.kind == ClipType.IMAGE:
+            value = clip.image_hash
+            if value is not None:
+                self.image_hashes.add(clip.id, value)
+        self._category_index.setdefault(_effective_category(clip), []).insert(0, clip.id)
+
+    def _unindex(self, clip: ClipEntry, category: Optional[str] = None) -> None:
+        if category is None:
+            if self._by_id.get(clip.id) is clip:
+                del self._by_id[clip.id]
+            if self.near_dups is not None:
+                self.near_dups.remove(clip.id)
+            self.image_hashes.remove(clip.id)
+            category = _effective_category(clip)
+        ids = self._category_index.get(category)
+        if ids is None:
+            return
+        try:
+            ids.remove(clip.id)
+        except ValueError:
+            return
+        if not ids:
+            del self._category_index[category]
+
+    def _index_move(self, clip: ClipEntry, old_category: str) -> None:
+        """項目改分類：從舊分類移除，依擷取時間插入新分類的對應位置。"""
+        new_category = _effective_category(clip)
+        if new_category == old_category:
+            return
+        self._unindex(clip, old_category)
+        ids = self._category_index.setdefault(new_category, [])
+        by_id = self._by_id
+        pos = bisect.bisect_left(
+            ids, -clip.captured_at, key=lambda cid: -by_id[cid].captured_at if cid in by_id else 0.0
+        )
+        ids.insert(pos, clip.id)
+
+    @staticmethod
+    def effective_category(clip: ClipEntry) -> str:
+        """分類頁 / 篩選使用的分類（空分類依類型推得）。"""
+        return _effective_category(clip)
+
+    def list_categories(self) -> List[Tuple[str, int]]:
+        """目前有項目的分類與其數量（依名稱排序）。"""
+        return sorted((cat, len(ids)) for cat, ids in self._category_index.items())
+
+    def get_category_items(self, category: str) -> List[ClipEntry]:
+        by_id = self._by_id
+        return [by_id[cid] for cid in self._category_index.get(category, ()) if cid in by_id]
+
+    def _truncate_history(self) -> List[int]:
+        """套用 max_history，回傳被移除項目原本的索引。"""
         max_hist = int(self.settings.get("max_history", 100))
         # 不計入 pinned，只針對未釘選的尾端項目裁切
-        new_list: List[Dict[str, Any]] = []
+        new_list: List[ClipEntry] = []
+        dropped: List[int] = []
         normal_count = 0
-        for it in self.clipboard_items:
-            if it.get("pinned"):
+        for pos, it in enumerate(self.clipboard_items):
+            if it.pinned:
                 new_list.append(it)
             else:
                 if normal_count < max_hist:
                     new_list.append(it)
                     normal_count += 1
+                else:
+                    dropped.append(pos)
         self.clipboard_items = new_list
+        return dropped
 
     def clear_history(self, keep_pinned: bool = True) -> None:
         if keep_pinned:
-            self.clipboard_items = [c for c in self.clipboard_items if c.get("pinned")]
+            self._replace_items([c for c in self.clipboard_items if c.pinned])
         else:
-            self.clipboard_items = []
+            self._replace_items([])
 
-    def get_clipboard_item(self, cid: str) -> Optional[Dict[str, Any]]:
-        for it in self.clipboard_items:
-            if it.get("id") == cid:
-                return it
-        return None
+    def get_clipboard_item(self, cid: str) -> Optional[ClipEntry]:
+        return self._by_id.get(cid)
 
     def delete_clipboard_item(self, cid: str) -> None:
-        self.clipboard_items = [c for c in self.clipboard_items if c.get("id") != cid]
+        clip = self._by_id.get(cid)
+        if clip is None:
+            return
+        self.clipboard_items.remove(clip)
+        self._unindex(clip)
+        self.revision += 1
+
+    def remove_clipboard_items(self, ids: Iterable[str], keep_pinned: bool = True) -> List[ClipEntry]:
+        """一次移除多筆項目（預設保留釘選的項目），回傳實際移除的項目；不會自動存檔。"""
+        drop = ids if isinstance(ids, (set, frozenset, dict)) else set(ids)
+        kept: List[ClipEntry] = []
+        removed: List[ClipEntry] = []
+        for it in self.clipboard_items:
+            if it.id in drop and not (keep_pinned and it.pinned):
+                removed.append(it)
+            else:
+                kept.append(it)
+        if not removed:
+            return removed
+        if len(removed) > 64:
+            # 大量移除時整個重建索引，比逐筆從分類清單中移除快
+            self._replace_items(kept)
+        else:
+            self.clipboard_items = kept
+            for clip in removed:
+                self._unindex(clip)
+            self.revision += 1
+        return removed
+
+    # ---------- 近似重複 ----------
+    def install_near_dups(self, index: NearDupIndex) -> None:
+        """採用背景建立的索引，並補上建立期間新增 / 移除 / 內容被取代的項目。"""
+        self._reconcile_near_dups(index)
+        self.near_dups = index
+
+    def _reconcile_near_dups(self, index: NearDupIndex, limit: Optional[int] = None) -> bool:
+        """讓 index 與目前的歷史一致；需要重算簽章的項目超過 limit 時不做任何修改並回傳 False。"""
+        by_id = self._by_id
+        stale = [
+            clip
+            for clip in self.clipboard_items
+            if clip.kind == ClipType.TEXT and clip.body_size and not index.is_current(clip.id, clip.content_key())
+        ]
+        if limit is not None and len(stale) > limit:
+            return False
+        for cid in [cid for cid in index.ids() if cid not in by_id]:
+            index.remove(cid)
+        for clip in stale:
+            index.add(clip.id, self._near_dup_signature(clip), clip.content_key())
+        return True
+
+    def _near_dup_signature(self, clip: ClipEntry):
+        text = clip_text(clip)
+        if not text:
+            return None
+        key = clip.content_key()
+        # 擷取時先查詢再新增，同一段內容的簽章只算一次
+        if self._last_sig is not None and self._last_sig[0] == key:
+            return self._last_sig[1]
+        sig = signature(text)
+        self._last_sig = (key, sig)
+        return sig
+
+    def find_near_duplicates(
+        self, clip: ClipEntry, threshold: Optional[float] = None
+    ) -> List[Tuple[ClipEntry, float]]:
+        """與 clip 相似的其他文字項目與估計相似度（高到低）；索引尚未建立時回傳空清單。"""
+        index = self.near_dups
+        if index is None:
+            return []
+        sig = index.signature_of(clip.id)
+        if sig is None:
+            sig = self._near_dup_signature(clip)
+        if threshold is None:
+            threshold = float(self.settings.get("near_dup_threshold", DEFAULT_THRESHOLD))
+        by_id = self._by_id
+        return [(by_id[cid], sim) for cid, sim in index.query(sig, threshold, (clip.id,)) if cid in by_id]
+
+    def collapse_near_duplicate(self, clip: ClipEntry) -> Optional[ClipEntry]:
+        """若已有相似的未釘選文字項目，把 clip 併入該項目並移到最前方，回傳該項目；否則回傳 None。
+
+        舊內文推入該項目的版本堆疊（內容完全相同時只更新擷取時間）；分類除非是手動指定，
+        否則改用 clip 的分類。不會自動存檔。
+        """
+        target = next((c for c, _sim in self.find_near_duplicates(clip) if not c.pinned), None)
+        if target is None:
+            return None
+        self.delete_clipboard_item(target.id)
+        if target.content_key() == clip.content_key():
+            # 完全相同的內容（例如複製 A、B 後又複製 A）：只更新擷取時間，不推入重複的版本
+            target.take_timestamp(clip)
+        else:
+            target.push_version(int(self.settings.get("near_dup_max_versions", 10) or 1))
+            target.take_content(clip)
+            if not target.category_manual:
+                target.set_category(clip.category)
+        _touch(target)
+        self.add_clipboard_item(target)
+        return target
+
+    # ---------- 相似截圖 ----------
+    def set_image_hashes(self, values: Dict[str, int]) -> int:
+        """記錄背景計算的 dHash，回傳實際更新的項目數（需要存檔才會保存）。"""
+        changed = 0
+        for cid, value in values.items():
+            clip = self._by_id.get(cid)
+            if clip is None or clip.kind != ClipType.IMAGE:
+                continue
+            clip.image_hash = value
+            self.image_hashes.add(cid, value)
+            changed += 1
+        return changed
+
+    def unhashed_image_items(self) -> List[ClipEntry]:
+        """尚未計算 dHash 的圖片項目（例如舊版歷史或雲端合併進來的項目）。"""
+        return [c for c in self.filter_clipboard_items(kinds=(ClipType.IMAGE,)) if c.image_hash is None]
+
+    def find_similar_images(self, value: int, max_distance: int, exclude: Iterable[str] = ()) -> List[Tuple[ClipEntry, int]]:
+        """dHash 距離 <= max_distance 的圖片項目與距離（近到遠）。"""
+        by_id = self._by_id
+        return [(by_id[cid], d) for cid, d in self.image_hashes.query(value, max_distance, exclude) if cid in by_id]
+
+    def collapse_near_duplicate_image(self, value: int, when: Optional[datetime] = None) -> Optional[ClipEntry]:
+        """若已有幾乎相同的未釘選圖片，把它更新為這次擷取的時間並移到最前方後回傳；否則回傳 None。"""
+        distance = int(self.settings.get("image_dedup_distance", DEFAULT_DUP_DISTANCE))
+        target = next((c for c, _d in self.find_similar_images(value, distance) if not c.pinned), None)
+        if target is None:
+            return None
+        self.delete_clipboard_item(target.id)
+        target.stamp(when or datetime.now())
+        _touch(target)
+        self.add_clipboard_item(target)
+        return target
+
+    def set_pinned(self, cid: str, pinned: bool) -> Optional[ClipEntry]:
+        return self._update_clip(cid, lambda clip: setattr(clip, "pinned", bool(pinned)))
+
+    def set_pinned_many(self, ids: Iterable[str], pinned: bool) -> List[ClipEntry]:
+        return self.update_clips(ids, lambda clip: setattr(clip, "pinned", bool(pinned)))
+
+    def set_category_many(self, ids: Iterable[str], category: str, manual: bool = True) -> List[ClipEntry]:
+        def change(clip: ClipEntry) -> None:
+            clip.set_category(category)
+            clip.category_manual = manual
+
+        return self.update_clips(ids, change)
+
+    def set_category(self, cid: str, category: str, manual: bool = True) -> Optional[ClipEntry]:
+        """變更分類；manual=True（使用者指定）時之後的自動重新分類不會覆蓋。"""
+
+        def change(clip: ClipEntry) -> None:
+            clip.set_category(category)
+            clip.category_manual = manual
+
+        return self._update_clip(cid, change)
+
+    # ---------- 自動分類 ----------
+    def reload_classifier(self) -> None:
+        """依設定重新編譯分類規則，並把規則用到的分類加入分類清單。"""
+        self.classifier = Classifier.from_settings(self.settings)
+        cats = self.settings.setdefault("categories", [])
+        for cat in self.classifier.categories:
+            if cat not in cats:
+                cats.append(cat)
+
+    def classify_clip(self, clip: ClipEntry) -> str:
+        """文字項目套用規則，其餘（或沒有規則符合時）依類型推得分類。"""
+        if clip.kind == ClipType.TEXT:
+            cat = self.classifier.classify(clip)
+            if cat:
+                return cat
+        return infer_category(clip)
+
+    def apply_categories(self, changes: Dict[str, str]) -> int:
+        """套用背景重新分類的結果（略過期間被手動改分類或已刪除的項目），回傳變更數。"""
+        changed = 0
+        for cid, cat in changes.items():
+            clip = self._by_id.get(cid)
+            if clip is None or clip.category_manual or clip.category == cat:
+                continue
+            clip.set_category(cat)
+            changed += 1
+        if changed:
+            self._replace_items(self.clipboard_items)
+        return changed
+
+    def update_clips(self, ids: Iterable[str], change: Callable[[ClipEntry], None]) -> List[ClipEntry]:
+        """對多筆項目套用 change，索引只更新一次，回傳實際套用的項目；不會自動存檔。"""
+        by_id = self._by_id
+        clips = [by_id[cid] for cid in dict.fromkeys(ids) if cid in by_id]
+        if len(clips) <= 8:
+            for clip in clips:
+                self._update_clip(clip.id, change)
+            return clips
+        # 多筆時直接重建 id / 分類索引（欄位式中繼資料隨 revision 失效後重算），比逐筆移動快
+        for clip in clips:
+            change(clip)
+            _touch(clip)
+        self.revision += 1
+        self._rebuild_index()
+        return clips
+
+    def _update_clip(self, cid: str, change: Callable[[ClipEntry], None]) -> Optional[ClipEntry]:
+        clip = self._by_id.get(cid)
+        if clip is None:
+            return None
+        columns_fresh = self.columns.revision == self.revision
+        old_category = _effective_category(clip)
+        change(clip)
+        _touch(clip)
+        self._index_move(clip, old_category)
+        self.revision += 1
+        if columns_fresh:
+            self.columns.update(self.clipboard_items.index(clip), clip, _effective_category, self.revision)
+        return clip
+
+    def search_clipboard_items(self, term: str) -> List[ClipEntry]:
+        """以不分大小寫的子字串比對 preview（沒有時用 full_text）。"""
+        term = term.strip().lower()
+        if not term:
+            return list(self.clipboard_items)
+        return [
+            it
+            for it in self.clipboard_items
+            if term in (it.preview or it.full_text).lower()
+        ]
+
+    def filter_clipboard_items(
+        self,
+        term: str = "",
+        kinds: Optional[Iterable[int]] = None,
+        since: Optional[float] = None,
+        category: Optional[str] = None,
+        pinned: Optional[bool] = None,
+    ) -> List[ClipEntry]:
+        """先以欄位式中繼資料（類型 / 時間 / 分類 / 釘選）篩選，再對剩下的項目做文字搜尋。
+
+        since 為 epoch 秒；category 以 group_by_category 相同的規則比對（空分類依類型推得）。
+        """
+        items = self.clipboard_items
+        if kinds is None and since is None and category is None and pinned is None:
+            # 沒有中繼資料條件時不必建立欄位陣列
+            matched = items
+        else:
+            cols = self.columns
+            if cols.revision != self.revision or cols.size != len(items):
+                cols.rebuild(items, _effective_category, self.revision)
+            idx = cols.select(kinds=kinds, since=since, category=category, pinned=pinned)
+            matched = [items[i] for i in idx]
+
+        term = term.strip().lower()
+        if not term:
+            return list(matched)
+        return [it for it in matched if term in (it.preview or it.full_text).lower()]
+
+    def filter_clipboard_ids(self, term: str = "", **filters: Any) -> List[str]:
+        """與 filter_clipboard_items 相同的條件，只回傳 id（依顯示順序），供列表分頁載入。"""
+        return [it.id for it in self.filter_clipboard_items(term, **filters)]
+
+    def get_category_ids(self, category: str) -> List[str]:
+        return list(self._category_index.get(category, ()))
+
+    def get_items_by_ids(self, ids: Iterable[str]) -> List[ClipEntry]:
+        """依 id 取出項目（保持順序，已刪除的 id 略過）。"""
+        by_id = self._by_id
+        return [by_id[cid] for cid in ids if cid in by_id]
+
+    def group_by_category(self) -> Dict[str, List[ClipEntry]]:
+        return {cat: self.get_category_items(cat) for cat in self._category_index}
+
+    def merge_clipboard_items(self, incoming: Iterable[ClipLike]) -> Dict[str, int]:
+        """將外部（雲端匯出或差異串流）的項目合併進歷史紀錄。
+
+        先以 id、再以內容雜湊比對，只走訪一次；同一筆項目整筆（含釘選狀態）取修改時間較新者。
+        合併後依擷取時間排序並套用 max_history，不會自動存檔。
+        """
+        merged: List[ClipEntry] = list(self.clipboard_items)
+        by_id: Dict[Any, int] = {}
+        by_content: Dict[Any, int] = {}
+        for pos, it in enumerate(merged):
+            by_id[it.id] = pos
+            by_content.setdefault(it.content_key(), pos)
+
+        stats = {"added": 0, "updated": 0, "unchanged": 0}
+        for raw in incoming:
+            rec = ClipEntry.coerce(raw)
+            key = rec.content_key()
+            pos = by_id.get(rec.id)
+            if pos is None:
+                pos = by_content.get(key)
+            if pos is None:
+                by_id[rec.id] = len(merged)
+                by_content.setdefault(key, len(merged))
+                merged.append(rec)
+                stats["added"] += 1
+                continue
+
+            cur = merged[pos]
+            if _modified_at(rec) > _modified_at(cur):
+                new = rec.copy() if rec is raw else rec
+                new.id = cur.id
+                merged[pos] = new
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+
+        if stats["added"] or stats["updated"]:
+            # 依擷取時間排序（釘選、改分類不改變位置）；穩定排序：沒有時間戳記的項目維持原本相對順序
+            merged.sort(key=lambda it: it.timestamp_iso, reverse=True)
+        self.clipboard_items = merged
+        self._truncate_history()
+        self._replace_items(self.clipboard_items)
+        return stats
 
     # ---------- templates ----------
+    def _templates_changed(self) -> None:
+        self.templates_revision += 1
+        self._template_by_id = None
+
+    def get_template(self, tid: Any) -> Optional[Dict[str, Any]]:
+        by_id = self._template_by_id
+        if by_id is None:
+            by_id = self._template_by_id = {t.get("id"): t for t in self.templates}
+        return by_id.get(tid)
+
+    def template_slots(self) -> Tuple[Optional[str], ...]:
+        """快捷鍵表：索引 1 ~ TEMPLATE_SLOTS 對應綁定模板的內容（索引 0 不使用，未綁定為 None）。
+
+        只有模板變動後第一次呼叫時重建，快捷鍵觸發時直接以索引取出內容。
+        """
+        revision, slots = self._template_slots
+        if revision == self.templates_revision:
+            return slots
+        table: List[Optional[str]] = [None] * (TEMPLATE_SLOTS + 1)
+        for tpl in self.templates:
+            try:
+                index = int(tpl.get("hotkey_index") or 0)
+            except (TypeError, ValueError):
+                continue
+            if 1 <= index <= TEMPLATE_SLOTS and table[index] is None:
+                table[index] = tpl.get("content", "")
+        slots = tuple(table)
+        self._template_slots = (self.templates_revision, slots)
+        return slots
+
     def upsert_template(self, tpl: Dict[str, Any]) -> None:
         tid = tpl.get("id")
         for i, t in enumerate(self.templates):
@@ -100,6 +672,28 @@ class StorageManager:
                 break
         else:
             self.templates.append(tpl)
+        slot = tpl.get("hotkey_index")
+        if slot:
+            # 一個快捷鍵只綁定一個模板：其他模板的相同綁定改為未綁定
+            for t in self.templates:
+                if t is not tpl and t.get("hotkey_index") == slot:
+                    t["hotkey_index"] = None
+        self._templates_changed()
+
+    def merge_templates(self, incoming: Iterable[Dict[str, Any]]) -> int:
+        """加入本機沒有的模板（以 id 判斷），回傳新增數量。"""
+        known = {t.get("id") for t in self.templates}
+        added = 0
+        for tpl in incoming:
+            if tpl.get("id") in known:
+                continue
+            self.templates.append(tpl)
+            known.add(tpl.get("id"))
+            added += 1
+        if added:
+            self._templates_changed()
+        return added
 
     def delete_template(self, tid: str) -> None:
         self.templates = [t for t in self.templates if t.get("id") != tid]
+        self._templates_changed()
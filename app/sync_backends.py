@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class SyncBackend:
+    """雲端同步後端介面。
+
+    upload_files 接收匯出檔清單與其根目錄（通常是 cloud 資料夾），
+    以相對路徑上傳，回傳 {"uploaded", "skipped", "failed", "bytes"} 統計。
+    """
+
+    name = "base"
+
+    def __init__(self) -> None:
+        # (路徑, 大小, mtime) -> sha256
+        self._hash_cache: Dict[Tuple[str, int, int], str] = {}
+
+    def upload_files(self, files: Iterable[Path], root: Path) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def _hash(self, path: Path) -> str:
+        st = path.stat()
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        digest = self._hash_cache.get(key)
+        if digest is None:
+            digest = file_sha256(path)
+            self._hash_cache[key] = digest
+        return digest
+
+    @staticmethod
+    def _relpath(path: Path, root: Path) -> str:
+        try:
+            return path.resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            return path.name
+
+
+class LocalDirBackend(SyncBackend):
+    """同步到本機資料夾（例如 Dropbox / OneDrive 的同步目錄）。
+
+    目標資料夾內的 .lightclip_manifest.json 記錄每個檔案的 sha256，
+    內容沒變的檔案不會再複製一次。
+    """
+
+    name = "local"
+    MANIFEST = ".lightclip_manifest.json"
+
+    def __init__(self, target_dir: Path) -> None:
+        super().__init__()
+        self.target_dir = target_dir
+
+    def _load_manifest(self) -> Dict[str, str]:
+        path = self.target_dir / self.MANIFEST
+        if not path.exists():
+            return {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def upload_files(self, files: Iterable[Path], root: Path) -> Dict[str, int]:
+        self.target_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+        report = {"uploaded": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        for path in files:
+            rel = self._relpath(path, root)
+            dest = self.target_dir / rel
+            try:
+                digest = self._hash(path)
+                if manifest.get(rel) == digest and dest.exists():
+                    report["skipped"] += 1
+                    continue
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dest.with_name(dest.name + ".part")
+                shutil.copyfile(path, tmp)
+                os.replace(tmp, dest)
+            except OSError:
+                report["failed"] += 1
+                continue
+            manifest[rel] = digest
+            report["uploaded"] += 1
+            report["bytes"] += dest.stat().st_size
+
+        (self.target_dir / self.MANIFEST).write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        return report
+
+
+class HttpBackend(SyncBackend):
+    """以 HTTP 分段上傳，可中斷續傳、多檔平行，並略過伺服器端已相同的檔案。
+
+    通訊協定（可用 app.sync_server 的本機替身伺服器測試）：
+
+    - GET  {base}/status/{rel}?sha256=...  -> {"sha256": 伺服器上的雜湊或 null,
+      "received": 此雜湊已收到的位元組數}
+    - PUT  {base}/upload/{rel}?sha256=...&total=...，標頭
+      Content-Range: bytes start-end/total；位移不符時回 409 與正確的 received。
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str = "",
+        chunk_size: int = 4 << 20,
+        max_workers: int = 4,
+        retries: int = 3,
+        timeout: float = 30.0,
+    ) -> None:
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+
+    def upload_files(self, files: Iterable[Path], root: Path) -> Dict[str, int]:
+        jobs: List[Tuple[Path, str]] = [(p, self._relpath(p, root)) for p in files]
+        report = {"uploaded": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            for state, sent in pool.map(lambda job: self._upload_one(*job), jobs):
+                report[state] += 1
+                report["bytes"] += sent
+        return report
+
+    # ---------- internals ----------
+    def _request(
+        self,
+        method: str,
+        url: str,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+        if self.token:
+            req.add_header("Authorization", f"Bearer {self.token}")
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            body = resp.read()
+        return json.loads(body.decode("utf-8")) if body else {}
+
+    def _upload_one(self, path: Path, rel: str) -> Tuple[str, int]:
+        try:
+            digest = self._hash(path)
+            size = path.stat().st_size
+            query = f"sha256={digest}&total={size}"
+            status = self._request("GET", f"{self.base_url}/status/{quote(rel)}?{query}")
+        except (OSError, ValueError):
+            return "failed", 0
+        if status.get("sha256") == digest:
+            return "skipped", 0
+
+        url = f"{self.base_url}/upload/{quote(rel)}?{query}"
+        offset = min(int(status.get("received") or 0), size)
+        sent = 0
+        attempts = 0
+        try:
+            with path.open("rb") as f:
+                while True:
+                    f.seek(offset)
+                    chunk = f.read(self.chunk_size)
+                    if chunk:
+                        content_range = f"bytes {offset}-{offset + len(chunk) - 1}/{size}"
+                    else:
+                        content_range = f"bytes */{size}"
+                    try:
+                        result = self._request("PUT", url, chunk, {"Content-Range": content_range})
+                    except urllib.error.HTTPError as e:
+                        if e.code != 409 or attempts >= self.retries:
+                            raise
+                        # 伺服器進度與本機不同步：從伺服器回報的位移重新開始
+                        attempts += 1
+                        offset = int(json.loads(e.read().decode("utf-8")).get("received", 0))
+                        continue
+                    except (urllib.error.URLError, OSError):
+                        if attempts >= self.retries:
+                            raise
+                        attempts += 1
+                        time.sleep(0.5 * attempts)
+                        continue
+                    attempts = 0
+                    offset += len(chunk)
+                    sent += len(chunk)
+                    if result.get("complete") or offset >= size:
+                        break
+        except (OSError, ValueError):
+            return "failed", sent
+        return "uploaded", sent
+
+
+def create_backend(settings: Dict[str, Any], base_dir: Path) -> SyncBackend:
+    """依 settings["cloud_backend"] 建立同步後端（local / http / google）。"""
+    kind = settings.get("cloud_backend", "google")
+    if kind == "local":
+        target = settings.get("cloud_backend_dir") or str(base_dir / "cloud_mirror")
+        return LocalDirBackend(Path(target))
+    if kind == "http":
+        return HttpBackend(
+            settings.get("cloud_backend_url", ""),
+            token=settings.get("cloud_backend_token", ""),
+        )
+    from .google_sync import GoogleDriveSync
+
+    return GoogleDriveSync(base_dir)
@@ -0,0 +1,176 @@
+"""HttpBackend 的本機替身伺服器，方便在沒有真實雲端服務時開發與測試。
+
+    python -m app.sync_server --root ./cloud_server --port 8765
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from .sync_backends import file_sha256
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_SyncHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _reply(self, code: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parse(self, prefix: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        parsed = urlparse(self.path)
+        if not parsed.path.startswith(prefix):
+            return None
+        rel = unquote(parsed.path[len(prefix):])
+        parts = Path(rel).parts
+        if not rel or ".." in parts or Path(rel).is_absolute():
+            return None
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        return rel, query
+
+    def do_GET(self) -> None:
+        parsed = self._parse("/status/")
+        if parsed is None:
+            self._reply(404, {"error": "not found"})
+            return
+        rel, query = parsed
+        srv = self.server
+        with srv.lock:
+            stored = srv.stored_sha(rel)
+            partial = srv.partial_path(rel, query.get("sha256", ""))
+            received = partial.stat().st_size if partial.exists() else 0
+        self._reply(200, {"sha256": stored, "received": received})
+
+    def do_PUT(self) -> None:
+        parsed = self._parse("/upload/")
+        if parsed is None:
+            self._reply(404, {"error": "not found"})
+            return
+        rel, query = parsed
+        digest = query.get("sha256", "")
+        try:
+            total = int(query.get("total", "0"))
+            length = int(self.headers.get("Content-Length") or 0)
+            unit, _, spec = (self.headers.get("Content-Range") or "").partition(" ")
+            span = spec.split("/", 1)[0]
+            start = 0 if span == "*" else int(span.split("-", 1)[0])
+        except ValueError:
+            self._reply(400, {"error": "bad range"})
+            return
+        body = self.rfile.read(length) if length else b""
+
+        srv = self.server
+        srv.requests += 1
+        with srv.lock:
+            partial = srv.partial_path(rel, digest)
+            received = partial.stat().st_size if partial.exists() else 0
+            if start != received:
+                self._reply(409, {"received": received})
+                return
+            partial.parent.mkdir(parents=True, exist_ok=True)
+            with partial.open("ab") as f:
+                f.write(body)
+            received += len(body)
+            srv.bytes_received += len(body)
+            if received < total:
+                self._reply(202, {"received": received})
+                return
+            if file_sha256(partial) != digest:
+                partial.unlink()
+                self._reply(422, {"error": "checksum mismatch", "received": 0})
+                return
+            dest = srv.root / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial, dest)
+            srv.set_stored_sha(rel, digest)
+        self._reply(200, {"received": received, "complete": True})
+
+
+class _SyncHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], root: Path) -> None:
+        super().__init__(addr, _Handler)
+        self.root = root
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_received = 0
+
+    def partial_path(self, rel: str, digest: str) -> Path:
+        key = hashlib.sha1(f"{rel}\0{digest}".encode("utf-8")).hexdigest()
+        return self.root / ".partial" / key
+
+    def _meta_path(self, rel: str) -> Path:
+        return self.root / ".meta" / (rel + ".sha256")
+
+    def stored_sha(self, rel: str) -> Optional[str]:
+        meta = self._meta_path(rel)
+        if not meta.exists() or not (self.root / rel).exists():
+            return None
+        return meta.read_text(encoding="utf-8").strip() or None
+
+    def set_stored_sha(self, rel: str, digest: str) -> None:
+        meta = self._meta_path(rel)
+        meta.parent.mkdir(parents=True, exist_ok=True)
+        meta.write_text(digest, encoding="utf-8")
+
+
+class StandInSyncServer:
+    """在背景執行緒啟動的替身伺服器；port=0 代表自動挑選可用連接埠。"""
+
+    def __init__(self, root: Path, host: str = "127.0.0.1", port: int = 0) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        self._httpd = _SyncHTTPServer((host, port), root)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self._httpd.requests, "bytes_received": self._httpd.bytes_received}
+
+    def start(self) -> "StandInSyncServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LightClip sync stand-in server")
+    parser.add_argument("--root", default="cloud_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = StandInSyncServer(Path(args.root), args.host, args.port)
+    print(f"serving {Path(args.root).resolve()} at {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from typing import Dict, List
 
 import os
 
+from . import perf
+
 try:  # 避免沒裝套件時整個程式壞掉
     import argostranslate.translate as argos_translate  # type: ignore[import]
     import argostranslate.package as argos_package  # type: ignore[import]
@@ -47,6 +49,7 @@ class Translator:
         items.sort(key=lambda x: (0 if x.code == "auto" else 1, x.name))
         return items
 
+    @perf.timed("translate.argos")
     def translate(self, text: str, src: str, tgt: str) -> str:
         text = text or ""
         if not text.strip():
@@ -3,6 +3,8 @@ from __future__ import annotations
 import os
 from typing import Optional
 
+from . import perf
+
 try:
     from openai import OpenAI  # type: ignore[import]
 except Exception:
@@ -23,6 +25,7 @@ class Translator:
             except Exception:
                 self._client = None
 
+    @perf.timed("translate.openai")
     def translate(self, text: str, target_lang: str = "zh-TW") -> str:
         text = (text or "").strip()
         if not text:
@@ -0,0 +1,180 @@
+"""LightClipWindow 的離屏（offscreen）效能測試。
+
+以合成歷史建立 StorageManager，在 QT_QPA_PLATFORM=offscreen 下啟動主視窗，量測：
+首次繪製時間、refresh_clipboard_lists、單筆剪貼簿變更與連續變更、搜尋逐字輸入、捲動分頁載入、
+分頁切換與視窗縮放。
+
+    python benchmarks/bench_gui.py --sizes 100 1000 5000 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QEvent, QObject  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from app.language import LanguageManager  # noqa: E402
+from app.storage import StorageManager  # noqa: E402
+from app.theme import ThemeManager  # noqa: E402
+from benchmarks.common import measure, new_report, print_timings, summarize, write_report  # noqa: E402
+from benchmarks.synthetic import generate_history  # noqa: E402
+
+SEARCH_TYPING = "error log"
+
+
+class _PaintWatcher(QObject):
+    def __init__(self) -> None:
+        super().__init__()
+        self.painted_at: float = 0.0
+
+    def eventFilter(self, obj, event) -> bool:  # noqa: N802
+        if event.type() == QEvent.Type.Paint and not self.painted_at:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def pump(app: QApplication, until=None, timeout: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout
+    app.processEvents()
+    while until is not None and not until() and time.perf_counter() < deadline:
+        app.processEvents()
+
+
+def bench_size(app: QApplication, main_mod, n: int, repeat: int, seed: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        storage = StorageManager(base)
+        storage.settings["max_history"] = n
+        storage.settings["global_hotkey_enabled"] = False
+        history = generate_history(n, seed=seed, max_size=50_000, images_dir=base / "data" / "images")
+        storage.set_clipboard_items(history)
+        lang_mgr = LanguageManager(base)
+        theme_mgr = ThemeManager()
+        res: Dict[str, Any] = {"items": n}
+
+        watcher = _PaintWatcher()
+        app.installEventFilter(watcher)
+        t0 = time.perf_counter()
+        win = main_mod.LightClipWindow(storage, lang_mgr, theme_mgr, base)
+        res["construct_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        win.show()
+        pump(app, until=lambda: watcher.painted_at > 0)
+        app.removeEventFilter(watcher)
+        res["first_paint_ms"] = round((watcher.painted_at - t0) * 1000, 3) if watcher.painted_at else None
+
+        res["refresh_clipboard_lists"] = measure(lambda: (win.refresh_clipboard_lists(), pump(app)), repeat)
+
+        # 透過系統剪貼簿觸發 on_clipboard_changed，直到新項目出現在 storage 為止
+        clip_samples: List[float] = []
+        cb = QApplication.clipboard()
+        for i in range(max(repeat, 5)):
+            text = f"bench clip {n}-{i}-{time.perf_counter()}"
+            t0 = time.perf_counter()
+            cb.setText(text)
+            pump(
+                app,
+                until=lambda: bool(storage.clipboard_items)
+                and storage.clipboard_items[0].full_text == text,
+            )
+            clip_samples.append((time.perf_counter() - t0) * 1000)
+        res["on_clipboard_changed"] = summarize(clip_samples)
+
+        # 自動化情境：連續 100 次變更（每次重複觸發兩次），量測到全部進入 storage 為止
+        burst_samples: List[float] = []
+        for r in range(repeat):
+            texts = [f"burst {n}-{r}-{i}-{time.perf_counter()}" for i in range(100)]
+            t0 = time.perf_counter()
+            for text in texts:
+                cb.setText(text)
+                cb.setText(text)
+            pump(app, until=lambda: storage.clipboard_items[0].full_text == texts[-1])
+            burst_samples.append((time.perf_counter() - t0) * 1000)
+        res["clipboard_burst_100"] = summarize(burst_samples)
+        res["ingest"] = win.ingest.snapshot()
+
+        key_samples: List[float] = []
+        for _ in range(repeat):
+            win.edit_search.clear()
+            pump(app)
+            for i in range(1, len(SEARCH_TYPING) + 1):
+                t0 = time.perf_counter()
+                win.edit_search.setText(SEARCH_TYPING[:i])
+                pump(app)
+                key_samples.append((time.perf_counter() - t0) * 1000)
+        win.edit_search.clear()
+        pump(app)
+        res["search_keystroke"] = summarize(key_samples)
+
+        tab_samples: List[float] = []
+        for _ in range(repeat):
+            for idx in (1, 2, 3, 0):
+                t0 = time.perf_counter()
+                win.switch_tab(idx)
+                pump(app)
+                tab_samples.append((time.perf_counter() - t0) * 1000)
+        res["tab_switch"] = summarize(tab_samples)
+
+        # 捲到底部觸發下一頁載入
+        page_samples: List[float] = []
+        lst = win.clip_list
+        bar = lst.verticalScrollBar()
+        for _ in range(repeat):
+            if not lst.has_more():
+                break
+            loaded = lst.count()
+            t0 = time.perf_counter()
+            bar.setValue(bar.maximum())
+            pump(app, until=lambda: lst.count() > loaded)
+            page_samples.append((time.perf_counter() - t0) * 1000)
+        if page_samples:
+            res["scroll_next_page"] = summarize(page_samples)
+
+        resize_samples: List[float] = []
+        for i in range(repeat * 4):
+            width = 900 + (i % 4) * 80
+            t0 = time.perf_counter()
+            win.resize(width, 680)
+            pump(app)
+            resize_samples.append((time.perf_counter() - t0) * 1000)
+        res["resize"] = summarize(resize_samples)
+
+        win.close()
+        win.deleteLater()
+        pump(app)
+    return res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    import main as main_mod
+
+    report = new_report("gui", repeat=args.repeat, seed=args.seed, qpa=os.environ.get("QT_QPA_PLATFORM"))
+    for n in args.sizes:
+        print(f"[gui] {n} items ...", flush=True)
+        res = bench_size(app, main_mod, n, args.repeat, args.seed)
+        report["results"].append(res)
+        print(f"  {'first_paint_ms':<24} {res['first_paint_ms']}")
+        print_timings(res)
+
+    out = write_report(report, args.output)
+    print(f"結果已寫入 {out}")
+
+
+if __name__ == "__main__":
+    main()
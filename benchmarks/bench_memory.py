@@ -0,0 +1,167 @@
+"""大量歷史紀錄的記憶體用量回歸測試。
+
+每個量測都在獨立子行程中進行（RSS 才不會互相干擾）：
+先寫出合成的 history.json，再量測 StorageManager 載入後、以及主視窗建立並顯示後
+的 tracemalloc 總量與 RSS 增量，換算為「每筆項目」的位元組數。
+
+    python benchmarks/bench_memory.py                 # 量測並寫出 JSON 結果
+    python benchmarks/bench_memory.py --check         # 超出 memory_budget.json 時以非 0 結束
+
+預算檔 benchmarks/memory_budget.json 記錄每筆項目可接受的上限，
+資料結構有意識地變大或變小時請一併更新。
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import new_report, write_report  # noqa: E402
+
+BUDGET_PATH = Path(__file__).resolve().parent / "memory_budget.json"
+MAX_TEXT = 50_000  # 排除 MB 級長尾，讓每筆平均值穩定
+
+
+def current_rss() -> int:
+    """目前行程的常駐記憶體（bytes）；無法取得時回傳 0。"""
+    try:
+        import psutil  # type: ignore[import]
+
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _prepare(base: Path, n: int, seed: int) -> None:
+    from app.storage import StorageManager
+    from benchmarks.synthetic import generate_history
+
+    base.mkdir(parents=True, exist_ok=True)
+    storage = StorageManager(base)
+    storage.settings["max_history"] = n
+    storage.settings["global_hotkey_enabled"] = False
+    history = generate_history(n, seed=seed, max_size=MAX_TEXT, images_dir=base / "data" / "images")
+    storage.set_clipboard_items(history)
+    storage.save_all()
+
+
+def _child(kind: str, n: int, base: Path) -> Dict[str, Any]:
+    app = None
+    if kind == "window":
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+
+        app = QApplication(sys.argv[:1])
+        import main as main_mod  # noqa: F401  先載入模組，不計入量測
+    from app.storage import StorageManager
+
+    gc.collect()
+    rss0 = current_rss()
+    tracemalloc.start()
+
+    storage = StorageManager(base)
+    if kind == "window":
+        from app.language import LanguageManager
+        from app.theme import ThemeManager
+
+        win = main_mod.LightClipWindow(storage, LanguageManager(base), ThemeManager(), base)
+        win.show()
+        app.processEvents()
+
+    gc.collect()
+    traced, peak = tracemalloc.get_traced_memory()
+    rss = current_rss() - rss0
+    tracemalloc.stop()
+    return {
+        "kind": kind,
+        "items": n,
+        "loaded_items": len(storage.clipboard_items),
+        "tracemalloc_bytes": traced,
+        "tracemalloc_peak_bytes": peak,
+        "rss_bytes": rss,
+        "tracemalloc_bytes_per_item": round(traced / n, 1),
+        "rss_bytes_per_item": round(rss / n, 1),
+    }
+
+
+def run_child(kind: str, n: int, base: Path) -> Dict[str, Any]:
+    cmd = [sys.executable, __file__, "--child", kind, str(n), "--base", str(base)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def check(results: List[Dict[str, Any]], budget: Dict[str, Any]) -> List[str]:
+    failures = []
+    for res in results:
+        limits = budget.get(res["kind"], {})
+        for key, limit in limits.items():
+            value = res.get(key)
+            if value is not None and value > limit:
+                failures.append(f"{res['kind']} @ {res['items']}: {key} = {value:.0f} > 預算 {limit:.0f}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storage-sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--window-sizes", type=int, nargs="*", default=[10_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="超出預算時以非 0 結束")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "N"), help=argparse.SUPPRESS)
+    parser.add_argument("--base", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.child[0], int(args.child[1]), args.base)))
+        return
+
+    report = new_report("memory", seed=args.seed, max_text=MAX_TEXT)
+    jobs = [("storage", n) for n in args.storage_sizes] + [("window", n) for n in args.window_sizes]
+    prepared: Dict[int, Path] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, n in jobs:
+            print(f"[memory] {kind} {n} items ...", flush=True)
+            if n not in prepared:
+                # 由父行程寫出合成資料，子行程只負責載入與量測
+                prepared[n] = Path(tmp) / str(n)
+                _prepare(prepared[n], n, args.seed)
+            res = run_child(kind, n, prepared[n])
+            report["results"].append(res)
+            print(
+                f"  tracemalloc {res['tracemalloc_bytes'] / 1024 / 1024:8.1f} MiB"
+                f" ({res['tracemalloc_bytes_per_item']:.0f} B/item)"
+                f"   rss +{res['rss_bytes'] / 1024 / 1024:8.1f} MiB ({res['rss_bytes_per_item']:.0f} B/item)"
+            )
+
+    out = write_report(report, args.output)
+    print(f"結果已寫入 {out}")
+
+    if args.check:
+        budget = json.loads(BUDGET_PATH.read_text(encoding="utf-8"))
+        failures = check(report["results"], budget)
+        if failures:
+            print("記憶體用量超出預算：")
+            for line in failures:
+                print("  " + line)
+            sys.exit(1)
+        print("記憶體用量在預算內。")
+
+
+if __name__ == "__main__":
+    main()
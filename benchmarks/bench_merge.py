@@ -0,0 +1,60 @@
+"""合併兩份 50k 筆歷史紀錄的效能測試。
+
+用法（於專案根目錄）：
+
+    python benchmarks/bench_merge.py [--items 50000] [--overlap 0.5]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.storage import StorageManager  # noqa: E402
+from benchmarks.synthetic import generate_history  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    local = generate_history(args.items, seed=args.seed, max_size=20_000)
+
+    # 遠端：一部分與本機相同 id（其中一半較新）、一部分內容相同但 id 不同、其餘為新項目
+    shared = int(args.items * args.overlap)
+    remote = []
+    for i, it in enumerate(local[:shared]):
+        rec = dict(it)
+        if i % 2 == 0:
+            rec["id"] = str(uuid.uuid4())
+        else:
+            rec["updated_at"] = (now + timedelta(seconds=1)).isoformat()
+        remote.append(rec)
+    remote.extend(generate_history(args.items - shared, seed=args.seed + 1, max_size=20_000))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageManager(Path(tmp))
+        storage.settings["max_history"] = args.items * 2
+        storage.set_clipboard_items(local)
+
+        t0 = time.perf_counter()
+        stats = storage.merge_clipboard_items(remote)
+        elapsed = time.perf_counter() - t0
+
+    print(f"local={len(local)} remote={len(remote)} result={len(storage.clipboard_items)}")
+    print(f"stats={stats}")
+    print(f"merge: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
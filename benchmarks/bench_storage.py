@@ -0,0 +1,133 @@
+"""儲存層與搜尋的效能測試（不需要 GUI）。
+
+用法（於專案根目錄）：
+
+    python benchmarks/bench_storage.py                     # 1k / 10k / 100k
+    python benchmarks/bench_storage.py --sizes 1000 10000 --repeat 5
+    python benchmarks/bench_storage.py --compare benchmarks/results/舊結果.json
+
+結果會寫到 benchmarks/results/storage-<版本>-<時間>.json。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.cloud_sync import CloudSync  # noqa: E402
+from app.models import ClipType  # noqa: E402
+from app.storage import StorageManager  # noqa: E402
+from benchmarks.common import measure, new_report, print_timings, write_report  # noqa: E402
+from benchmarks.synthetic import generate_history  # noqa: E402
+
+SEARCH_TERMS = ("error", "剪貼簿", "https://", "不存在的字串")
+
+
+def bench_size(n: int, repeat: int, seed: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        items = generate_history(n, seed=seed, images_dir=base / "data" / "images")
+        (base / "data").mkdir(exist_ok=True)
+        storage = StorageManager(base)
+        storage.settings["max_history"] = n
+        storage.set_clipboard_items(items)
+        storage.save_all()
+        history_bytes = storage.history_path.stat().st_size
+
+        results: Dict[str, Any] = {"items": n, "history_bytes": history_bytes}
+        results["load"] = measure(lambda: StorageManager(base), repeat)
+
+        def add_batch():
+            for i in range(200):
+                storage.add_clipboard_item(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "pinned": False,
+                        "type": "text",
+                        "full_text": f"new clip {i}",
+                        "preview": f"new clip {i}",
+                        "category": "文字",
+                    }
+                )
+
+        results["add_200_with_truncate"] = measure(add_batch, repeat)
+        results["save_all"] = measure(storage.save_all, repeat)
+        results["search"] = {
+            term: measure(lambda term=term: storage.search_clipboard_items(term), repeat)
+            for term in SEARCH_TERMS
+        }
+        results["group_by_category"] = measure(storage.group_by_category, repeat)
+        results["list_categories"] = measure(storage.list_categories, repeat)
+        results["category_items_images"] = measure(lambda: storage.get_category_items("圖片"), repeat)
+        # 「最近 2 小時、分類為圖片的圖片」：cold 每次都重建欄位陣列，warm 只有遮罩運算
+        since = time.time() - 2 * 3600
+
+        def filter_images():
+            return storage.filter_clipboard_items(kinds=(ClipType.IMAGE,), since=since, category="圖片")
+
+        def filter_cold():
+            storage.revision += 1
+            filter_images()
+
+        results["filter_cold"] = measure(filter_cold, repeat)
+        results["filter_warm"] = measure(filter_images, repeat)
+
+        results["classify_all"] = measure(
+            lambda: [storage.classify_clip(it) for it in storage.clipboard_items], repeat
+        )
+
+        cloud = CloudSync(base, storage)
+        results["export_json"] = measure(cloud.export_json, repeat)
+        results["export_ndjson_gzip"] = measure(lambda: cloud.export_ndjson("gzip"), repeat)
+    return results
+
+
+def compare(current: Dict[str, Any], previous_path: Path) -> None:
+    previous = json.loads(previous_path.read_text(encoding="utf-8"))
+    prev_by_n = {r["items"]: r for r in previous.get("results", [])}
+    print(f"\n與 {previous_path.name}（v{previous.get('version')}）比較 median：")
+    for res in current["results"]:
+        old = prev_by_n.get(res["items"])
+        if not old:
+            continue
+        for key, val in res.items():
+            if isinstance(val, dict) and "median_ms" in val and isinstance(old.get(key), dict):
+                before = old[key]["median_ms"]
+                after = val["median_ms"]
+                ratio = after / before if before else float("inf")
+                flag = "  <-- 變慢" if ratio > 1.2 else ""
+                print(f"  {res['items']:>7} {key:<24} {before:>10.2f} -> {after:>10.2f} ms ({ratio:.2f}x){flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = new_report("storage", repeat=args.repeat, seed=args.seed)
+    for n in args.sizes:
+        print(f"[storage] {n} items ...", flush=True)
+        res = bench_size(n, args.repeat, args.seed)
+        report["results"].append(res)
+        print_timings(res)
+
+    out = write_report(report, args.output)
+    print(f"結果已寫入 {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""效能測試腳本共用的計時與結果輸出工具。"""
+from __future__ import annotations
+
+import json
+import platform
+import re
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def app_version() -> str:
+    m = re.search(r'APP_VERSION\s*=\s*"([^"]+)"', (ROOT / "main.py").read_text(encoding="utf-8"))
+    return m.group(1) if m else "unknown"
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def measure(
+    fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, float]:
+    """執行 repeat 次，回傳毫秒統計。setup 不計時。"""
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return summarize(samples)
+
+
+def new_report(suite: str, **extra: Any) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "suite": suite,
+        "version": app_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    report.update(extra)
+    report["results"] = []
+    return report
+
+
+def write_report(report: Dict[str, Any], output: Optional[Path] = None) -> Path:
+    out = output
+    if out is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out = RESULTS_DIR / f"{report['suite']}-{report['version']}-{stamp}.json"
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return out
+
+
+def print_timings(res: Dict[str, Any], indent: str = "  ") -> None:
+    for key, val in res.items():
+        if isinstance(val, dict) and "median_ms" in val:
+            print(f"{indent}{key:<24} {val['median_ms']:>10.2f} ms")
+        elif isinstance(val, dict):
+            for sub, sval in val.items():
+                if isinstance(sval, dict) and "median_ms" in sval:
+                    print(f"{indent}{key} {sub!r:<16} {sval['median_ms']:>10.2f} ms")
@@ -0,0 +1,125 @@
+"""產生擬真的合成剪貼簿歷史，供效能測試使用。
+
+內容混合中英文，長度從數個字元到數 MB（長尾分佈），並包含圖片項目與釘選項目。
+同一組參數與 seed 會產生完全相同的資料。
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_EN_WORDS = (
+    "the quick brown fox jumps over lazy dog error warning info request response "
+    "user admin config server client build deploy release version update merge "
+    "commit branch python qt clipboard history template screenshot cloud sync"
+).split()
+_CJK_WORDS = (
+    "剪貼簿 歷史 紀錄 模板 截圖 設定 分類 同步 雲端 匯出 匯入 主題 語言 快捷鍵 "
+    "文字 圖片 檔案 今天 明天 會議 報告 客戶 回覆 確認 謝謝 請問 更新 版本 問題"
+).split()
+_SNIPPETS = (
+    "https://example.com/docs/{n}",
+    "someone{n}@example.com",
+    "C:\\Users\\demo\\Documents\\report_{n}.docx",
+    "def handler_{n}(event):\n    return event.data",
+    '{{"id": {n}, "status": "ok"}}',
+    "0912-345-{n:03d}",
+)
+
+# 1x1 透明 PNG，用來當作圖片項目的佔位檔
+_TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082"
+)
+
+
+def _text_length(rng: random.Random, max_size: int) -> int:
+    r = rng.random()
+    if r < 0.70:
+        return rng.randint(3, 120)
+    if r < 0.95:
+        return rng.randint(120, 5_000)
+    if r < 0.9995:
+        return rng.randint(5_000, 100_000)
+    return rng.randint(min(1_000_000, max_size), max_size)
+
+
+def _make_text(rng: random.Random, length: int, n: int) -> str:
+    if rng.random() < 0.15:
+        text = rng.choice(_SNIPPETS).format(n=n % 1000)
+        if len(text) >= length:
+            return text
+    # 先產生一段約 4KB 的素材，再重複到所需長度，避免逐字產生超長字串
+    parts: List[str] = []
+    size = 0
+    target = min(length, 4096)
+    cjk_ratio = rng.random()
+    while size < target:
+        word = rng.choice(_CJK_WORDS) if rng.random() < cjk_ratio else rng.choice(_EN_WORDS)
+        parts.append(word)
+        size += len(word) + 1
+        if rng.random() < 0.05:
+            parts.append("\n")
+    chunk = " ".join(parts)
+    if length <= len(chunk):
+        return chunk[:length]
+    return (chunk * (length // len(chunk) + 1))[:length]
+
+
+def _preview(text: str) -> str:
+    preview = text.strip().replace("\n", " ")
+    if len(preview) > 80:
+        preview = preview[:77] + "..."
+    return preview
+
+
+def generate_history(
+    n: int,
+    seed: int = 0,
+    image_ratio: float = 0.05,
+    pinned_ratio: float = 0.02,
+    max_size: int = 2_000_000,
+    images_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """產生 n 筆歷史紀錄（最新的在最前面），格式與 on_clipboard_changed 相同。
+
+    指定 images_dir 時會為圖片項目寫出小型 PNG 檔。
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    if images_dir is not None:
+        images_dir.mkdir(parents=True, exist_ok=True)
+
+    items: List[Dict[str, Any]] = []
+    # 累加間隔，時間戳記才會隨索引嚴格遞減（新到舊）
+    offset = 0
+    for i in range(n):
+        cid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if i:
+            offset += rng.randint(1, 90)
+        ts = now - timedelta(seconds=offset)
+        item: Dict[str, Any] = {
+            "id": cid,
+            "pinned": rng.random() < pinned_ratio,
+            "timestamp_local": ts.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp_iso": ts.isoformat(),
+        }
+        if rng.random() < image_ratio:
+            path = (images_dir or Path("data/images")) / f"{cid}.png"
+            if images_dir is not None:
+                path.write_bytes(_TINY_PNG)
+            item.update(
+                type="image",
+                image_path=str(path),
+                full_text="",
+                preview=f"[圖片] {path.name}",
+                category="圖片",
+            )
+        else:
+            text = _make_text(rng, _text_length(rng, max_size), i)
+            item.update(type="text", full_text=text, preview=_preview(text), category="文字")
+        items.append(item)
+    return items
@@ -1,13 +1,16 @@
 
 from __future__ import annotations
 
+import argparse
 import sys
+import time
 import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from PyQt6.QtCore import Qt, QSize, QTimer
-from PyQt6.QtGui import QAction, QIcon, QPixmap
+from PyQt6.QtCore import QMimeData, QPoint, Qt, QSize, QTimer, QUrl, pyqtSignal
+from PyQt6.QtGui import QAction, QCursor, QIcon, QImage, QPixmap
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -28,10 +31,16 @@ from PyQt6.QtWidgets import (
     QSystemTrayIcon,
     QMenu,
     QStyle,
+    QStyledItemDelegate,
     QFrame,
     QStackedWidget,
     QScrollArea,
     QSplitter,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QAbstractItemView,
+    QFileDialog,
 )
 
 try:
@@ -39,14 +48,32 @@ try:
 except Exception:  # pragma: no cover
     keyboard = None
 
-from app.storage import StorageManager
+from app import perf
+from app.models import ClipEntry, ClipType
+from app.storage import TEMPLATE_SLOTS, StorageManager, infer_category
 from app.language import LanguageManager, _, init_language_manager
 from app.theme import ThemeManager
 from app.cloud_sync import CloudSync
-from app.google_sync import GoogleDriveSync
+from app.auto_sync import AutoSyncScheduler
+from app.classifier import DEFAULT_RULES, compile_rules, reclassify_async
+from app.image_hash import SAMPLE_SIZE, SIMILAR_DISTANCE, GrayImage, dhash, hash_images_async
+from app.ingest import IngestQueue
+from app.near_dup import SIMILAR_THRESHOLD, build_index_async
+from app.retention import Pruner, RetentionPolicy
+from app.sync_backends import create_backend
 
 APP_VERSION = "1.9"
 
+# 時間篩選選項：(顯示文字, 往回幾秒；"today" 表示今天 0 點起)
+TIME_FILTERS = (
+    ("全部時間", None),
+    ("最近 1 小時", 3600),
+    ("最近 2 小時", 2 * 3600),
+    ("今天", "today"),
+    ("最近 7 天", 7 * 86400),
+    ("最近 30 天", 30 * 86400),
+)
+
 
 def ensure_base_dir() -> Path:
     return Path(__file__).resolve().parent
@@ -54,26 +81,191 @@ def ensure_base_dir() -> Path:
 
 # ---------- custom widgets ----------
 
+_ICON_CACHE: Dict[str, QIcon] = {}
+
+
+def cached_icon(name: str) -> QIcon:
+    """assets/ 底下的圖示整個程式共用同一個 QIcon。
+
+    SVG 引擎會依尺寸 / 狀態快取算繪好的點陣圖，共用實例就只需算繪一次；
+    圖示不隨主題改變，因此以檔名為鍵即可。
+    """
+    icon = _ICON_CACHE.get(name)
+    if icon is None:
+        icon = _ICON_CACHE[name] = QIcon(str(ensure_base_dir() / "assets" / name))
+    return icon
+
 
 class ClipListWidget(QListWidget):
-    """自訂列表，在視窗縮放時重新計算 item size，改善自動換行效果。"""
+    """自訂列表，在視窗縮放時重新計算 item size，改善自動換行效果。
+
+    項目以 id 清單分頁載入：set_id_source 先建立第一頁，捲到接近底部時再載入下一頁，
+    因此建立列表的成本與歷史總筆數無關。
+
+    拖曳視窗邊緣 / 分隔線時每一次 resizeEvent 只重算可見的列，
+    停止拖曳 RELAYOUT_DELAY_MS 後再分批補算其餘列。卡片高度依
+    (項目 id, 寬度區間, 是否展開) 快取，來回縮放同樣寬度時不必重新排版文字。
+    """
+
+    PAGE_SIZE = 100
+    RELAYOUT_DELAY_MS = 120
+    RELAYOUT_CHUNK = 200
+    WIDTH_BUCKET = 16
+    HEIGHT_CACHE_LIMIT = 20_000
+
+    pin_requested = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.card_pool = CardPool(self)
+        self.setItemDelegate(self.card_pool)
+        # Ctrl / Shift 多選，右鍵選單提供批次操作
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self._height_cache: Dict[Tuple[Any, int, int, bool], QSize] = {}
+        self._relayout_row = 0
+        self._relayout_timer = QTimer(self)
+        self._relayout_timer.setSingleShot(True)
+        self._relayout_timer.setInterval(self.RELAYOUT_DELAY_MS)
+        self._relayout_timer.timeout.connect(self._start_deferred_relayout)
+        self._chunk_timer = QTimer(self)
+        self._chunk_timer.setSingleShot(True)
+        self._chunk_timer.timeout.connect(self._relayout_chunk)
+        self._page_ids: Sequence[str] = ()
+        self._page_pos = 0
+        self._load_page: Optional[Callable[[Sequence[str]], None]] = None
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    # ---------- 分頁載入 ----------
+    def set_id_source(self, ids: Sequence[str], load_page: Callable[[Sequence[str]], None]) -> None:
+        """清空列表並改為顯示 ids；load_page(一頁的 id) 負責把該頁項目加到列表尾端。"""
+        self.clear()
+        self._page_ids = ids
+        self._load_page = load_page
+        self.load_next_page()
+
+    def has_more(self) -> bool:
+        return self._page_pos < len(self._page_ids)
+
+    def load_next_page(self) -> bool:
+        if self._load_page is None or not self.has_more():
+            return False
+        chunk = self._page_ids[self._page_pos : self._page_pos + self.PAGE_SIZE]
+        self._page_pos += len(chunk)
+        with perf.timer("ui.list_load_page"):
+            self._load_page(chunk)
+        if self.has_more():
+            QTimer.singleShot(0, self._fill_viewport)
+        return True
+
+    def clear(self):
+        self._page_ids = ()
+        self._page_pos = 0
+        super().clear()
+
+    def _on_scrolled(self, value: int):
+        bar = self.verticalScrollBar()
+        if self.has_more() and value >= bar.maximum() - bar.pageStep():
+            self.load_next_page()
+
+    def _fill_viewport(self):
+        # 已載入的項目不夠填滿可視區域（還不能捲動）時繼續載入
+        if not self.has_more() or not self.isVisible():
+            return
+        self.executeDelayedItemsLayout()
+        bar = self.verticalScrollBar()
+        if bar.maximum() - bar.value() < bar.pageStep():
+            self.load_next_page()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.has_more():
+            QTimer.singleShot(0, self._fill_viewport)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        for i in range(self.count()):
-            item = self.item(i)
-            w = self.itemWidget(item)
-            if w is not None:
-                item.setSizeHint(w.sizeHint())
+        if event.oldSize().width() == event.size().width() or not self.count():
+            return
+        self._chunk_timer.stop()
+        with perf.timer("ui.list_resize_visible"):
+            self._fit_rows(*self._visible_rows())
+        self._relayout_timer.start()
+
+    def fit_item(self, item: QListWidgetItem, widget: Optional[QWidget] = None) -> None:
+        """依目前寬度設定單一列的高度（命中快取時不重新排版）。"""
+        if widget is None:
+            widget = self.itemWidget(item)
+            if widget is None:
+                return
+        bucket = max(1, self.viewport().width() // self.WIDTH_BUCKET)
+        key = (
+            item.data(Qt.ItemDataRole.UserRole),
+            getattr(widget, "content_key", 0),
+            bucket,
+            bool(getattr(widget, "_expanded", False)),
+        )
+        size = self._height_cache.get(key)
+        if size is None:
+            hint = widget.sizeHint()
+            if widget.hasHeightForWidth():
+                size = QSize(hint.width(), widget.heightForWidth(bucket * self.WIDTH_BUCKET))
+            else:
+                size = hint
+            if len(self._height_cache) >= self.HEIGHT_CACHE_LIMIT:
+                self._height_cache.clear()
+            self._height_cache[key] = size
+        # setSizeHint 一定會觸發整個列表重新排版，大小沒變時不要呼叫
+        if item.sizeHint() != size:
+            item.setSizeHint(size)
+
+    def _row_near(self, y: int, step: int) -> int:
+        # 列與列之間有間距 / 外框，落空時往內移幾個像素再找
+        x = self.viewport().rect().center().x()
+        for _attempt in range(8):
+            row = self.indexAt(QPoint(x, y)).row()
+            if row >= 0:
+                return row
+            y += step
+        return -1
+
+    def _visible_rows(self) -> Tuple[int, int]:
+        vp = self.viewport().rect()
+        first = self._row_near(vp.top(), 4)
+        last = self._row_near(vp.bottom(), -4)
+        if first < 0:
+            first = 0
+        if last < 0:
+            last = self.count() - 1
+        return first, last + 1
+
+    def _fit_rows(self, start: int, stop: int) -> None:
+        for i in range(start, min(stop, self.count())):
+            self.fit_item(self.item(i))
+
+    def _start_deferred_relayout(self):
+        self._relayout_row = 0
+        self._relayout_chunk()
+
+    @perf.timed("ui.list_resize_deferred")
+    def _relayout_chunk(self):
+        start = self._relayout_row
+        stop = start + self.RELAYOUT_CHUNK
+        self._fit_rows(start, stop)
+        if stop < self.count():
+            self._relayout_row = stop
+            self._chunk_timer.start(0)
 
 
 class ClipCard(QWidget):
-    """剪貼簿項目的卡片：自動換行、最多 3 行，可展開。"""
+    """剪貼簿項目的卡片：自動換行、最多 3 行，可展開。
+
+    卡片由 CardPool 重複使用，換成另一筆項目時呼叫 bind 重新設定內容。
+    """
 
     def __init__(self, parent, text: str, meta: str, pinned: bool, can_expand: bool):
         super().__init__(parent)
-        self._expanded = False
-        self._can_expand = can_expand
+        self.clip_id: Optional[str] = None
+        self._pinned: Optional[bool] = None
 
         root = QVBoxLayout(self)
         root.setContentsMargins(0, 0, 0, 0)
@@ -93,30 +285,42 @@ class ClipCard(QWidget):
         top_row.addStretch(1)
         self.btn_expand = QPushButton("展開", frame)
         self.btn_expand.setFlat(True)
-        self.btn_expand.setVisible(can_expand)
         top_row.addWidget(self.btn_expand)
         fl.addLayout(top_row)
 
-        self.lbl_text = QLabel(text, frame)
+        self.lbl_text = QLabel(frame)
         self.lbl_text.setWordWrap(True)
         self.lbl_text.setMinimumHeight(24)
         fl.addWidget(self.lbl_text)
 
-        self.lbl_meta = QLabel(meta, frame)
+        self.lbl_meta = QLabel(frame)
         self.lbl_meta.setObjectName("metaLabel")
         fl.addWidget(self.lbl_meta)
 
         root.addWidget(frame)
 
+        self.bind(None, text, meta, pinned, can_expand)
+        self.btn_expand.clicked.connect(self.toggle_expand)
+
+    def bind(self, clip_id: Optional[str], text: str, meta: str, pinned: bool, can_expand: bool):
+        """換成另一筆項目的內容（展開狀態一律回到收合）。"""
+        self.clip_id = clip_id
+        # 列高快取以此區分同一個 id 的不同內容（近似重複合併、雲端合併後 id 不變但內文改變）
+        self.content_key = hash((text, meta, can_expand))
+        self._expanded = False
+        self._can_expand = can_expand
+        self.lbl_text.setText(text)
+        self.lbl_meta.setText(meta)
+        self.btn_expand.setText("展開")
+        self.btn_expand.setVisible(can_expand)
         self.set_pinned(pinned)
         self._set_collapsed_height()
-        self.btn_expand.clicked.connect(self.toggle_expand)
 
     def set_pinned(self, pinned: bool):
-        base = ensure_base_dir() / "assets"
-        icon_name = "icon_pin_filled.svg" if pinned else "icon_pin_outline.svg"
-        icon = QIcon(str(base / icon_name))
-        self.btn_pin.setIcon(icon)
+        if pinned == self._pinned:
+            return
+        self._pinned = pinned
+        self.btn_pin.setIcon(cached_icon("icon_pin_filled.svg" if pinned else "icon_pin_outline.svg"))
 
     def _set_collapsed_height(self):
         fm = self.lbl_text.fontMetrics()
@@ -135,9 +339,55 @@ class ClipCard(QWidget):
             self.btn_expand.setText("展開")
 
 
+class CardPool(QStyledItemDelegate):
+    """ClipCard 回收池（同時是列表的 item delegate）。
+
+    列表 clear / 移除項目時會透過 delegate.destroyEditor 釋放 item widget，
+    這裡改成把卡片收回備用；重建列表時沿用這些卡片、只重新設定內容，
+    卡片一直留在同一個 viewport 底下，不必重新建立或換 parent（套用樣式表很貴）。
+    """
+
+    SPARE_LIMIT = 256
+
+    def __init__(self, view: QListWidget):
+        super().__init__(view)
+        self._view = view
+        self._free: List[ClipCard] = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, clip_id: str, text: str, meta: str, pinned: bool, can_expand: bool) -> ClipCard:
+        if self._free:
+            card = self._free.pop()
+            card.bind(clip_id, text, meta, pinned, can_expand)
+            self.reused += 1
+            return card
+        card = ClipCard(self._view.viewport(), text, meta, pinned, can_expand)
+        card.clip_id = clip_id
+        card.btn_pin.clicked.connect(lambda checked=False, c=card: self._view.pin_requested.emit(c.clip_id))
+        self.created += 1
+        return card
+
+    def destroyEditor(self, editor, index):
+        if isinstance(editor, ClipCard):
+            # QAbstractItemView 已先把它隱藏
+            self._free.append(editor)
+        else:
+            super().destroyEditor(editor, index)
+
+    def trim(self) -> None:
+        """閒置卡片最多保留 SPARE_LIMIT 張，其餘釋放。"""
+        while len(self._free) > self.SPARE_LIMIT:
+            self._free.pop().deleteLater()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"created": self.created, "reused": self.reused, "free": len(self._free)}
+
+
 class SettingsDialog(QDialog):
     def __init__(self, parent, storage: StorageManager, lang_mgr: LanguageManager, theme_mgr: ThemeManager):
         super().__init__(parent)
+        self.parent_window = parent
         self.storage = storage
         self.lang_mgr = lang_mgr
         self.theme_mgr = theme_mgr
@@ -176,6 +426,26 @@ class SettingsDialog(QDialog):
         self.chk_hotkey.setText(_("settings.global_hotkey_enable"))
         layout.addRow(self.chk_hotkey)
 
+        self.chk_near_dup = QPushButton("擷取時合併近似重複的文字（舊內容保留為版本）", self)
+        self.chk_near_dup.setCheckable(True)
+        self.chk_near_dup.setChecked(bool(storage.settings.get("near_dup_collapse", False)))
+        layout.addRow(self.chk_near_dup)
+
+        self.chk_image_dedup = QPushButton("擷取時合併幾乎相同的截圖（不另存圖片）", self)
+        self.chk_image_dedup.setCheckable(True)
+        self.chk_image_dedup.setChecked(bool(storage.settings.get("image_dedup_collapse", False)))
+        layout.addRow(self.chk_image_dedup)
+
+        self.chk_quick_paste = QPushButton("剪貼簿快捷鍵開啟快速貼上視窗（關閉時開啟主視窗）", self)
+        self.chk_quick_paste.setCheckable(True)
+        self.chk_quick_paste.setChecked(bool(storage.settings.get("quick_paste_enabled", True)))
+        layout.addRow(self.chk_quick_paste)
+
+        self.chk_template_hotkeys = QPushButton("Ctrl+Shift+1~9 貼上綁定的模板", self)
+        self.chk_template_hotkeys.setCheckable(True)
+        self.chk_template_hotkeys.setChecked(bool(storage.settings.get("template_hotkeys_enabled", True)))
+        layout.addRow(self.chk_template_hotkeys)
+
         # 剪貼簿快捷鍵
         self.edit_hotkey = QLineEdit(self)
         self.edit_hotkey.setText(storage.settings.get("global_hotkey", "ctrl+shift+v"))
@@ -188,7 +458,13 @@ class SettingsDialog(QDialog):
 
         # 分類管理
         self.btn_manage_categories = QPushButton("管理分類…", self)
-        layout.addRow(self.btn_manage_categories)
+        self.btn_classifier_rules = QPushButton("自動分類規則…", self)
+        cat_row = QHBoxLayout()
+        cat_row.addWidget(self.btn_manage_categories)
+        cat_row.addWidget(self.btn_classifier_rules)
+        self.btn_retention = QPushButton("保留原則…", self)
+        cat_row.addWidget(self.btn_retention)
+        layout.addRow(cat_row)
 
         # Cloud Sync 卡片
         cloud_frame = QFrame(self)
@@ -208,6 +484,58 @@ class SettingsDialog(QDialog):
         cloud_btn_row.addWidget(self.btn_cloud_upload)
         cloud_btn_row.addWidget(self.btn_cloud_download)
         cloud_layout.addLayout(cloud_btn_row)
+
+        backend_row = QHBoxLayout()
+        self.combo_backend = QComboBox(cloud_frame)
+        self.combo_backend.addItem("Google Drive", "google")
+        self.combo_backend.addItem("本機同步資料夾", "local")
+        self.combo_backend.addItem("HTTP 伺服器", "http")
+        idx = self.combo_backend.findData(storage.settings.get("cloud_backend", "google"))
+        if idx >= 0:
+            self.combo_backend.setCurrentIndex(idx)
+        self.edit_backend_target = QLineEdit(cloud_frame)
+        self.edit_backend_target.setPlaceholderText("資料夾路徑或伺服器網址")
+        backend_row.addWidget(self.combo_backend)
+        backend_row.addWidget(self.edit_backend_target, 1)
+        cloud_layout.addLayout(backend_row)
+        self._update_backend_target()
+        self.combo_backend.currentIndexChanged.connect(self._update_backend_target)
+
+        auto_row = QHBoxLayout()
+        self.chk_auto_sync = QPushButton("自動匯出", cloud_frame)
+        self.chk_auto_sync.setCheckable(True)
+        self.chk_auto_sync.setChecked(bool(storage.settings.get("auto_sync_enabled", False)))
+        self.spin_auto_interval = QSpinBox(cloud_frame)
+        self.spin_auto_interval.setRange(1, 1440)
+        self.spin_auto_interval.setSuffix(" 分鐘")
+        self.spin_auto_interval.setValue(int(storage.settings.get("auto_sync_interval_min", 10)))
+        self.spin_auto_changes = QSpinBox(cloud_frame)
+        self.spin_auto_changes.setRange(0, 10000)
+        self.spin_auto_changes.setPrefix("或 ")
+        self.spin_auto_changes.setSuffix(" 次變更後")
+        self.spin_auto_changes.setSpecialValueText("不依變更次數")
+        self.spin_auto_changes.setValue(int(storage.settings.get("auto_sync_after_changes", 0)))
+        auto_row.addWidget(self.chk_auto_sync)
+        auto_row.addWidget(self.spin_auto_interval)
+        auto_row.addWidget(self.spin_auto_changes)
+        cloud_layout.addLayout(auto_row)
+
+        last_run = storage.settings.get("auto_sync_last_run")
+        if last_run:
+            stats_text = (
+                f"上次自動匯出：{last_run}，耗時 {storage.settings.get('auto_sync_last_duration_ms', 0)} ms，"
+                f"寫入 {int(storage.settings.get('auto_sync_last_bytes', 0)) / 1024:.1f} KB，"
+                f"無變更略過 {storage.settings.get('auto_sync_skipped', 0)} 次"
+            )
+        else:
+            stats_text = "尚未執行自動匯出"
+        last_error = storage.settings.get("auto_sync_last_error")
+        if last_error:
+            stats_text += f"\n上次失敗：{last_error}"
+        self.lbl_auto_stats = QLabel(stats_text, cloud_frame)
+        self.lbl_auto_stats.setObjectName("metaLabel")
+        self.lbl_auto_stats.setWordWrap(True)
+        cloud_layout.addWidget(self.lbl_auto_stats)
         layout.addRow(cloud_frame)
 
         btn_row = QHBoxLayout()
@@ -220,6 +548,8 @@ class SettingsDialog(QDialog):
         self.btn_apply.clicked.connect(self.apply)
         self.btn_cancel.clicked.connect(self.reject)
         self.btn_manage_categories.clicked.connect(self.manage_categories)
+        self.btn_classifier_rules.clicked.connect(self.edit_classifier_rules)
+        self.btn_retention.clicked.connect(self.edit_retention)
         self.btn_cloud_export.clicked.connect(self.on_cloud_export_clicked)
         self.btn_cloud_upload.clicked.connect(self.on_cloud_upload_clicked)
         self.btn_cloud_download.clicked.connect(self.on_cloud_download_clicked)
@@ -253,6 +583,147 @@ class SettingsDialog(QDialog):
         dlg.resize(360, 260)
         dlg.exec()
 
+    def edit_classifier_rules(self):
+        # 一行一條規則：「分類 = 正規表示式」，越上面優先順序越高
+        dlg = QDialog(self)
+        dlg.setWindowTitle("自動分類規則")
+        lay = QVBoxLayout(dlg)
+        chk_enabled = QPushButton("啟用自動分類", dlg)
+        chk_enabled.setCheckable(True)
+        chk_enabled.setChecked(bool(self.storage.settings.get("classifier_enabled", True)))
+        lay.addWidget(chk_enabled)
+        hint = QLabel("一行一條規則：分類 = 正規表示式，越上面的規則優先。只比對內容開頭的一段文字。", dlg)
+        hint.setObjectName("metaLabel")
+        hint.setWordWrap(True)
+        lay.addWidget(hint)
+        edit = QTextEdit(dlg)
+        edit.setAcceptRichText(False)
+
+        def rules_to_text(rules):
+            return "\n".join(f"{r.get('category', '')} = {r.get('pattern', '')}" for r in rules)
+
+        edit.setPlainText(rules_to_text(self.storage.settings.get("classifier_rules") or DEFAULT_RULES))
+        lay.addWidget(edit)
+        btn_row = QHBoxLayout()
+        btn_reset = QPushButton("還原預設", dlg)
+        btn_ok = QPushButton("確定", dlg)
+        btn_cancel = QPushButton("取消", dlg)
+        btn_row.addWidget(btn_reset)
+        btn_row.addStretch(1)
+        btn_row.addWidget(btn_ok)
+        btn_row.addWidget(btn_cancel)
+        lay.addLayout(btn_row)
+
+        def apply_rules():
+            rules = []
+            for line in edit.toPlainText().splitlines():
+                cat, sep, pattern = line.partition("=")
+                if sep and cat.strip() and pattern.strip():
+                    rules.append({"category": cat.strip(), "pattern": pattern.strip()})
+            _regex, _separate, _cats, errors = compile_rules(rules)
+            if errors:
+                QMessageBox.warning(dlg, "自動分類規則", "以下規則無法編譯：\n" + "\n".join(errors))
+                return
+            self.storage.settings["classifier_rules"] = rules
+            self.storage.settings["classifier_enabled"] = chk_enabled.isChecked()
+            dlg.accept()
+            if getattr(self.parent_window, "on_classifier_rules_changed", None):
+                self.parent_window.on_classifier_rules_changed()
+
+        btn_reset.clicked.connect(lambda: edit.setPlainText(rules_to_text(DEFAULT_RULES)))
+        btn_ok.clicked.connect(apply_rules)
+        btn_cancel.clicked.connect(dlg.reject)
+        dlg.resize(640, 360)
+        dlg.exec()
+
+    def edit_retention(self):
+        settings = self.storage.settings
+        dlg = QDialog(self)
+        dlg.setWindowTitle("保留原則")
+        form = QFormLayout(dlg)
+        hint = QLabel("超過下列任一限制時，由舊到新移除項目（0 表示不限制，釘選的項目一律保留）。"
+                      "清理在背景分段進行，並會一併刪除不再使用的圖片檔。", dlg)
+        hint.setObjectName("metaLabel")
+        hint.setWordWrap(True)
+        form.addRow(hint)
+
+        spin_age = QSpinBox(dlg)
+        spin_age.setRange(0, 3650)
+        spin_age.setSuffix(" 天")
+        spin_age.setValue(int(float(settings.get("retention_max_age_days", 0) or 0)))
+        form.addRow("保留天數", spin_age)
+
+        mb = 1024 * 1024
+        spin_text = QSpinBox(dlg)
+        spin_text.setRange(0, 100_000)
+        spin_text.setSuffix(" MB")
+        spin_text.setValue(int(settings.get("retention_max_text_bytes", 0) or 0) // mb)
+        form.addRow("文字總量上限", spin_text)
+
+        spin_image = QSpinBox(dlg)
+        spin_image.setRange(0, 1_000_000)
+        spin_image.setSuffix(" MB")
+        spin_image.setValue(int(settings.get("retention_max_image_bytes", 0) or 0) // mb)
+        form.addRow("圖片總量上限", spin_image)
+
+        edit_limits = QTextEdit(dlg)
+        edit_limits.setAcceptRichText(False)
+        edit_limits.setPlaceholderText("一行一個：分類 = 最多保留幾筆，例如\n圖片 = 200")
+        edit_limits.setPlainText(
+            "\n".join(f"{cat} = {n}" for cat, n in (settings.get("retention_category_limits") or {}).items())
+        )
+        edit_limits.setMaximumHeight(120)
+        form.addRow("各分類上限", edit_limits)
+
+        last = settings.get("retention_last_report")
+        if last:
+            lbl_last = QLabel(
+                f"上次清理（{settings.get('retention_last_run', '')}）：移除 {last.get('removed', 0)} 筆、"
+                f"刪除 {last.get('files_deleted', 0)} 個圖片檔，回收 "
+                f"{(last.get('removed_text_bytes', 0) + last.get('removed_image_bytes', 0)) / mb:.1f} MB",
+                dlg,
+            )
+            lbl_last.setObjectName("metaLabel")
+            lbl_last.setWordWrap(True)
+            form.addRow(lbl_last)
+
+        btn_row = QHBoxLayout()
+        btn_ok = QPushButton("確定並立即清理", dlg)
+        btn_cancel = QPushButton("取消", dlg)
+        btn_row.addStretch(1)
+        btn_row.addWidget(btn_ok)
+        btn_row.addWidget(btn_cancel)
+        form.addRow(btn_row)
+
+        def apply_retention():
+            limits = {}
+            for line in edit_limits.toPlainText().splitlines():
+                cat, sep, num = line.partition("=")
+                try:
+                    n = int(num.strip())
+                except ValueError:
+                    continue
+                if sep and cat.strip() and n > 0:
+                    limits[cat.strip()] = n
+            settings["retention_max_age_days"] = int(spin_age.value())
+            settings["retention_max_text_bytes"] = int(spin_text.value()) * mb
+            settings["retention_max_image_bytes"] = int(spin_image.value()) * mb
+            settings["retention_category_limits"] = limits
+            dlg.accept()
+            if getattr(self.parent_window, "on_retention_changed", None):
+                self.parent_window.on_retention_changed()
+
+        btn_ok.clicked.connect(apply_retention)
+        btn_cancel.clicked.connect(dlg.reject)
+        dlg.resize(480, 360)
+        dlg.exec()
+
+    def _update_backend_target(self):
+        kind = self.combo_backend.currentData()
+        key = {"local": "cloud_backend_dir", "http": "cloud_backend_url"}.get(kind)
+        self.edit_backend_target.setEnabled(key is not None)
+        self.edit_backend_target.setText(self.storage.settings.get(key, "") if key else "")
+
     def on_cloud_export_clicked(self):
         if getattr(self.parent_window, "on_cloud_export_clicked", None):
             self.parent_window.on_cloud_export_clicked()
@@ -274,6 +745,19 @@ class SettingsDialog(QDialog):
         self.storage.settings["global_hotkey_enabled"] = self.chk_hotkey.isChecked()
         self.storage.settings["global_hotkey"] = self.edit_hotkey.text().strip() or "ctrl+shift+v"
         self.storage.settings["screenshot_hotkey"] = self.edit_screenshot_hotkey.text().strip()
+        self.storage.settings["near_dup_collapse"] = self.chk_near_dup.isChecked()
+        self.storage.settings["quick_paste_enabled"] = self.chk_quick_paste.isChecked()
+        self.storage.settings["template_hotkeys_enabled"] = self.chk_template_hotkeys.isChecked()
+        self.storage.settings["image_dedup_collapse"] = self.chk_image_dedup.isChecked()
+        backend = self.combo_backend.currentData()
+        self.storage.settings["cloud_backend"] = backend
+        if backend == "local":
+            self.storage.settings["cloud_backend_dir"] = self.edit_backend_target.text().strip()
+        elif backend == "http":
+            self.storage.settings["cloud_backend_url"] = self.edit_backend_target.text().strip()
+        self.storage.settings["auto_sync_enabled"] = self.chk_auto_sync.isChecked()
+        self.storage.settings["auto_sync_interval_min"] = int(self.spin_auto_interval.value())
+        self.storage.settings["auto_sync_after_changes"] = int(self.spin_auto_changes.value())
         self.storage.save_all()
 
         self.lang_mgr.set_language(lang_code)
@@ -283,7 +767,7 @@ class SettingsDialog(QDialog):
 
 
 class TemplateEditorDialog(QDialog):
-    def __init__(self, parent, name: str = "", content: str = ""):
+    def __init__(self, parent, name: str = "", content: str = "", hotkey_index: Optional[int] = None):
         super().__init__(parent)
         self.setWindowTitle("模板編輯")
         layout = QVBoxLayout(self)
@@ -293,9 +777,16 @@ class TemplateEditorDialog(QDialog):
         self.edit_content = QTextEdit(self)
         self.edit_content.setPlainText(content)
         self.edit_content.setMinimumHeight(220)
+        self.combo_hotkey = QComboBox(self)
+        self.combo_hotkey.addItem("不綁定快捷鍵", None)
+        for i in range(1, TEMPLATE_SLOTS + 1):
+            self.combo_hotkey.addItem(f"Ctrl+Shift+{i}", i)
+        idx = self.combo_hotkey.findData(hotkey_index) if hotkey_index else 0
+        self.combo_hotkey.setCurrentIndex(max(0, idx))
 
         layout.addWidget(self.edit_name)
         layout.addWidget(self.edit_content)
+        layout.addWidget(self.combo_hotkey)
 
         btn_row = QHBoxLayout()
         self.btn_ok = QPushButton("確定", self)
@@ -310,6 +801,9 @@ class TemplateEditorDialog(QDialog):
     def get_values(self):
         return self.edit_name.text().strip(), self.edit_content.toPlainText()
 
+    def get_hotkey_index(self) -> Optional[int]:
+        return self.combo_hotkey.currentData()
+
 
 class CategoryDialog(QDialog):
     """選擇某個項目的分類。"""
@@ -339,7 +833,322 @@ class CategoryDialog(QDialog):
         return self.combo.currentData()
 
 
+def image_signature(image: QImage, ihash: Optional[int]) -> str:
+    """圖片的擷取簽章（尺寸 + dHash），用來略過與上一次相同的擷取。"""
+    return f"image:{image.width()}x{image.height()}:{ihash}"
+
+
+def gray_sample(image: QImage) -> Optional[GrayImage]:
+    """把圖片縮成 dHash 取樣大小的灰階像素（QImage 可在非 GUI 執行緒使用）。"""
+    if image.isNull():
+        return None
+    small = image.scaled(
+        SAMPLE_SIZE[0],
+        SAMPLE_SIZE[1],
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.FastTransformation,
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    ptr = small.constBits()
+    ptr.setsize(small.sizeInBytes())
+    return small.width(), small.height(), small.bytesPerLine(), bytes(ptr)
+
+
+def load_gray_sample(path: str) -> Optional[GrayImage]:
+    return gray_sample(QImage(path))
+
+
+class QuickPastePopup(QWidget):
+    """全域快捷鍵叫出的快速貼上視窗：釘選 + 最近 N 筆，輸入文字即時篩選，Enter 貼上。
+
+    視窗在啟動時就建立並保持隱藏，內容在歷史變動後（視窗隱藏時）預先重建，
+    因此按下快捷鍵時只需要 show，不必建立元件或查詢歷史。
+    """
+
+    paste_requested = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(
+            parent,
+            Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint,
+        )
+        self.setObjectName("quickPaste")
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(6, 6, 6, 6)
+        lay.setSpacing(4)
+        self.edit = QLineEdit(self)
+        self.edit.setPlaceholderText("輸入文字篩選，Enter 貼上，Esc 關閉")
+        self.list = QListWidget(self)
+        self.list.setUniformItemSizes(True)
+        lay.addWidget(self.edit)
+        lay.addWidget(self.list)
+        self.resize(420, 360)
+        self._haystack: List[str] = []
+        # 快捷鍵到視窗顯示的延遲（一直開著，供診斷面板顯示）
+        self.shown = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+        self.edit.textChanged.connect(self._apply_filter)
+        self.edit.returnPressed.connect(self._paste_current)
+        self.list.itemActivated.connect(lambda _item: self._paste_current())
+
+    def set_clips(self, clips: Sequence[ClipEntry]) -> None:
+        self.list.clear()
+        self._haystack = []
+        for clip in clips:
+            label = ("📌 " if clip.pinned else "") + (clip.preview or clip.text_prefix(80)).replace("\n", " ")
+            item = QListWidgetItem(label, self.list)
+            item.setData(Qt.ItemDataRole.UserRole, clip.id)
+            self._haystack.append(label.lower())
+        self._apply_filter(self.edit.text())
+
+    def popup(self, requested_at: Optional[float] = None) -> None:
+        """在游標附近顯示；requested_at 為快捷鍵觸發時的 perf_counter()，用來計算延遲。"""
+        if self.edit.text():
+            self.edit.clear()
+        screen = QApplication.screenAt(QCursor.pos()) or QApplication.primaryScreen()
+        pos = QCursor.pos()
+        if screen is not None:
+            area = screen.availableGeometry()
+            pos.setX(max(area.left(), min(pos.x(), area.right() - self.width())))
+            pos.setY(max(area.top(), min(pos.y(), area.bottom() - self.height())))
+        self.move(pos)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.edit.setFocus()
+        if requested_at is not None:
+            ms = (time.perf_counter() - requested_at) * 1000
+            self.shown += 1
+            self.last_latency_ms = ms
+            self.max_latency_ms = max(self.max_latency_ms, ms)
+            perf.record("hotkey.quick_paste_latency", ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "shown": self.shown,
+            "last_ms": round(self.last_latency_ms, 2),
+            "max_ms": round(self.max_latency_ms, 2),
+            "rows": self.list.count(),
+        }
+
+    def _apply_filter(self, text: str) -> None:
+        term = text.strip().lower()
+        first = None
+        for row, hay in enumerate(self._haystack):
+            hidden = bool(term) and term not in hay
+            self.list.setRowHidden(row, hidden)
+            if not hidden and first is None:
+                first = row
+        if first is not None:
+            self.list.setCurrentRow(first)
+
+    def _paste_current(self) -> None:
+        item = self.list.currentItem()
+        if item is None or item.isHidden():
+            return
+        self.hide()
+        self.paste_requested.emit(item.data(Qt.ItemDataRole.UserRole))
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key == Qt.Key.Key_Escape:
+            self.hide()
+            return
+        if key in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            step = -1 if key == Qt.Key.Key_Up else 1
+            row = self.list.currentRow() + step
+            while 0 <= row < self.list.count() and self.list.isRowHidden(row):
+                row += step
+            if 0 <= row < self.list.count():
+                self.list.setCurrentRow(row)
+            return
+        super().keyPressEvent(event)
+
+    def changeEvent(self, event):
+        # 點到其他視窗就收起來
+        if event.type() == event.Type.ActivationChange and self.isVisible() and not self.isActiveWindow():
+            self.hide()
+        super().changeEvent(event)
+
+
+class SimilarClipsDialog(QDialog):
+    """列出與某個項目相似的其他項目（含估計相似度）與該項目被合併的舊版本，可複製選取的內容。"""
+
+    def __init__(self, parent, clip: ClipEntry, similar: Sequence[Tuple[ClipEntry, float]]):
+        super().__init__(parent)
+        self.setWindowTitle("相似項目")
+        lay = QVBoxLayout(self)
+        self.list = QListWidget(self)
+        for other, sim in similar:
+            row = QListWidgetItem(f"{sim:.0%}  {other.timestamp_local}  {other.preview}", self.list)
+            row.setData(Qt.ItemDataRole.UserRole, other)
+        for version in clip.versions:
+            text = version.get("full_text") or ""
+            preview = text.strip().replace("\n", " ")[:80]
+            row = QListWidgetItem(f"舊版本  {version.get('timestamp_local', '')}  {preview}", self.list)
+            row.setData(Qt.ItemDataRole.UserRole, text)
+        if not self.list.count():
+            QListWidgetItem("沒有相似的項目", self.list).setFlags(Qt.ItemFlag.NoItemFlags)
+        lay.addWidget(self.list)
+        btn_row = QHBoxLayout()
+        btn_copy = QPushButton("複製", self)
+        btn_close = QPushButton("關閉", self)
+        btn_row.addStretch(1)
+        btn_row.addWidget(btn_copy)
+        btn_row.addWidget(btn_close)
+        lay.addLayout(btn_row)
+        btn_copy.clicked.connect(self.copy_current)
+        self.list.itemDoubleClicked.connect(lambda _item: self.copy_current())
+        btn_close.clicked.connect(self.accept)
+        self.resize(560, 360)
+
+    def copy_current(self):
+        item = self.list.currentItem()
+        if item is None:
+            return
+        data = item.data(Qt.ItemDataRole.UserRole)
+        if isinstance(data, ClipEntry):
+            QApplication.clipboard().setMimeData(self.parent()._mime_for_clip(data))
+        elif isinstance(data, str):
+            QApplication.clipboard().setText(data)
+
+
+class DiagnosticsDialog(QDialog):
+    """效能診斷面板：顯示各量測點的 p50 / p95 / max 與計數器（非模態，每秒更新）。"""
+
+    COLUMNS = ("項目", "次數", "p50 (ms)", "p95 (ms)", "max (ms)", "平均 (ms)")
+
+    def __init__(self, parent, storage: StorageManager, base_dir: Path):
+        super().__init__(parent)
+        self.storage = storage
+        self.base_dir = base_dir
+        self.setWindowTitle("效能診斷")
+        lay = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        lay.addWidget(self.table)
+
+        self.lbl_counters = QLabel(self)
+        self.lbl_counters.setObjectName("metaLabel")
+        self.lbl_counters.setWordWrap(True)
+        lay.addWidget(self.lbl_counters)
+
+        btn_row = QHBoxLayout()
+        self.btn_enable = QPushButton("啟用量測", self)
+        self.btn_enable.setCheckable(True)
+        self.btn_enable.setChecked(perf.is_enabled())
+        self.btn_log = QPushButton("寫入記錄檔", self)
+        self.btn_log.setCheckable(True)
+        self.btn_log.setChecked(bool(storage.settings.get("perf_log_enabled", False)))
+        self.btn_reset = QPushButton("重設", self)
+        btn_close = QPushButton("關閉", self)
+        btn_row.addWidget(self.btn_enable)
+        btn_row.addWidget(self.btn_log)
+        btn_row.addWidget(self.btn_reset)
+        btn_row.addStretch(1)
+        btn_row.addWidget(btn_close)
+        lay.addLayout(btn_row)
+
+        self.btn_enable.toggled.connect(self._apply_switches)
+        self.btn_log.toggled.connect(self._apply_switches)
+        self.btn_reset.clicked.connect(self._reset)
+        btn_close.clicked.connect(self.close)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.resize(640, 420)
+        self.refresh()
+
+    def _apply_switches(self, *_):
+        self.storage.settings["perf_enabled"] = self.btn_enable.isChecked()
+        self.storage.settings["perf_log_enabled"] = self.btn_log.isChecked()
+        configure_perf(self.storage, self.base_dir)
+
+    def _reset(self):
+        perf.stats.reset()
+        self.refresh()
+
+    def refresh(self):
+        snap = perf.stats.snapshot()
+        timings = sorted(snap["timings"].items())
+        self.table.setRowCount(len(timings))
+        for row, (name, t) in enumerate(timings):
+            values = (
+                name,
+                str(t["count"]),
+                f"{t['p50_ms']:.2f}",
+                f"{t['p95_ms']:.2f}",
+                f"{t['max_ms']:.2f}",
+                f"{t['mean_ms']:.2f}",
+            )
+            for col, val in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(val))
+        counters = snap["counters"]
+        if counters:
+            text = "  ".join(f"{k}: {v}" for k, v in sorted(counters.items()))
+        elif not perf.is_enabled():
+            text = "量測目前關閉，按「啟用量測」開始收集。"
+        else:
+            text = ""
+        ingest = getattr(self.parent(), "ingest", None)
+        if ingest is not None:
+            # 擷取佇列的計數器一直開著，不受「啟用量測」影響
+            text += "\n擷取佇列  " + "  ".join(f"{k}: {v}" for k, v in ingest.snapshot().items())
+        store = self.storage.history_store
+        text += f"\n歷史快照  seq: {store.seq}  ring: {store.ring}"
+        if store.recovered:
+            text += f"  已從 {store.loaded_from.name} 復原（略過 {', '.join(store.rejected)}）"
+        if store.quarantined:
+            text += f"  無法載入，已保留為 {', '.join(store.quarantined)}"
+        if self.storage.last_save_error:
+            text += f"\n上次存檔失敗：{self.storage.last_save_error}"
+        last = self.storage.settings.get("retention_last_report")
+        if last:
+            text += f"\n保留原則清理（{self.storage.settings.get('retention_last_run', '')}）  " + "  ".join(
+                f"{k}: {v}" for k, v in last.items()
+            )
+        near_dups = self.storage.near_dups
+        if near_dups is not None:
+            text += "\n近似重複索引  " + "  ".join(f"{k}: {v}" for k, v in near_dups.snapshot().items())
+        else:
+            text += "\n近似重複索引  建立中"
+        text += f"\n截圖 dHash 索引  images: {len(self.storage.image_hashes)}"
+        quick = getattr(self.parent(), "quick_paste", None)
+        if quick is not None:
+            text += "\n快速貼上  " + "  ".join(f"{k}: {v}" for k, v in quick.snapshot().items())
+        pools = [
+            lst.card_pool.snapshot()
+            for lst in self.parent().findChildren(ClipListWidget)
+        ]
+        if pools:
+            total = {k: sum(p[k] for p in pools) for k in pools[0]}
+            text += "\n卡片回收池  " + "  ".join(f"{k}: {v}" for k, v in total.items())
+        self.lbl_counters.setText(text.strip())
+
+
+def configure_perf(storage: StorageManager, base_dir: Path) -> None:
+    log_path = base_dir / "logs" / "perf.jsonl" if storage.settings.get("perf_log_enabled") else None
+    perf.configure(bool(storage.settings.get("perf_enabled", False)), log_path)
+
+
 class LightClipWindow(QMainWindow):
+    # 背景重新分類完成（第幾次重新分類, {id: 新分類}），由工作執行緒發出、在 GUI 執行緒處理
+    reclassify_finished = pyqtSignal(int, object)
+    # 背景建立的近似重複索引（NearDupIndex），同樣由工作執行緒發出
+    near_dup_ready = pyqtSignal(object)
+    # 背景計算完成的圖片 dHash（{id: hash}）
+    image_hashes_ready = pyqtSignal(object)
+    # 全域快捷鍵（動作名稱, 觸發時的 perf_counter）；keyboard 套件在自己的執行緒呼叫，只負責發出訊號
+    hotkey_triggered = pyqtSignal(str, float)
+    # 自動匯出的統計（工作執行緒發出，回到主執行緒才寫入 settings）
+    auto_sync_stats = pyqtSignal(dict)
+
     def __init__(self, storage: StorageManager, lang_mgr: LanguageManager, theme_mgr: ThemeManager, base_dir: Path):
         super().__init__()
         self.base_dir = base_dir
@@ -347,9 +1156,31 @@ class LightClipWindow(QMainWindow):
         self.lang_mgr = lang_mgr
         self.theme_mgr = theme_mgr
         self.cloud_sync = CloudSync(base_dir, storage)
-        self.google_sync = GoogleDriveSync(base_dir)
+        self.auto_sync = AutoSyncScheduler(storage, self.cloud_sync, on_stats=self.auto_sync_stats.emit)
+        self.auto_sync_stats.connect(self._on_auto_sync_stats)
         self.global_hotkey_registered = False
         self.current_image_path: Optional[Path] = None
+        self._reclassify_gen = 0
+        self.reclassify_finished.connect(self._on_reclassify_finished)
+        # 近似重複索引：啟動後稍待再於背景建立，避免與首次繪製搶 CPU
+        self._near_dup_building = False
+        self._near_dup_timer = QTimer(self)
+        self._near_dup_timer.setSingleShot(True)
+        self._near_dup_timer.setInterval(2000)
+        self._near_dup_timer.timeout.connect(self.start_near_dup_index)
+        self.near_dup_ready.connect(self._on_near_dup_ready)
+        self._image_hash_building = False
+        self.image_hashes_ready.connect(self._on_image_hashes_ready)
+        self.hotkey_triggered.connect(self._on_hotkey)
+        # 快速貼上視窗：啟動時先建立好（含原生視窗與樣式），之後只在歷史變動時於閒置時重建內容
+        self.quick_paste = QuickPastePopup()
+        self.quick_paste.paste_requested.connect(self.paste_clip_by_id)
+        self.quick_paste.ensurePolished()
+        self.quick_paste.winId()
+        self._quick_paste_timer = QTimer(self)
+        self._quick_paste_timer.setSingleShot(True)
+        self._quick_paste_timer.setInterval(200)
+        self._quick_paste_timer.timeout.connect(self.rebuild_quick_paste)
 
         init_language_manager(lang_mgr)
 
@@ -365,6 +1196,21 @@ class LightClipWindow(QMainWindow):
         self.setup_tray()
         self.setup_global_hotkey()
         self.setup_clipboard_listener()
+        self.setup_retention()
+        # 舊版歷史中的圖片在背景補算 dHash
+        QTimer.singleShot(3000, self.start_image_hashing)
+        if storage.history_store.quarantined:
+            QTimer.singleShot(0, self.warn_history_unreadable)
+        self.auto_sync.start()
+        QApplication.instance().aboutToQuit.connect(self.auto_sync.stop)
+
+    def warn_history_unreadable(self):
+        names = "\n".join(self.storage.history_store.quarantined)
+        QMessageBox.warning(
+            self,
+            "LightClip",
+            f"歷史紀錄與備份快照都無法載入，已改用空白歷史。\n原本的檔案已保留在 data 資料夾：\n{names}",
+        )
 
     # ---------- UI ----------
     def _init_ui(self):
@@ -423,8 +1269,12 @@ class LightClipWindow(QMainWindow):
         self.btn_tab_category.clicked.connect(lambda: self.switch_tab(2))
         self.btn_tab_screenshot.clicked.connect(lambda: self.switch_tab(3))
 
+        # 需要重建內容的分頁索引（分類 = 2、截圖 = 3）
+        self._stale_pages = {2, 3}
         self._init_clipboard_page()
         self._init_templates_page()
+        self._init_categories_page()
+        self._init_screenshot_page()
 
     def switch_tab(self, index: int):
         self.stack.setCurrentIndex(index)
@@ -432,6 +1282,7 @@ class LightClipWindow(QMainWindow):
         self.btn_tab_tpl.setChecked(index == 1)
         self.btn_tab_category.setChecked(index == 2)
         self.btn_tab_screenshot.setChecked(index == 3)
+        self._refresh_page_if_stale(index)
 
     def _init_clipboard_page(self):
         layout = QVBoxLayout(self.page_clipboard)
@@ -454,6 +1305,7 @@ class LightClipWindow(QMainWindow):
 
         # pinned list
         self.list_pinned = ClipListWidget(self)
+        self.list_pinned.pin_requested.connect(self.toggle_pin_by_id)
         self.list_pinned.setSpacing(6)
         layout.addWidget(self.list_pinned)
 
@@ -463,12 +1315,30 @@ class LightClipWindow(QMainWindow):
         self.edit_search = QLineEdit(self)
         self.edit_search.setPlaceholderText(_("ui.search.placeholder"))
         search_row.addWidget(self.edit_search)
+
+        # 類型 / 時間 / 分類篩選（以欄位式中繼資料計算，不逐筆比對內容）
+        self.combo_filter_type = QComboBox(self)
+        self.combo_filter_type.addItem("全部類型", None)
+        self.combo_filter_type.addItem("文字", int(ClipType.TEXT))
+        self.combo_filter_type.addItem("圖片", int(ClipType.IMAGE))
+        self.combo_filter_type.addItem("檔案", int(ClipType.FILE))
+        search_row.addWidget(self.combo_filter_type)
+
+        self.combo_filter_time = QComboBox(self)
+        for label, span in TIME_FILTERS:
+            self.combo_filter_time.addItem(label, span)
+        search_row.addWidget(self.combo_filter_time)
+
+        self.combo_filter_category = QComboBox(self)
+        self._reload_filter_categories()
+        search_row.addWidget(self.combo_filter_category)
         layout.addLayout(search_row)
 
         # main row lists + preview
         row = QHBoxLayout()
 
         self.clip_list = ClipListWidget(self)
+        self.clip_list.pin_requested.connect(self.toggle_pin_by_id)
         self.clip_list.setSpacing(6)
         row.addWidget(self.clip_list, 2)
 
@@ -478,10 +1348,12 @@ class LightClipWindow(QMainWindow):
         self.btn_clip_delete = QPushButton(_("clipboard.delete"), self)
         self.btn_clip_pin = QPushButton(_("clipboard.pin"), self)
         self.btn_clip_category = QPushButton(_("clipboard.category"), self)
+        self.btn_clip_similar = QPushButton(_("clipboard.similar"), self)
         btn_row.addWidget(self.btn_clip_copy)
         btn_row.addWidget(self.btn_clip_delete)
         btn_row.addWidget(self.btn_clip_pin)
         btn_row.addWidget(self.btn_clip_category)
+        btn_row.addWidget(self.btn_clip_similar)
         right.addLayout(btn_row)
 
         self.clip_preview_text = QTextEdit(self)
@@ -501,15 +1373,23 @@ class LightClipWindow(QMainWindow):
         # connections
         self.btn_toggle_pin.toggled.connect(self.toggle_pin_section)
         self.btn_clear_history.clicked.connect(self.clear_history)
-        self.edit_search.textChanged.connect(self.refresh_clipboard_lists)
+        self.edit_search.textChanged.connect(lambda _text: self.refresh_clipboard_lists())
+        for combo in (self.combo_filter_type, self.combo_filter_time, self.combo_filter_category):
+            combo.currentIndexChanged.connect(lambda _index: self.refresh_clipboard_lists())
 
         self.list_pinned.currentItemChanged.connect(self.on_clip_selection_changed)
         self.clip_list.currentItemChanged.connect(self.on_clip_selection_changed)
+        # 釘選列表與主列表同一時間只有一邊有選取，批次操作才不會誤動到另一邊
+        self.list_pinned.itemSelectionChanged.connect(lambda: self._keep_single_list_selection(self.list_pinned))
+        self.clip_list.itemSelectionChanged.connect(lambda: self._keep_single_list_selection(self.clip_list))
+        for lst in (self.list_pinned, self.clip_list):
+            lst.customContextMenuRequested.connect(lambda pos, lst=lst: self.show_clip_context_menu(lst, pos))
 
         self.btn_clip_copy.clicked.connect(self.copy_selected_clip)
         self.btn_clip_delete.clicked.connect(self.delete_selected_clip)
         self.btn_clip_pin.clicked.connect(self.toggle_pin_selected_clip)
         self.btn_clip_category.clicked.connect(self.change_category_selected_clip)
+        self.btn_clip_similar.clicked.connect(self.show_similar_clips)
 
         # 可點擊放大圖片
         self.clip_preview_image.mousePressEvent = self.on_image_clicked  # type: ignore[assignment]
@@ -566,59 +1446,79 @@ class LightClipWindow(QMainWindow):
             self.clip_preview_text.clear()
             self.clip_preview_image.clear()
 
-    def _build_card_for_item(self, item_dict) -> QWidget:
-        text = item_dict.get("preview") or item_dict.get("full_text", "")
-        text = (text or "").strip()
+    def _build_card_for_item(self, target_list: ClipListWidget, clip: ClipEntry) -> ClipCard:
+        text = (clip.preview or clip.full_text).strip()
         if not text:
             text = "(空內容)"
-        ctype = item_dict.get("type", "text")
         # 只顯示類型，不顯示分類名稱
-        meta = f"type: {ctype}"
+        meta = f"type: {clip.type}"
         can_expand = len(text) > 80
-        card = ClipCard(self, text, meta, bool(item_dict.get("pinned")), can_expand)
-        return card
-
+        return target_list.card_pool.acquire(clip.id, text, meta, clip.pinned, can_expand)
+
+    def _fill_card_list(self, target_list: ClipListWidget, ids: Sequence[str]) -> None:
+        """以 id 清單分頁重建列表（clear 時舊卡片會回到回收池）。"""
+        target_list.set_id_source(ids, lambda chunk, lst=target_list: self._append_cards(lst, chunk))
+
+    def _append_cards(self, target_list: ClipListWidget, ids: Sequence[str]) -> None:
+        for clip in self.storage.get_items_by_ids(ids):
+            lw_item = QListWidgetItem(target_list)
+            lw_item.setData(Qt.ItemDataRole.UserRole, clip.id)
+            card = self._build_card_for_item(target_list, clip)
+            target_list.setItemWidget(lw_item, card)
+            target_list.fit_item(lw_item, card)
+        target_list.card_pool.trim()
+
+    @perf.timed("ui.refresh_clipboard_lists")
     def refresh_clipboard_lists(self):
-        term = self.edit_search.text().strip().lower()
-        self.list_pinned.clear()
-        self.clip_list.clear()
-
-        pinned_items = [c for c in self.storage.clipboard_items if c.get("pinned")]
-        normal_items = [c for c in self.storage.clipboard_items if not c.get("pinned")]
-
-        def match_filters(item):
-            text = (item.get("preview") or item.get("full_text") or "").lower()
-            if term and term not in text:
-                return False
-            return True
-
-        def add_items_to_list(target_list: QListWidget, items):
-            for item in items:
-                if not match_filters(item):
-                    continue
-                lw_item = QListWidgetItem(target_list)
-                lw_item.setData(Qt.ItemDataRole.UserRole, item.get("id"))
-                card = self._build_card_for_item(item)
-                card.btn_pin.clicked.connect(lambda checked=False, cid=item.get("id"): self.toggle_pin_by_id(cid))
-                target_list.setItemWidget(lw_item, card)
-                lw_item.setSizeHint(card.sizeHint())
-
-        add_items_to_list(self.list_pinned, pinned_items)
-        add_items_to_list(self.clip_list, normal_items)
-
-        # 更新分類與截圖分頁
-        if hasattr(self, "page_categories"):
+        term = self.edit_search.text()
+        filters = self._current_filters()
+        self._fill_card_list(self.list_pinned, self.storage.filter_clipboard_ids(term, pinned=True, **filters))
+        self._fill_card_list(self.clip_list, self.storage.filter_clipboard_ids(term, pinned=False, **filters))
+        if self.storage.near_dups is None:
+            self.schedule_near_dup_index()
+        self._quick_paste_timer.start()
+
+        # 分類與截圖分頁只在顯示中時立即更新，其餘等切換過去再重建
+        self._stale_pages.update((2, 3))
+        self._refresh_page_if_stale(self.stack.currentIndex())
+
+    def _refresh_page_if_stale(self, index: int):
+        if index not in self._stale_pages:
+            return
+        self._stale_pages.discard(index)
+        if index == 2:
             self.refresh_categories_page()
-        if hasattr(self, "page_screenshots"):
+        elif index == 3:
             self.refresh_screenshot_page()
 
+    def _current_filters(self) -> dict:
+        kind = self.combo_filter_type.currentData()
+        span = self.combo_filter_time.currentData()
+        since = None
+        if span == "today":
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        elif span:
+            since = time.time() - span
+        return {
+            "kinds": None if kind is None else (kind,),
+            "since": since,
+            "category": self.combo_filter_category.currentData(),
+        }
+
+    def _reload_filter_categories(self):
+        combo = self.combo_filter_category
+        current = combo.currentData()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem("全部分類", None)
+        for cat in self.storage.settings.get("categories", []):
+            combo.addItem(cat, cat)
+        idx = combo.findData(current) if current is not None else 0
+        combo.setCurrentIndex(max(idx, 0))
+        combo.blockSignals(False)
+
     def _infer_category(self, item) -> str:
-        ctype = item.get("type", "text")
-        if ctype == "image":
-            return "圖片"
-        if ctype == "file":
-            return "檔案"
-        return "文字"
+        return infer_category(item)
 
     def on_clip_selection_changed(self, current, previous):
         if current is None:
@@ -654,10 +1554,9 @@ class LightClipWindow(QMainWindow):
         clip = self.storage.get_clipboard_item(cid)
         if not clip:
             return
-        ctype = clip.get("type", "text")
-        self.clip_preview_text.setPlainText(clip.get("full_text", ""))
-        if ctype == "image":
-            path = clip.get("image_path")
+        self.clip_preview_text.setPlainText(clip.full_text)
+        if clip.kind == ClipType.IMAGE:
+            path = clip.image_path
             if path:
                 p = Path(path)
                 if p.exists():
@@ -668,56 +1567,135 @@ class LightClipWindow(QMainWindow):
                             pix.scaledToHeight(260, Qt.TransformationMode.SmoothTransformation)
                         )
 
+    # ---------- 選取 / 批次操作 ----------
+    def get_selected_clip_ids(self) -> List[str]:
+        """目前分頁中選取的所有項目 id（依列表順序）；沒有選取時退回 get_selected_clip_id。"""
+        page = self.stack.currentWidget()
+        if page is self.page_categories:
+            lists = [self.list_category_items]
+        elif page is self.page_screenshots:
+            lists = [self.list_screenshots]
+        else:
+            lists = [self.list_pinned, self.clip_list]
+        ids: List[str] = []
+        for lst in lists:
+            rows = sorted(index.row() for index in lst.selectionModel().selectedRows())
+            ids.extend(lst.item(row).data(Qt.ItemDataRole.UserRole) for row in rows)
+        if not ids:
+            cid = self.get_selected_clip_id()
+            return [cid] if cid else []
+        return ids
+
+    def _keep_single_list_selection(self, source: QListWidget):
+        other = self.clip_list if source is self.list_pinned else self.list_pinned
+        if source.selectionModel().hasSelection() and other.selectionModel().hasSelection():
+            other.clearSelection()
+
+    def show_clip_context_menu(self, lst: QListWidget, pos: QPoint):
+        item = lst.itemAt(pos)
+        if item is None:
+            return
+        if not item.isSelected():
+            lst.setCurrentItem(item)
+        count = len(self.get_selected_clip_ids())
+        menu = QMenu(self)
+        title = menu.addAction(f"已選取 {count} 項")
+        title.setEnabled(False)
+        menu.addSeparator()
+        menu.addAction("複製" if count == 1 else "複製（合併文字）", self.copy_selected_clip)
+        menu.addAction("釘選", lambda: self.set_selected_pinned(True))
+        menu.addAction("取消釘選", lambda: self.set_selected_pinned(False))
+        menu.addAction("變更分類…", self.change_category_selected_clip)
+        menu.addAction("匯出…", self.export_selected_clips)
+        menu.addSeparator()
+        menu.addAction("刪除", self.delete_selected_clip)
+        menu.exec(lst.viewport().mapToGlobal(pos))
+
     def copy_selected_clip(self):
-        cid = self.get_selected_clip_id()
-        if not cid:
+        clips = self.storage.get_items_by_ids(self.get_selected_clip_ids())
+        if not clips:
             return
-        clip = self.storage.get_clipboard_item(cid)
-        if not clip:
+        if len(clips) == 1:
+            QApplication.clipboard().setMimeData(self._mime_for_clip(clips[0]))
             return
-        text = clip.get("full_text", "")
-        QApplication.clipboard().setText(text)
+        # 多選：文字與檔案項目的內文依列表順序以換行串接，圖片略過
+        text = "\n".join(c.full_text for c in clips if c.kind != ClipType.IMAGE)
+        if text:
+            QApplication.clipboard().setText(text)
 
     def delete_selected_clip(self):
-        cid = self.get_selected_clip_id()
-        if not cid:
+        ids = self.get_selected_clip_ids()
+        if not ids:
             return
-        self.storage.delete_clipboard_item(cid)
-        self.storage.save_all()
-        self.refresh_clipboard_lists()
+        if len(ids) > 1:
+            answer = QMessageBox.question(self, "刪除", f"確定要刪除選取的 {len(ids)} 個項目？")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        with perf.timer("bulk.delete"):
+            self.storage.remove_clipboard_items(ids, keep_pinned=False)
+            self.storage.save_all()
+            self.refresh_clipboard_lists()
         self.clip_preview_text.clear()
         self.clip_preview_image.clear()
 
     def toggle_pin_selected_clip(self):
-        cid = self.get_selected_clip_id()
-        if not cid:
+        clips = self.storage.get_items_by_ids(self.get_selected_clip_ids())
+        if not clips:
             return
-        self.toggle_pin_by_id(cid)
+        # 多選時只要有未釘選的就全部釘選，全部都已釘選才取消釘選
+        self.set_selected_pinned(not all(c.pinned for c in clips))
+
+    def set_selected_pinned(self, pinned: bool):
+        ids = self.get_selected_clip_ids()
+        if not ids:
+            return
+        with perf.timer("bulk.pin"):
+            if self.storage.set_pinned_many(ids, pinned):
+                self.storage.save_all()
+                self.refresh_clipboard_lists()
+
+    def export_selected_clips(self):
+        clips = self.storage.get_items_by_ids(self.get_selected_clip_ids())
+        if not clips:
+            return
+        path, _filter = QFileDialog.getSaveFileName(
+            self,
+            "匯出選取項目",
+            str(Path.home() / "lightclip_export.ndjson"),
+            "NDJSON (*.ndjson *.ndjson.gz)",
+        )
+        if not path:
+            return
+        try:
+            count = self.cloud_sync.export_items(clips, Path(path))
+        except Exception as e:
+            QMessageBox.warning(self, "匯出", f"匯出時發生錯誤：{e}")
+            return
+        QMessageBox.information(self, "匯出", f"已匯出 {count} 個項目。")
 
     def toggle_pin_by_id(self, cid: str):
         clip = self.storage.get_clipboard_item(cid)
         if not clip:
             return
-        clip["pinned"] = not bool(clip.get("pinned"))
+        self.storage.set_pinned(cid, not clip.pinned)
         self.storage.save_all()
         self.refresh_clipboard_lists()
 
     def change_category_selected_clip(self):
-        cid = self.get_selected_clip_id()
-        if not cid:
-            return
-        clip = self.storage.get_clipboard_item(cid)
-        if not clip:
+        clips = self.storage.get_items_by_ids(self.get_selected_clip_ids())
+        if not clips:
             return
+        clip = clips[0]
         cats = self.storage.settings.get("categories", [])
-        cur = clip.get("category") or self._infer_category(clip)
+        cur = clip.category or self._infer_category(clip)
         dlg = CategoryDialog(self, cats, current=cur)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             new_cat = dlg.get_category()
-            clip["category"] = new_cat
-            self.storage.save_all()
-            self.refresh_clipboard_lists()
-            self.update_clip_preview_by_id(cid)
+            with perf.timer("bulk.category"):
+                self.storage.set_category_many([c.id for c in clips], new_cat)
+                self.storage.save_all()
+                self.refresh_clipboard_lists()
+            self.update_clip_preview_by_id(clip.id)
 
     def on_image_clicked(self, event):
         if not self.current_image_path or not self.current_image_path.exists():
@@ -740,8 +1718,13 @@ class LightClipWindow(QMainWindow):
     def refresh_template_list(self):
         self.tpl_list.clear()
         for tpl in self.storage.templates:
-            item = QListWidgetItem(tpl.get("name", ""), self.tpl_list)
+            name = tpl.get("name", "")
+            if tpl.get("hotkey_index"):
+                name = f"[Ctrl+Shift+{tpl['hotkey_index']}] {name}"
+            item = QListWidgetItem(name, self.tpl_list)
             item.setData(Qt.ItemDataRole.UserRole, tpl.get("id"))
+        # 模板有變動時（新增 / 編輯 / 刪除 / 雲端合併後都會呼叫這裡）預先備妥快捷鍵表
+        self._template_slots = self.storage.template_slots()
 
     def get_selected_template_id(self) -> Optional[str]:
         cur = self.tpl_list.currentItem()
@@ -754,10 +1737,9 @@ class LightClipWindow(QMainWindow):
         self.tpl_preview.clear()
         if not tid:
             return
-        for tpl in self.storage.templates:
-            if tpl.get("id") == tid:
-                self.tpl_preview.setPlainText(tpl.get("content", "")[:500])
-                break
+        tpl = self.storage.get_template(tid)
+        if tpl:
+            self.tpl_preview.setPlainText(tpl.get("content", "")[:500])
 
     def add_template(self):
         dlg = TemplateEditorDialog(self)
@@ -765,7 +1747,7 @@ class LightClipWindow(QMainWindow):
             name, content = dlg.get_values()
             if not name:
                 return
-            tpl = {"id": str(uuid.uuid4()), "name": name, "content": content}
+            tpl = {"id": str(uuid.uuid4()), "name": name, "content": content, "hotkey_index": dlg.get_hotkey_index()}
             self.storage.upsert_template(tpl)
             self.storage.save_all()
             self.refresh_template_list()
@@ -774,16 +1756,17 @@ class LightClipWindow(QMainWindow):
         tid = self.get_selected_template_id()
         if not tid:
             return
-        tpl = next((t for t in self.storage.templates if t.get("id") == tid), None)
+        tpl = self.storage.get_template(tid)
         if not tpl:
             return
-        dlg = TemplateEditorDialog(self, tpl.get("name", ""), tpl.get("content", ""))
+        dlg = TemplateEditorDialog(self, tpl.get("name", ""), tpl.get("content", ""), tpl.get("hotkey_index"))
         if dlg.exec() == QDialog.DialogCode.Accepted:
             name, content = dlg.get_values()
             if not name:
                 return
             tpl["name"] = name
             tpl["content"] = content
+            tpl["hotkey_index"] = dlg.get_hotkey_index()
             self.storage.upsert_template(tpl)
             self.storage.save_all()
             self.refresh_template_list()
@@ -802,10 +1785,9 @@ class LightClipWindow(QMainWindow):
         tid = self.get_selected_template_id()
         if not tid:
             return
-        for tpl in self.storage.templates:
-            if tpl.get("id") == tid:
-                QApplication.clipboard().setText(tpl.get("content", ""))
-                break
+        tpl = self.storage.get_template(tid)
+        if tpl:
+            QApplication.clipboard().setText(tpl.get("content", ""))
 
     # ---------- menu / tray / theme ----------
     def show_main_menu(self):
@@ -826,6 +1808,14 @@ class LightClipWindow(QMainWindow):
         menu.addAction(act_changelog)
         menu.addAction(act_report)
 
+        # 隱藏的診斷面板：按住 Shift 開啟選單，或已啟用量測時才顯示
+        shift = bool(QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier)
+        if shift or perf.is_enabled():
+            menu.addSeparator()
+            act_diag = QAction("效能診斷…", self)
+            act_diag.triggered.connect(self.show_diagnostics)
+            menu.addAction(act_diag)
+
         act_settings.triggered.connect(self.open_settings)
         act_about.triggered.connect(self.show_about)
         act_manual.triggered.connect(self.show_manual)
@@ -838,10 +1828,146 @@ class LightClipWindow(QMainWindow):
         dlg = SettingsDialog(self, self.storage, self.lang_mgr, self.theme_mgr)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             self.apply_theme()
+            self.auto_sync.reconfigure()
             self.setup_global_hotkey()
-            self.refresh_category_combo()
+            self._reload_filter_categories()
             self.refresh_clipboard_lists()
 
+    def on_classifier_rules_changed(self):
+        self.storage.reload_classifier()
+        self._reload_filter_categories()
+        self.start_reclassify()
+
+    def start_reclassify(self):
+        """在背景依目前規則重新分類整個歷史；較新的重新分類會取代尚未完成的舊結果。"""
+        self._reclassify_gen += 1
+        gen = self._reclassify_gen
+        reclassify_async(
+            list(self.storage.clipboard_items),
+            self.storage.classify_clip,
+            lambda changes: self.reclassify_finished.emit(gen, changes),
+        )
+
+    def _on_reclassify_finished(self, gen: int, changes: dict):
+        if gen != self._reclassify_gen:
+            return
+        changed = self.storage.apply_categories(changes)
+        perf.incr("classifier.reclassified", changed)
+        if changed:
+            self.storage.save_all()
+            self.refresh_clipboard_lists()
+
+    # ---------- 近似重複 ----------
+    def schedule_near_dup_index(self, delay_ms: Optional[int] = None):
+        if self._near_dup_building:
+            return
+        if delay_ms is not None:
+            self._near_dup_timer.start(delay_ms)
+        elif not self._near_dup_timer.isActive():
+            self._near_dup_timer.start()
+
+    def start_near_dup_index(self):
+        """在背景為所有文字項目計算 MinHash 簽章；期間的新增 / 刪除在 install 時補上。"""
+        if self._near_dup_building or self.storage.near_dups is not None:
+            return
+        self._near_dup_building = True
+        build_index_async(list(self.storage.clipboard_items), self.near_dup_ready.emit)
+
+    def _on_near_dup_ready(self, index):
+        self._near_dup_building = False
+        with perf.timer("near_dup.install"):
+            self.storage.install_near_dups(index)
+
+    def start_image_hashing(self):
+        if self._image_hash_building:
+            return
+        pending = self.storage.unhashed_image_items()
+        if not pending:
+            return
+        self._image_hash_building = True
+        hash_images_async(pending, load_gray_sample, self.image_hashes_ready.emit)
+
+    def _on_image_hashes_ready(self, values: dict):
+        self._image_hash_building = False
+        if self.storage.set_image_hashes(values):
+            self.storage.save_all()
+
+    def show_similar_clips(self):
+        cid = self.get_selected_clip_id()
+        clip = self.storage.get_clipboard_item(cid) if cid else None
+        if clip is None:
+            return
+        if clip.kind != ClipType.TEXT:
+            QMessageBox.information(self, "相似項目", "只有文字項目可以比對相似內容。")
+            return
+        if self.storage.near_dups is None:
+            self.schedule_near_dup_index(0)
+            QMessageBox.information(self, "相似項目", "相似項目索引建立中，請稍後再試。")
+            return
+        with perf.timer("near_dup.query"):
+            similar = self.storage.find_near_duplicates(clip, SIMILAR_THRESHOLD)
+        SimilarClipsDialog(self, clip, similar).exec()
+
+    # ---------- 保留原則 ----------
+    def setup_retention(self):
+        """定期依保留原則清理；清理分段在計時器中執行，每段只佔用幾毫秒。"""
+        self._pruner: Optional[Pruner] = None
+        self._prune_timer = QTimer(self)
+        self._prune_timer.setInterval(10)
+        self._prune_timer.timeout.connect(self._prune_step)
+        self._retention_timer = QTimer(self)
+        self._retention_timer.timeout.connect(self.start_pruning)
+        self.on_retention_changed(run_now=False)
+        # 啟動後稍等一下再做第一次清理，不和首次繪製搶時間
+        QTimer.singleShot(30_000, self.start_pruning)
+
+    def on_retention_changed(self, run_now: bool = True):
+        minutes = float(self.storage.settings.get("retention_interval_min", 30) or 0)
+        if minutes > 0:
+            self._retention_timer.start(int(minutes * 60_000))
+        else:
+            self._retention_timer.stop()
+        if run_now:
+            self.start_pruning()
+
+    def start_pruning(self):
+        if self._pruner is not None:
+            return
+        settings = self.storage.settings
+        self._pruner = Pruner(
+            self.storage,
+            RetentionPolicy.from_settings(settings),
+            slice_ms=float(settings.get("retention_slice_ms", 4) or 4),
+        )
+        self._prune_timer.start()
+
+    def _prune_step(self):
+        pruner = self._pruner
+        if pruner is None:
+            self._prune_timer.stop()
+            return
+        with perf.timer("retention.slice"):
+            more = pruner.step()
+        if more:
+            return
+        self._prune_timer.stop()
+        self._pruner = None
+        report = pruner.report
+        self.storage.settings["retention_last_run"] = datetime.now().isoformat(timespec="seconds")
+        self.storage.settings["retention_last_report"] = report
+        perf.incr("retention.removed", report.get("removed", 0))
+        perf.incr("retention.files_deleted", report.get("files_deleted", 0))
+        if report.get("removed"):
+            self.storage.save_all()
+            self.refresh_clipboard_lists()
+
+    def show_diagnostics(self):
+        dlg = getattr(self, "_diagnostics_dialog", None)
+        if dlg is None:
+            dlg = self._diagnostics_dialog = DiagnosticsDialog(self, self.storage, self.base_dir)
+        dlg.show()
+        dlg.raise_()
+
     def show_about(self):
         QMessageBox.information(self, _("menu.about"), _("about.text"))
 
@@ -883,23 +2009,53 @@ class LightClipWindow(QMainWindow):
         url = "https://mail.google.com/mail/?view=cm&to=trialscales0430@gmail.com&su=LightClip%20Feedback"
         webbrowser.open(url)
 
+    def _on_auto_sync_stats(self, stats: dict):
+        # 自動匯出的統計由工作執行緒發出，在這裡（GUI 執行緒）才寫入 settings
+        self.storage.settings.update(stats)
+
     def on_cloud_export_clicked(self):
-        files = self.cloud_sync.export_json()
+        files = self.cloud_sync.export()
         if files:
             QMessageBox.information(self, "Cloud", "已匯出剪貼簿資料。")
         else:
             QMessageBox.information(self, "Cloud", "沒有可匯出的資料。")
 
     def on_cloud_upload_clicked(self):
-        files = self.cloud_sync.export_json()
+        files = self.cloud_sync.export()
         try:
-            self.google_sync.upload_files(files)
-            QMessageBox.information(self, "Cloud", "已匯出資料，並可手動上傳至雲端。")
+            backend = create_backend(self.storage.settings, self.base_dir)
+            report = backend.upload_files(files, self.cloud_sync.cloud_dir)
         except Exception as e:
             QMessageBox.warning(self, "Cloud", f"雲端同步時發生錯誤：{e}")
+            return
+        if backend.name == "google":
+            QMessageBox.information(self, "Cloud", "已匯出資料，並可手動上傳至雲端。")
+            return
+        msg = f"上傳 {report['uploaded']} 個檔案，略過未變更 {report['skipped']} 個。"
+        if report["failed"]:
+            msg += f"\n{report['failed']} 個檔案上傳失敗，下次會從中斷處續傳。"
+            QMessageBox.warning(self, "Cloud", msg)
+        else:
+            QMessageBox.information(self, "Cloud", msg)
 
     def on_cloud_download_clicked(self):
-        QMessageBox.information(self, "Cloud", "從雲端下載的功能尚未實作。")
+        if self.cloud_sync.find_history_export() is None:
+            QMessageBox.information(self, "Cloud", "cloud 資料夾中沒有可匯入的匯出檔。")
+            return
+        try:
+            stats = self.cloud_sync.import_into_storage()
+        except Exception as e:
+            QMessageBox.warning(self, "Cloud", f"匯入雲端資料時發生錯誤：{e}")
+            return
+        self.storage.save_all()
+        self.refresh_clipboard_lists()
+        self.refresh_template_list()
+        QMessageBox.information(
+            self,
+            "Cloud",
+            f"已合併雲端資料：新增 {stats['added']} 筆、更新 {stats['updated']} 筆、"
+            f"模板新增 {stats['templates_added']} 筆。",
+        )
 
     # 舊的 API 兼容：保留名稱以避免其他地方呼叫失敗
     def on_cloud_sync_clicked(self):
@@ -935,27 +2091,31 @@ class LightClipWindow(QMainWindow):
             keyboard.unhook_all_hotkeys()
         except Exception:
             pass
+
+        # keyboard 的回呼在它自己的執行緒：不碰任何元件，只透過訊號轉到 Qt 執行緒
+        def on_template_hotkey(index: int):
+            self.hotkey_triggered.emit(f"template:{index}", time.perf_counter())
+
+        # 模板快捷鍵有自己的開關，不受剪貼簿快捷鍵開關影響
+        if self.storage.settings.get("template_hotkeys_enabled", True):
+            # 九個位置一次註冊；綁定哪個模板由快捷鍵表決定，模板變動時不必重新註冊
+            for index in range(1, TEMPLATE_SLOTS + 1):
+                try:
+                    keyboard.add_hotkey(f"ctrl+shift+{index}", on_template_hotkey, args=(index,))
+                except Exception:
+                    pass
+
         if not self.storage.settings.get("global_hotkey_enabled", False):
             return
         seq = self.storage.settings.get("global_hotkey", "ctrl+shift+v")
         ss_seq = (self.storage.settings.get("screenshot_hotkey", "") or "").strip()
+        action = "quick_paste" if self.storage.settings.get("quick_paste_enabled", True) else "window"
 
         def on_hotkey():
-            # 剪貼簿快捷鍵：喚醒視窗
-            self.showNormal()
-            self.activateWindow()
-            self.raise_()
+            self.hotkey_triggered.emit(action, time.perf_counter())
 
         def on_screenshot_hotkey():
-            # 截圖快捷鍵：喚醒視窗並切換到截圖分頁
-            self.showNormal()
-            self.activateWindow()
-            self.raise_()
-            try:
-                # 截圖分頁在 index 3
-                self.switch_tab(3)
-            except Exception:
-                pass
+            self.hotkey_triggered.emit("screenshot", time.perf_counter())
 
         try:
             keyboard.add_hotkey(seq, on_hotkey)
@@ -968,59 +2128,237 @@ class LightClipWindow(QMainWindow):
             except Exception:
                 QMessageBox.warning(self, "Hotkey", "無法註冊截圖快捷鍵，請嘗試其他組合或確認系統權限。")
 
+    def _on_hotkey(self, action: str, requested_at: float):
+        if action.startswith("template:"):
+            self.paste_template_slot(int(action.split(":", 1)[1]), requested_at)
+            return
+        if action == "quick_paste":
+            if self._quick_paste_timer.isActive():
+                # 還有尚未套用的歷史變動：先重建（通常只有在剛擷取完就按快捷鍵時發生）
+                self._quick_paste_timer.stop()
+                self.rebuild_quick_paste()
+            self.quick_paste.popup(requested_at)
+            return
+        # 剪貼簿快捷鍵（未啟用快速貼上）/ 截圖快捷鍵：喚醒主視窗
+        self.showNormal()
+        self.activateWindow()
+        self.raise_()
+        if action == "screenshot":
+            # 截圖分頁在 index 3
+            self.switch_tab(3)
+
+    def rebuild_quick_paste(self):
+        """快速貼上視窗的內容：所有釘選項目 + 最近 quick_paste_count 筆未釘選項目。"""
+        limit = int(self.storage.settings.get("quick_paste_count", 30))
+        pinned: List[ClipEntry] = []
+        recent: List[ClipEntry] = []
+        for clip in self.storage.clipboard_items:
+            if clip.pinned:
+                pinned.append(clip)
+            elif len(recent) < limit:
+                recent.append(clip)
+        with perf.timer("ui.quick_paste_rebuild"):
+            self.quick_paste.set_clips(pinned + recent)
+
+    def paste_template_slot(self, index: int, requested_at: Optional[float] = None):
+        """把快捷鍵表中第 index 個模板放到剪貼簿並貼上；未綁定時不做任何事。"""
+        slots = self._template_slots
+        payload = slots[index] if 0 < index < len(slots) else None
+        if payload is None:
+            return
+        self._expect_own_write(f"text:{payload}")
+        QApplication.clipboard().setText(payload)
+        if requested_at is not None:
+            perf.record("hotkey.template_latency", (time.perf_counter() - requested_at) * 1000)
+        perf.incr("hotkey.template_pasted")
+        self._schedule_paste_keys(0)
+
+    def paste_clip_by_id(self, cid: str):
+        clip = self.storage.get_clipboard_item(cid)
+        if clip is None:
+            return
+        mime = self._mime_for_clip(clip)
+        if clip.kind == ClipType.IMAGE:
+            if not mime.hasImage():
+                # 圖檔已不存在：不要用空內容蓋掉剪貼簿
+                return
+            img = mime.imageData()
+            gray = gray_sample(img)
+            self._expect_own_write(image_signature(img, dhash(gray) if gray is not None else None))
+        else:
+            paths = clip.file_paths
+            self._expect_own_write("files:" + "\n".join(paths) if paths else f"text:{clip.full_text}")
+        QApplication.clipboard().setMimeData(mime)
+        # 等焦點回到原本的視窗後再送出 Ctrl+V
+        self._schedule_paste_keys(80)
+
+    def _expect_own_write(self, sig: str):
+        """貼上前把擷取簽章設成即將寫入的內容（格式同 _build_clip），dataChanged 回來時不會再新增一筆。"""
+        self._last_clip_signature = sig
+
+    def _schedule_paste_keys(self, delay_ms: int):
+        if keyboard is not None and self.storage.settings.get("quick_paste_auto_paste", True):
+            QTimer.singleShot(delay_ms, self._send_paste_keys)
+
+    def _send_paste_keys(self, attempt: int = 0):
+        # 快捷鍵本身的 Shift 還按著時送出的會變成 Ctrl+Shift+V（也就是快速貼上的快捷鍵），等放開再送
+        try:
+            if keyboard.is_pressed("shift"):
+                if attempt < 20:
+                    QTimer.singleShot(25, lambda: self._send_paste_keys(attempt + 1))
+                else:
+                    # 0.5 秒內都沒放開就放棄（內容已在剪貼簿，使用者可自行貼上）
+                    perf.incr("quick_paste.paste_abandoned")
+                return
+            keyboard.send("ctrl+v")
+        except Exception:
+            pass
+
     def setup_clipboard_listener(self):
         cb = QApplication.clipboard()
         cb.dataChanged.connect(self.on_clipboard_changed)
         self._last_clip_signature = None
-
+        # 擷取佇列：一段時間內的多次變更合併成一個批次，只存檔與刷新畫面一次
+        self.ingest = IngestQueue()
+        self._ingest_timer = QTimer(self)
+        self._ingest_timer.setSingleShot(True)
+        self._ingest_timer.setInterval(int(self.storage.settings.get("ingest_batch_ms", 50)))
+        self._ingest_timer.timeout.connect(self.process_ingest_batch)
+
+    @perf.timed("clipboard.on_changed")
     def on_clipboard_changed(self):
-        cb = QApplication.clipboard()
-        mime = cb.mimeData()
+        """dataChanged 只依 MIME 格式把目前內容放進擷取佇列，由計時器批次處理。
 
-        # text
-        text = cb.text()
-        img = cb.image()
+        先看 formats()：本機檔案清單存成檔案項目（不讀取檔案內容），
+        有圖片時才在批次處理中解碼，其餘取純文字並一併保留 HTML。
+        """
+        mime = QApplication.clipboard().mimeData()
+        if mime is None:
+            return
+        formats = set(mime.formats())
+        capture = None
+        if "text/uri-list" in formats:
+            urls = mime.urls()
+            if urls and all(u.isLocalFile() for u in urls):
+                capture = ("files", tuple(u.toLocalFile() for u in urls))
+        if capture is None and mime.hasImage():
+            capture = ("image", None)
+        if capture is None:
+            text = mime.text() if "text/plain" in formats or mime.hasText() else ""
+            if not text.strip():
+                return
+            html = mime.html() if "text/html" in formats else ""
+            capture = ("text", (text, html))
+        self.ingest.push(*capture)
+        if not self._ingest_timer.isActive():
+            self._ingest_timer.start()
+
+    @perf.timed("clipboard.ingest_batch")
+    def process_ingest_batch(self):
+        batch = self.ingest.drain()
+        added = 0
+        for kind, payload in batch:
+            item = self._build_clip(kind, payload)
+            if item is None:
+                continue
+            if self.storage.get_clipboard_item(item.id) is item:
+                # 併入了既有的相同截圖（已移到最前方）
+                pass
+            elif (
+                item.kind == ClipType.TEXT
+                and self.storage.settings.get("near_dup_collapse")
+                and self.storage.collapse_near_duplicate(item) is not None
+            ):
+                perf.incr("clipboard.near_dup_collapsed")
+            else:
+                self.storage.add_clipboard_item(item)
+            added += 1
+        if not added:
+            return
+        self.ingest.captured += added
+        perf.incr("clipboard.captured", added)
+        self.storage.save_all()
+        self.refresh_clipboard_lists()
 
-        if img is not None and not img.isNull():
-            sig = f"image:{img.size().width()}x{img.size().height()}"
+    def _build_clip(self, kind: str, payload) -> Optional[ClipEntry]:
+        img = QApplication.clipboard().image() if kind == "image" else None
+        if img is not None and img.isNull():
+            return None
+
+        ihash = None
+        if img is not None:
+            # 圖片已經解碼，縮圖算 dHash 只需約一毫秒；同時用來判斷是否與上一張相同
+            with perf.timer("clipboard.image_hash"):
+                gray = gray_sample(img)
+                ihash = dhash(gray) if gray is not None else None
+            sig = image_signature(img, ihash)
+        elif kind == "files":
+            sig = "files:" + "\n".join(payload)
         else:
-            sig = f"text:{text}"
+            sig = f"text:{payload[0]}"
         if sig == getattr(self, "_last_clip_signature", None):
-            return
+            return None
         self._last_clip_signature = sig
 
-        item = {
-            "id": str(uuid.uuid4()),
-            "pinned": False,
-        }
+        item = ClipEntry(id=str(uuid.uuid4()))
+        item.stamp(datetime.now())
 
-        if img is not None and not img.isNull():
+        if img is not None:
+            # 幾乎相同的截圖直接沿用既有項目，不另存 PNG
+            if ihash is not None and self.storage.settings.get("image_dedup_collapse"):
+                target = self.storage.collapse_near_duplicate_image(ihash)
+                if target is not None:
+                    perf.incr("clipboard.image_dup_collapsed")
+                    return target
             # save image
             images_dir = self.base_dir / "data" / "images"
             images_dir.mkdir(parents=True, exist_ok=True)
-            filename = f"{item['id']}.png"
+            filename = f"{item.id}.png"
             path = images_dir / filename
-            img.save(str(path), "PNG")
-            item["type"] = "image"
-            item["image_path"] = str(path)
-            item["full_text"] = ""
-            item["preview"] = f"[圖片] {path.name}"
-            item["category"] = "圖片"
+            with perf.timer("clipboard.image_save"):
+                img.save(str(path), "PNG")
+            item.kind = ClipType.IMAGE
+            item.image_hash = ihash
+            item.image_path = str(path)
+            item.preview = f"[圖片] {path.name}"
+            item.set_category("圖片")
+        elif kind == "files":
+            # 只記錄路徑，不讀取檔案內容
+            paths = list(payload)
+            item.kind = ClipType.FILE
+            item.full_text = "\n".join(paths)
+            preview = f"[檔案] {Path(paths[0]).name or paths[0]}"
+            if len(paths) > 1:
+                preview += f" 等 {len(paths)} 個"
+            item.preview = preview
+            item.set_category("檔案")
         else:
-            text = text or ""
-            if not text.strip():
-                return
-            item["type"] = "text"
-            item["full_text"] = text
+            text, html = payload
+            item.full_text = text
+            item.html = html
             preview = text.strip().replace("\n", " ")
             if len(preview) > 80:
                 preview = preview[:77] + "..."
-            item["preview"] = preview
-            item["category"] = "文字"
-
-        self.storage.add_clipboard_item(item)
-        self.storage.save_all()
-        self.refresh_clipboard_lists()
+            item.preview = preview
+            with perf.timer("classifier.classify"):
+                item.set_category(self.storage.classify_clip(item))
+        return item
+
+    def _mime_for_clip(self, clip: ClipEntry) -> QMimeData:
+        """把項目還原成剪貼簿內容：圖片讀回圖檔、檔案還原為檔案清單、有 HTML 時一併放回。"""
+        mime = QMimeData()
+        if clip.kind == ClipType.IMAGE:
+            img = QImage(clip.image_path) if clip.image_path else QImage()
+            if not img.isNull():
+                mime.setImageData(img)
+            return mime
+        paths = clip.file_paths
+        if paths:
+            mime.setUrls([QUrl.fromLocalFile(p) for p in paths])
+        mime.setText(clip.full_text)
+        if clip.html:
+            mime.setHtml(clip.html)
+        return mime
 
     # ---------- main ----------
 
@@ -1046,6 +2384,7 @@ class LightClipWindow(QMainWindow):
 
         # 右側該分類項目列表
         self.list_category_items = ClipListWidget(self)
+        self.list_category_items.pin_requested.connect(self.toggle_pin_by_id)
         splitter.addWidget(self.list_category_items)
 
         splitter.setStretchFactor(0, 0)
@@ -1064,49 +2403,48 @@ class LightClipWindow(QMainWindow):
 
         # 事件
         self.list_categories.currentItemChanged.connect(self.on_category_selected)
-        self.list_category_items.itemSelectionChanged.connect(self.on_clip_selection_changed)
+        self.list_category_items.currentItemChanged.connect(self.on_clip_selection_changed)
         self.list_category_items.itemDoubleClicked.connect(self.copy_selected_clip)
+        self.list_category_items.customContextMenuRequested.connect(
+            lambda pos: self.show_clip_context_menu(self.list_category_items, pos)
+        )
 
         self.btn_cat_copy.clicked.connect(self.copy_selected_clip)
         self.btn_cat_delete.clicked.connect(self.delete_selected_clip)
         self.btn_cat_pin.clicked.connect(self.toggle_pin_selected_clip)
 
-        # 初始資料
-        self.refresh_categories_page()
+        # 初始資料：切換到此分頁時才建立（見 _refresh_page_if_stale）
 
     def refresh_categories_page(self):
-        """重建分類列表與右側內容。"""
+        """重建分類列表（含項目數量）與右側內容。"""
         if not hasattr(self, "list_categories"):
             return
 
-        by_cat = {}
-        for clip in self.storage.clipboard_items:
-            cat = clip.get("category") or self._infer_category(clip) or "未分類"
-            by_cat.setdefault(cat, []).append(clip)
+        current = self.list_categories.currentItem()
+        current_name = current.data(Qt.ItemDataRole.UserRole) if current is not None else None
 
         # 左側分類列表
         self.list_categories.blockSignals(True)
         self.list_categories.clear()
-        for cat in sorted(by_cat.keys()):
-            self.list_categories.addItem(cat)
-        self.list_categories.blockSignals(False)
-
+        for cat, count in self.storage.list_categories():
+            item = QListWidgetItem(f"{cat} ({count})", self.list_categories)
+            item.setData(Qt.ItemDataRole.UserRole, cat)
+            if cat == current_name:
+                self.list_categories.setCurrentItem(item)
         # 如果沒有選擇，就自動選第一個
         if self.list_categories.currentItem() is None and self.list_categories.count() > 0:
             self.list_categories.setCurrentRow(0)
+        self.list_categories.blockSignals(False)
 
-        self._rebuild_category_items(by_cat)
+        self._rebuild_category_items()
 
     def on_category_selected(self, current, previous):
         if not current:
             return
-        by_cat = {}
-        for clip in self.storage.clipboard_items:
-            cat = clip.get("category") or self._infer_category(clip) or "未分類"
-            by_cat.setdefault(cat, []).append(clip)
-        self._rebuild_category_items(by_cat)
+        self._rebuild_category_items()
 
-    def _rebuild_category_items(self, by_cat: dict):
+    def _rebuild_category_items(self):
+        """只載入目前分類的項目（分頁建立，捲動時再載入其餘）。"""
         if not hasattr(self, "list_category_items"):
             return
         cat_item = self.list_categories.currentItem()
@@ -1114,19 +2452,8 @@ class LightClipWindow(QMainWindow):
             self.list_category_items.clear()
             return
 
-        cat_name = cat_item.text()
-        items = by_cat.get(cat_name, [])
-
-        self.list_category_items.clear()
-        for clip in items:
-            lw_item = QListWidgetItem(self.list_category_items)
-            lw_item.setData(Qt.ItemDataRole.UserRole, clip.get("id"))
-            card = self._build_card_for_item(clip)
-            card.btn_pin.clicked.connect(
-                lambda checked=False, cid=clip.get("id"): self.toggle_pin_by_id(cid)
-            )
-            self.list_category_items.setItemWidget(lw_item, card)
-            lw_item.setSizeHint(card.sizeHint())
+        ids = self.storage.get_category_ids(cat_item.data(Qt.ItemDataRole.UserRole))
+        self._fill_card_list(self.list_category_items, ids)
 
     def _init_screenshot_page(self):
         """截圖分頁：左側圖片型項目列表，右側獨立大圖預覽。"""
@@ -1139,6 +2466,7 @@ class LightClipWindow(QMainWindow):
 
         # 左側：所有圖片項目
         self.list_screenshots = ClipListWidget(self)
+        self.list_screenshots.pin_requested.connect(self.toggle_pin_by_id)
         splitter.addWidget(self.list_screenshots)
 
         # 右側：大圖預覽
@@ -1162,40 +2490,60 @@ class LightClipWindow(QMainWindow):
         self.btn_ss_copy = QPushButton("複製", self)
         self.btn_ss_delete = QPushButton("刪除", self)
         self.btn_ss_pin = QPushButton("釘選 / 取消釘選", self)
+        self.btn_ss_similar = QPushButton("相似截圖", self)
+        self.btn_ss_similar.setCheckable(True)
+        self.btn_ss_similar.setToolTip("只列出與選取截圖相似的截圖；再按一次顯示全部")
         btn_row.addWidget(self.btn_ss_copy)
         btn_row.addWidget(self.btn_ss_delete)
         btn_row.addWidget(self.btn_ss_pin)
+        btn_row.addWidget(self.btn_ss_similar)
         btn_row.addStretch(1)
         layout.addLayout(btn_row)
 
         # 事件
         self.list_screenshots.itemSelectionChanged.connect(self.update_screenshot_preview)
+        self.list_screenshots.customContextMenuRequested.connect(
+            lambda pos: self.show_clip_context_menu(self.list_screenshots, pos)
+        )
         self.list_screenshots.itemDoubleClicked.connect(self.copy_selected_clip)
 
         self.btn_ss_copy.clicked.connect(self.copy_selected_clip)
         self.btn_ss_delete.clicked.connect(self.delete_selected_clip)
         self.btn_ss_pin.clicked.connect(self.toggle_pin_selected_clip)
+        self.btn_ss_similar.clicked.connect(self.toggle_similar_screenshots)
 
-        # 初始資料
-        self.refresh_screenshot_page()
+        # 初始資料：切換到此分頁時才建立（見 _refresh_page_if_stale）
 
     def refresh_screenshot_page(self):
         """刷新截圖分頁：列出所有圖片型項目。"""
         if not hasattr(self, "list_screenshots"):
             return
 
-        self.list_screenshots.clear()
-        for clip in self.storage.clipboard_items:
-            if clip.get("type") != "image":
-                continue
-            lw_item = QListWidgetItem(self.list_screenshots)
-            lw_item.setData(Qt.ItemDataRole.UserRole, clip.get("id"))
-            card = self._build_card_for_item(clip)
-            card.btn_pin.clicked.connect(
-                lambda checked=False, cid=clip.get("id"): self.toggle_pin_by_id(cid)
-            )
-            self.list_screenshots.setItemWidget(lw_item, card)
-            lw_item.setSizeHint(card.sizeHint())
+        self.btn_ss_similar.setChecked(False)
+        self._fill_card_list(self.list_screenshots, self.storage.filter_clipboard_ids(kinds=(ClipType.IMAGE,)))
+        self.start_image_hashing()
+
+        # 更新右側預覽
+        self.update_screenshot_preview()
+
+    def toggle_similar_screenshots(self, checked: bool):
+        """只列出與選取截圖 dHash 相近的截圖（選取的截圖排第一、其餘由近到遠）。"""
+        if not checked:
+            self.refresh_screenshot_page()
+            return
+        item = self.list_screenshots.currentItem()
+        clip = self.storage.get_clipboard_item(item.data(Qt.ItemDataRole.UserRole)) if item else None
+        value = clip.image_hash if clip is not None else None
+        if value is None:
+            self.btn_ss_similar.setChecked(False)
+            if clip is not None:
+                self.start_image_hashing()
+                QMessageBox.information(self, "相似截圖", "這張截圖的特徵尚未計算完成，請稍後再試。")
+            return
+        with perf.timer("image_hash.query"):
+            similar = self.storage.find_similar_images(value, SIMILAR_DISTANCE, exclude=(clip.id,))
+        self._fill_card_list(self.list_screenshots, [clip.id] + [c.id for c, _d in similar])
+        self.list_screenshots.setCurrentRow(0)
 
         # 更新右側預覽
         self.update_screenshot_preview()
@@ -1213,12 +2561,12 @@ class LightClipWindow(QMainWindow):
 
         cid = item.data(Qt.ItemDataRole.UserRole)
         clip = self.storage.get_clipboard_item(cid)
-        if not clip or clip.get("type") != "image":
+        if not clip or clip.kind != ClipType.IMAGE:
             self.label_ss_preview.setText("非圖片項目")
             self.label_ss_preview.setPixmap(QPixmap())
             return
 
-        path = clip.get("image_path")
+        path = clip.image_path
         if not path:
             self.label_ss_preview.setText("找不到圖片檔案")
             self.label_ss_preview.setPixmap(QPixmap())
@@ -1247,13 +2595,63 @@ class LightClipWindow(QMainWindow):
             Qt.TransformationMode.SmoothTransformation,
         )
         self.label_ss_preview.setPixmap(scaled)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="LightClip", add_help=True)
+    parser.add_argument(
+        "--profile-cpu",
+        nargs="?",
+        const="cprofile",
+        choices=("cprofile", "sample"),
+        help="結束時輸出 CPU 剖析（cprofile：pstats；sample：取樣 collapsed stacks）",
+    )
+    parser.add_argument(
+        "--profile-seconds",
+        type=float,
+        default=0.0,
+        help="只剖析啟動後的前 N 秒（0 = 直到程式結束）",
+    )
+    parser.add_argument("--profile-mem", action="store_true", help="以 tracemalloc 記錄記憶體快照")
+    parser.add_argument(
+        "--profile-mem-interval",
+        type=float,
+        default=60.0,
+        help="記憶體快照間隔秒數（0 = 只在啟動、載入歷史與結束時取快照）",
+    )
+    parser.add_argument("--profile-dir", type=Path, default=None, help="剖析結果輸出資料夾")
+    # 其餘參數（例如 Qt 的 -platform）交給 QApplication
+    return parser.parse_known_args(argv)
+
+
 def main():
     base_dir = ensure_base_dir()
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv[1:])
+    profile_dir = args.profile_dir or base_dir / "profiles"
+
+    mem_prof = None
+    if args.profile_mem:
+        from app.profiling import MemProfiler
+
+        mem_prof = MemProfiler(profile_dir)
+        mem_prof.start()
+    cpu_prof = None
+    if args.profile_cpu:
+        from app.profiling import CpuProfiler
+
+        cpu_prof = CpuProfiler(profile_dir, mode=args.profile_cpu, window=args.profile_seconds)
+        cpu_prof.start()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if mem_prof is not None:
+        mem_prof.snapshot("startup")
 
     storage = StorageManager(base_dir)
+    if mem_prof is not None:
+        mem_prof.snapshot(f"history loaded ({len(storage.clipboard_items)} items)")
     lang_mgr = LanguageManager(base_dir)
     theme_mgr = ThemeManager()
+    configure_perf(storage, base_dir)
 
     lang_mgr.set_language(storage.settings.get("language", "zh_TW"))
     theme_mgr.set_theme(storage.settings.get("theme", "dark_default"))
@@ -1262,7 +2660,21 @@ def main():
     win = LightClipWindow(storage, lang_mgr, theme_mgr, base_dir)
     win.show()
 
-    sys.exit(app.exec())
+    if mem_prof is not None:
+        mem_prof.snapshot("window ready")
+        if args.profile_mem_interval > 0:
+            mem_timer = QTimer(win)
+            mem_timer.timeout.connect(lambda: mem_prof.snapshot("periodic"))
+            mem_timer.start(int(args.profile_mem_interval * 1000))
+    if cpu_prof is not None and args.profile_seconds > 0 and cpu_prof.mode == "cprofile":
+        QTimer.singleShot(int(args.profile_seconds * 1000), cpu_prof.stop)
+
+    rc = app.exec()
+    if cpu_prof is not None:
+        cpu_prof.stop()
+    if mem_prof is not None:
+        mem_prof.stop()
+    sys.exit(rc)
 
 
 if __name__ == "__main__":